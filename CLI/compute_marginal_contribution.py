@@ -5,6 +5,8 @@ import sys
 import argparse
 from pathlib import Path
 
+from runrunner.base import Runner
+
 import global_variables as sgh
 from CLI.support import compute_marginal_contribution_help as scmch
 import sparkle_logging as sl
@@ -43,6 +45,12 @@ def parser_function() -> argparse.ArgumentParser:
         action=ac.SetByUser,
         help="the performance measure, e.g. runtime",
     )
+    parser.add_argument(
+        "--run-on",
+        default=Runner.LOCAL,
+        choices=[Runner.LOCAL, Runner.SLURM],
+        help=("On which computer or cluster environment to construct the selectors for"
+              " the actual selector."))
     parser.add_argument(
         "--settings-file",
         type=Path,
@@ -86,7 +94,7 @@ if __name__ == "__main__":
         )
 
     scmch.compute_marginal_contribution(
-        args.perfect, args.actual, args.recompute
+        args.perfect, args.actual, args.recompute, args.run_on
     )
 
     # Write used settings to file
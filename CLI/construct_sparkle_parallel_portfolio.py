@@ -12,6 +12,9 @@ import global_variables as sgh
 from sparkle.platform import settings_help
 from sparkle.platform.settings_help import SettingState
 from CLI.support import construct_parallel_portfolio_help as scpp
+from CLI.support import simulate_parallel_portfolio_help as sspph
+from sparkle.structures.performance_dataframe import PerformanceDataFrame
+from sparkle.types.objective import PerformanceMeasure
 from CLI.help.reporting_scenario import Scenario
 from CLI.help import command_help as ch
 from CLI.initialise import check_for_initialise
@@ -39,6 +42,22 @@ def parser_function() -> argparse.ArgumentParser:
                              "be thrown instead."
                              " (default: "
                              f"{sgh.settings.DEFAULT_paraport_overwriting})")
+    parser.add_argument("--simulate", action="store_true",
+                        help="Instead of constructing the portfolio, estimate its "
+                             "performance on the instances with known run times of "
+                             "its solvers.")
+    parser.add_argument("--cores", type=int,
+                        help="Select the solvers, from those given or all solvers, and "
+                             "their number of variations for a portfolio that uses at "
+                             "most this many cores. The selection minimises the "
+                             "simulated PAR on the instances with known run times.")
+    parser.add_argument("--core-slowdown", type=float, default=0.0,
+                        help="For the simulation and selection, the fraction by which "
+                             "each solver slows down per other solver running at the "
+                             "same time. (default: 0.0)")
+    parser.add_argument("--start-delay", type=float, default=0.0,
+                        help="For the simulation and selection, the seconds between "
+                             "the start of consecutive solvers. (default: 0.0)")
     parser.add_argument("--settings-file", type=Path,
                         help="Specify the settings file to use in case you want to use "
                              "one other than the default"
@@ -77,6 +96,41 @@ if __name__ == "__main__":
     if args.overwrite is not None:
         sgh.settings.set_paraport_overwriting_flag(args.overwrite, SettingState.CMD_LINE)
 
+    if args.simulate or args.cores is not None:
+        perf_measure = sgh.settings.get_general_sparkle_objectives()[0]\
+            .PerformanceMeasure
+        if perf_measure != PerformanceMeasure.RUNTIME:
+            print("ERROR: A parallel portfolio can only be simulated for the run time "
+                  "performance measure.")
+            sys.exit(-1)
+        if args.cores is not None and args.cores < 1:
+            print(f"ERROR: Invalid number of cores given ({args.cores}), a positive "
+                  "integer must be used. Stopping execution.")
+            sys.exit(-1)
+        performance_data = PerformanceDataFrame(sgh.performance_data_csv_path)
+        try:
+            if args.cores is not None:
+                deterministic_solvers = [solver.split()[0] for solver in sgh.solver_list
+                                         if solver.split()[1:2] == ["1"]]
+                list_of_solvers = sspph.optimise_parallel_portfolio(
+                    performance_data, list_of_solvers, args.cores,
+                    deterministic_solvers, args.core_slowdown, args.start_delay)
+                if len(list_of_solvers) == 0:
+                    print("ERROR: None of the solvers solves any instance within the "
+                          "cutoff time. Stopping execution.")
+                    sys.exit(-1)
+                print(f"Selected solvers: {' '.join(list_of_solvers)}")
+            simulation = sspph.simulate_parallel_portfolio(
+                performance_data, list_of_solvers, args.core_slowdown,
+                args.start_delay)
+        except ValueError as error:
+            print(f"ERROR: {error}")
+            sys.exit(-1)
+        sspph.report_simulation(simulation, sum(
+            scpp.get_solver_variations(solver)[1] for solver in list_of_solvers))
+        if args.simulate:
+            sys.exit(0)
+
     if portfolio_name is None:
         portfolio_name = sgh.sparkle_parallel_portfolio_name
 
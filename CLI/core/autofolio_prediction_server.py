@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Serve AutoFolio selector predictions, only for internal calls from Sparkle.
+
+The selector is loaded once, after which each line on stdin is answered with one
+line on stdout. A request is a JSON object with a list of feature vectors:
+
+    {"features": [[1.0, 2.0, ...], ...]}
+
+and the response holds the predicted schedule for each feature vector:
+
+    {"schedules": [[["Solvers/A", 61.0], ...], ...]}
+
+or {"error": "..."} when the prediction failed.
+"""
+import argparse
+import json
+import logging
+import pickle
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def load_selector(selector_path: Path) -> tuple:
+    """Load a saved AutoFolio selector and restore its loggers."""
+    with selector_path.open("br") as fp:
+        scenario, feature_pre_pipeline, pre_solver, selector, config = pickle.load(fp)
+    for fpp in feature_pre_pipeline:
+        fpp.logger = logging.getLogger("Feature Preprocessing")
+    if pre_solver:
+        pre_solver.logger = logging.getLogger("Aspeed PreSolving")
+    selector.logger = logging.getLogger("Selector")
+    return scenario, feature_pre_pipeline, pre_solver, selector, config
+
+
+def predict(autofolio: object, model: tuple, feature_vectors: list[list[float]])\
+        -> list[list]:
+    """Return the predicted schedule for each feature vector."""
+    scenario, feature_pre_pipeline, pre_solver, selector, config = model
+    instances = [f"pseudo_instance_{index}" for index in range(len(feature_vectors))]
+    # The saved scenario is adapted to the given feature vectors
+    scenario.feature_data = pd.DataFrame(np.array(feature_vectors, dtype=float),
+                                         index=instances, columns=scenario.features)
+    scenario.instances = instances
+    schedules = autofolio.predict(scenario=scenario, config=config,
+                                  feature_pre_pipeline=feature_pre_pipeline,
+                                  pre_solver=pre_solver, selector=selector)
+    return [[[str(solver), float(budget)] for solver, budget in schedules[instance]]
+            for instance in instances]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--load", required=True, type=Path,
+                        help="path to the AutoFolio selector to serve")
+    parser.add_argument("--autofolio", required=True, type=Path,
+                        help="path to the AutoFolio directory")
+    args = parser.parse_args()
+
+    # Anything printed by AutoFolio goes to stderr, stdout only carries responses
+    response_stream = sys.stdout
+    sys.stdout = sys.stderr
+
+    sys.path.insert(0, str(args.autofolio.resolve()))
+    from autofolio.autofolio import AutoFolio
+    autofolio = AutoFolio()
+    model = load_selector(args.load)
+    # Signal the selector is loaded
+    print(json.dumps({"ready": True}), file=response_stream, flush=True)
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+            response = {"schedules": predict(autofolio, model, request["features"])}
+        except Exception as ex:
+            response = {"error": f"{type(ex).__name__}: {ex}"}
+        print(json.dumps(response), file=response_stream, flush=True)
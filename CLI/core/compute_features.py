@@ -52,14 +52,17 @@ if __name__ == "__main__":
                f"{instance_path.name}_"
                f"{sgh.get_time_pid_random_string()}")
     result_path = Path(f"Feature_Data/Tmp/{key_str}.csv")
-    basic_part = "Tmp/" + key_str
+    # The extractor writes its output to scratch, only the result is written back
+    scratch_path = sfh.get_scratch_path()
+    raw_result_path = scratch_path / f"{key_str}.csv"
+    basic_part = str(scratch_path / key_str)
     err_path = basic_part + ".err"
     runsolver_watch_data_path = basic_part + ".log"
     runsolver_watch_data_path_option = "-w " + runsolver_watch_data_path
     command_line = (f"{runsolver_path} {cutoff_time_each_run_option} "
                     f"{runsolver_watch_data_path_option} {extractor_path}/"
                     f"{sgh.sparkle_run_default_wrapper} {extractor_path}/ "
-                    f"{instance_path} {result_path} 2> {err_path}")
+                    f"{instance_path} {raw_result_path} 2> {err_path}")
 
     try:
         task_run_status_path = f"Tmp/SBATCH_Extractor_Jobs/{key_str}.statusinfo"
@@ -79,11 +82,11 @@ if __name__ == "__main__":
         subprocess.run(command_line.split(" "))
         end_time = time.time()
     except Exception:
-        if not Path(result_path).exists():
-            sfh.create_new_empty_file(result_path)
+        if not raw_result_path.exists():
+            sfh.create_new_empty_file(raw_result_path)
 
     try:
-        tmp_fdcsv = sfdcsv.SparkleFeatureDataCSV(result_path)
+        tmp_fdcsv = sfdcsv.SparkleFeatureDataCSV(raw_result_path)
         result_string = "Successful"
     except Exception:
         print(f"****** WARNING: Feature vector computation on instance {instance_path}"
@@ -91,9 +94,9 @@ if __name__ == "__main__":
         print("****** WARNING: The feature vector of this instace consists of missing "
               "values ******")
 
-        result_path.unlink(missing_ok=True)
+        raw_result_path.unlink(missing_ok=True)
         tmp_fdcsv = scf.generate_missing_value_csv_like_feature_data_csv(
-            feature_data_csv, instance_path, extractor_path, result_path)
+            feature_data_csv, instance_path, extractor_path, raw_result_path)
         result_string = "Failed -- using missing value instead"
 
     # TODO: Handle multi-file instances
@@ -112,4 +115,5 @@ if __name__ == "__main__":
                f"{result_string_str}")
     sfh.write_string_to_file(sgh.sparkle_system_log_path, log_str, append=True)
     tmp_fdcsv.save_csv(result_path)
-    sfh.rmfiles([task_run_status_path, err_path, runsolver_watch_data_path])
+    sfh.rmfiles([task_run_status_path, err_path, runsolver_watch_data_path,
+                 raw_result_path])
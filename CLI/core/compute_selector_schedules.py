@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Construct a selector and predict its schedules, only for internal calls from Sparkle.
+
+The predicted schedule of every instance in the performance data is written to the
+result file, from which the performance of the selector is computed.
+"""
+import argparse
+from pathlib import Path
+
+import global_variables as sgh
+import sparkle_logging as sl
+from sparkle.platform import settings_help
+from sparkle.structures.feature_data_csv_help import SparkleFeatureDataCSV
+from sparkle.structures.performance_dataframe import PerformanceDataFrame
+from CLI.support import compute_marginal_contribution_help as scmch
+from CLI.support import construct_portfolio_selector_help as scps
+from CLI.support import selector_prediction_help as sspred
+
+
+if __name__ == "__main__":
+    # Initialise settings
+    global settings
+    file_path_latest = Path("Settings/latest.ini")
+    sgh.settings = settings_help.Settings(file_path_latest)
+
+    # Define command line arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--selector", required=True, type=Path,
+                        help="path of the selector to construct")
+    parser.add_argument("--performance-data-csv", required=True, type=Path,
+                        help="path to the performance data of the selector")
+    parser.add_argument("--feature-data-csv", required=True, type=Path,
+                        help="path to the feature data of the instances")
+    parser.add_argument("--result", required=True, type=Path,
+                        help="path to write the predicted schedules to")
+    parser.add_argument("--cached", action="store_true",
+                        help="the selector path is keyed by the data content, reuse an "
+                             "existing selector")
+    parser.add_argument("--log-dir", required=True, type=Path,
+                        help="log directory of the calling command")
+    parser.add_argument("--log-path", required=True, type=Path,
+                        help="log file of the calling command")
+    args = parser.parse_args()
+
+    # Log to the command that submitted this job
+    sl.caller_log_dir = args.log_dir
+    sl.caller_log_path = args.log_path
+
+    if not (args.cached and args.selector.is_file()):
+        scps.construct_sparkle_portfolio_selector(args.selector,
+                                                  str(args.performance_data_csv),
+                                                  str(args.feature_data_csv))
+
+    performance_data = PerformanceDataFrame(args.performance_data_csv)
+    feature_data = SparkleFeatureDataCSV(str(args.feature_data_csv))
+    instances = performance_data.get_instances()
+    schedules = scmch.get_list_predict_schedules(str(args.selector), feature_data,
+                                                 instances)
+    sspred.write_predicted_schedules(args.result, instances, schedules)
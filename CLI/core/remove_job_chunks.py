@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Remove the chunks of a finished run, only for internal calls from Sparkle.
+
+Submitted as a dependency of the run, so it starts once the last chunk of the run is
+done.
+"""
+import argparse
+from pathlib import Path
+
+from CLI.support import job_chunk_help as sjch
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", required=True, type=Path,
+                        help="path to the directory of the chunks of the run")
+    args = parser.parse_args()
+    sjch.remove_chunks(args.chunks)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Report the makespan of a finished parallel run, only for internal calls from Sparkle.
+
+Submitted as a dependency of the run, so it starts once the last job of the run is done.
+The job queue of the run, if any, is removed, reporting the runs that were not done.
+The chunks of the run, if any, are removed as well.
+"""
+import argparse
+from pathlib import Path
+
+import global_variables as sgh
+from sparkle.platform import file_help as sfh
+from CLI.support import job_chunk_help as sjch
+from CLI.support import job_queue_help as sjqh
+from CLI.support import job_schedule_help as sjsh
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--schedule", required=True, type=Path,
+                        help="path to the schedule written when the run was submitted")
+    parser.add_argument("--queue", required=False, type=Path,
+                        help="path to the job queue of the run")
+    parser.add_argument("--chunks", required=False, type=Path,
+                        help="path to the directory of the chunks of the run")
+    args = parser.parse_args()
+    sjsh.report_makespan(args.schedule)
+    if args.queue is not None:
+        # Runs claimed by a worker that was stopped are left in the queue
+        for job in sjqh.remove_job_queue(args.queue):
+            warning = (f"WARNING: Solver {job['solver']} was not run on instance "
+                       f"{job['instance']}, it is run again by the next run_solvers")
+            print(warning)
+            sfh.write_string_to_file(sgh.sparkle_system_log_path, warning,
+                                     append=True)
+    if args.chunks is not None:
+        sjch.remove_chunks(args.chunks)
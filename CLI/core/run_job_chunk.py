@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Run a chunk of runs one after another, only for internal calls from Sparkle.
+
+Each run writes its own results as it would in a job of its own, so the results of the
+finished runs of an interrupted chunk are kept. Finished runs are recorded next to the
+chunk, and are skipped when the chunk is run again.
+"""
+import argparse
+import json
+import shlex
+import subprocess
+from pathlib import Path
+
+
+def get_done_path(chunk_path: Path) -> Path:
+    """Return the path that records the finished runs of a chunk."""
+    return chunk_path.with_suffix(".done")
+
+
+def read_done_runs(chunk_path: Path) -> set[int]:
+    """Return the indices of the finished runs of a chunk."""
+    done_path = get_done_path(chunk_path)
+    if not done_path.is_file():
+        return set()
+    return {int(line) for line in done_path.read_text().split()}
+
+
+def run_chunk(chunk_path: Path) -> int:
+    """Run the runs of a chunk that are not finished yet.
+
+    Args:
+        chunk_path: Path to the chunk, a JSON list of commands.
+
+    Returns:
+        The number of runs that failed.
+    """
+    cmd_list = json.loads(chunk_path.read_text())
+    done_runs = read_done_runs(chunk_path)
+    n_failed = 0
+    for index, cmd in enumerate(cmd_list):
+        if index in done_runs:
+            continue
+        print(f"Run {index + 1} out of {len(cmd_list)}: {cmd}", flush=True)
+        if subprocess.run(shlex.split(cmd)).returncode != 0:
+            # A failing run should not stop the other runs of the chunk
+            print(f"ERROR: Run {index + 1} failed: {cmd}", flush=True)
+            n_failed += 1
+        with get_done_path(chunk_path).open("a") as fout:
+            fout.write(f"{index}\n")
+    return n_failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunk", required=True, type=Path,
+                        help="path to the chunk of runs to run")
+    args = parser.parse_args()
+    if run_chunk(args.chunk) > 0:
+        raise SystemExit(1)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Run solvers on instances from a job queue, only for internal calls from Sparkle.
+
+The worker starts once and keeps taking solver runs from the queue until it is empty.
+"""
+import argparse
+import traceback
+from pathlib import Path
+
+import global_variables as sgh
+from sparkle.platform import settings_help
+from CLI.support import job_queue_help as sjqh
+from CLI.support import run_solvers_help as srs
+from sparkle.types.objective import PerformanceMeasure
+
+
+if __name__ == "__main__":
+    # Initialise settings
+    global settings
+    file_path_latest = Path("Settings/latest.ini")
+    sgh.settings = settings_help.Settings(file_path_latest)
+    # Define command line arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queue", required=True, type=Path,
+                        help="path to the job queue to take solver runs from")
+    parser.add_argument("--worker-id", required=True, type=int,
+                        help="identifier of this worker")
+    args = parser.parse_args()
+
+    for job in sjqh.iterate_jobs(args.queue, args.worker_id):
+        try:
+            srs.run_solver_job(job["instance"], Path(job["solver"]),
+                               PerformanceMeasure.from_str(job["performance_measure"]))
+        except Exception:
+            # A failing run should not stop the worker from doing the other runs
+            print(f"ERROR: Running solver {job['solver']} on instance "
+                  f"{job['instance']} failed:")
+            traceback.print_exc()
@@ -69,7 +69,8 @@ if __name__ == "__main__":
         sgh.write_data_to_file(sgh.solver_nickname_list_path,
                                sgh.solver_nickname_mapping)
 
-    if Path(sgh.performance_data_csv_path).exists():
+    # The performance data may be stored in any of the data formats
+    if PerformanceDataFrame.get_stored_path(sgh.performance_data_csv_path) is not None:
         performance_data = PerformanceDataFrame(sgh.performance_data_csv_path)
         if solver_path.name in performance_data.dataframe.columns:
             performance_data.remove_solver(solver_path.name)
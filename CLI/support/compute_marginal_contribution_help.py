@@ -4,18 +4,30 @@
 from __future__ import annotations
 
 import subprocess
+import shutil
 import sys
 import csv
+import math
 from pathlib import Path
 from typing import Callable
 from statistics import mean
 
+import numpy as np
+import pandas as pd
+import runrunner as rrr
+from runrunner.base import Runner
+
 from sparkle.platform import file_help as sfh
+from sparkle.platform import fingerprint_help as sfph
 import global_variables as sgh
 from sparkle.structures import feature_data_csv_help as sfdcsv
 from sparkle.structures.performance_dataframe import PerformanceDataFrame
 from CLI.support import construct_portfolio_selector_help as scps
 from CLI.support import run_portfolio_selector_help as srps
+from CLI.support import selector_prediction_help as sspred
+from CLI.support import run_solvers_help as srsh
+from sparkle.platform import slurm_help as ssh
+from CLI.help.command_help import CommandName
 import sparkle_logging as sl
 from sparkle.types.objective import PerformanceMeasure
 from sparkle.structures.feature_data_csv_help import SparkleFeatureDataCSV
@@ -50,6 +62,7 @@ def write_marginal_contribution_csv(path: Path,
         content: A list of 2-tuples. The first component is the string name of the
         solver and the second is the algorithms' marginal contribution.
     """
+    path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w") as output_file:
         writer = csv.writer(output_file)
         writer.writerows(content)
@@ -59,6 +72,44 @@ def write_marginal_contribution_csv(path: Path,
                       "Marginal contributions to the portfolio selector per solver.")
 
 
+def get_marginal_contribution(virtual_best_performance: float,
+                              leave_out_performance: float,
+                              minimise: bool) -> float:
+    """Return the marginal contribution of solvers given the performance without them.
+
+    Args:
+      virtual_best_performance: Performance of the portfolio with all solvers.
+      leave_out_performance: Performance of the portfolio without the solvers.
+      minimise: flag indicating if scores should be minimised or maximised
+
+    Returns:
+      The ratio of the two performances if leaving out the solvers is worse,
+      otherwise 0. Infinite if the portfolio without the solvers has no performance,
+      as none of the remaining solvers can replace them.
+    """
+    if np.isnan(leave_out_performance) and not np.isnan(virtual_best_performance):
+        return math.inf
+    if minimise and leave_out_performance > virtual_best_performance or\
+       not minimise and leave_out_performance < virtual_best_performance:
+        return leave_out_performance / virtual_best_performance
+    return 0.0
+
+
+def get_penalty_settings() -> tuple[float, float, float]:
+    """Return the settings with which unsolved runs are penalised.
+
+    Unsolved runs score the penalised time, so the marginal contributions change with
+    these settings even when the performance data itself does not. They are therefore
+    part of the fingerprints of the stored marginal contributions.
+
+    Returns:
+      The cutoff time, penalty multiplier and penalised time.
+    """
+    return (sgh.settings.get_general_target_cutoff_time(),
+            sgh.settings.get_general_penalty_multiplier(),
+            sgh.settings.get_penalised_time())
+
+
 def compute_perfect_selector_marginal_contribution(
         aggregation_function: Callable[[list[float]], float] = mean,
         capvalue_list: list[float] = None,
@@ -79,9 +130,14 @@ def compute_perfect_selector_marginal_contribution(
       A list of 2-tuples of the form (solver name, marginal contribution).
     """
     perfect_margi_cont_path = sgh.sparkle_marginal_contribution_perfect_path
+    performance_data_csv = PerformanceDataFrame(performance_data_csv_path)
+    fingerprint = sfph.get_fingerprint(performance_data_csv.dataframe,
+                                       aggregation_function.__name__, capvalue_list,
+                                       minimise, get_penalty_settings())
 
-    # If the marginal contribution already exists in file, read it and return
-    if not flag_recompute and perfect_margi_cont_path.is_file():
+    # If the marginal contribution was computed from the same data, read it and return
+    if not flag_recompute and sfph.fingerprint_unchanged(perfect_margi_cont_path,
+                                                         fingerprint):
         print("Marginal contribution for the perfect selector already computed, reading "
               "from file instead! Use --recompute to force recomputation.")
         return read_marginal_contribution_csv(perfect_margi_cont_path)
@@ -89,9 +145,6 @@ def compute_perfect_selector_marginal_contribution(
     print("In this calculation, cutoff time for each run is "
           f"{sgh.settings.get_general_target_cutoff_time()} seconds")
 
-    rank_list = []
-    performance_data_csv = PerformanceDataFrame(performance_data_csv_path)
-
     print("Computing virtual best performance for portfolio selector with all solvers "
           "...")
     virtual_best_performance = (
@@ -101,26 +154,19 @@ def compute_perfect_selector_marginal_contribution(
           f"{str(virtual_best_performance)}")
     print("Computing done!")
 
-    for solver in performance_data_csv.dataframe.columns:
+    # All solvers are left out in a single pass over the performance data
+    solvers = performance_data_csv.dataframe.columns.tolist()
+    leave_out_performances = (
+        performance_data_csv.calc_leave_out_virtual_best_performances(
+            aggregation_function, minimise, capvalue_list))
+    rank_list = []
+    for solver, tmp_virt_best_perf in zip(solvers, leave_out_performances):
         solver_name = Path(solver).name
-        print("Computing virtual best performance for portfolio selector excluding "
-              f"solver {solver_name} ...")
-        tmp_performance_data_csv = PerformanceDataFrame(performance_data_csv_path)
-        tmp_performance_data_csv.remove_solver(solver)
-        tmp_virt_best_perf = (
-            tmp_performance_data_csv.calc_virtual_best_performance_of_portfolio(
-                aggregation_function, minimise, capvalue_list))
         print("Virtual best performance for portfolio selector excluding solver "
               f"{solver_name} is {tmp_virt_best_perf}")
-        print("Computing done!")
-        if minimise and tmp_virt_best_perf > virtual_best_performance or\
-           not minimise and tmp_virt_best_perf < virtual_best_performance:
-            marginal_contribution = tmp_virt_best_perf / virtual_best_performance
-        else:
-            marginal_contribution = 0.0
-
-        solver_tuple = (solver, marginal_contribution)
-        rank_list.append(solver_tuple)
+        marginal_contribution = get_marginal_contribution(
+            virtual_best_performance, tmp_virt_best_perf, minimise)
+        rank_list.append((solver, marginal_contribution))
         print("Marginal contribution (to Perfect Selector) for solver "
               f"{solver_name} is {marginal_contribution}")
 
@@ -129,15 +175,83 @@ def compute_perfect_selector_marginal_contribution(
 
     # Write perfect selector contributions to file
     write_marginal_contribution_csv(perfect_margi_cont_path, rank_list)
+    sfph.write_fingerprint(perfect_margi_cont_path, fingerprint)
 
     return rank_list
 
 
+def compute_perfect_selector_subset_marginal_contribution(
+        solver_subsets: list[list[str]],
+        aggregation_function: Callable[[list[float]], float] = mean,
+        capvalue_list: list[float] = None,
+        minimise: bool = True,
+        performance_data_csv_path: Path = sgh.performance_data_csv_path)\
+        -> list[tuple[tuple[str, ...], float]]:
+    """Return the marginal contributions of groups of solvers for the VBS.
+
+    The contribution of a group is that of leaving all its solvers out together,
+    which shows whether solvers can be pruned from the portfolio.
+
+    Args:
+      solver_subsets: The groups of solvers, e.g. pairs of solvers.
+      aggregation_function: function to aggregate the per instance scores
+      capvalue_list: list of cap values
+      minimise: flag indicating if scores should be minimised or maximised
+      performance_data_csv_path: Path to the CSV file containing the performance data.
+
+    Returns:
+      A list of 2-tuples of the form (solver names, marginal contribution), sorted
+      from the highest contribution down.
+    """
+    performance_data_csv = PerformanceDataFrame(performance_data_csv_path)
+    virtual_best_performance = (
+        performance_data_csv.calc_virtual_best_performance_of_portfolio(
+            aggregation_function, minimise, capvalue_list))
+    leave_out_performances = (
+        performance_data_csv.calc_leave_out_virtual_best_performances(
+            aggregation_function, minimise, capvalue_list, solver_subsets))
+    rank_list = [(tuple(subset),
+                  get_marginal_contribution(virtual_best_performance,
+                                            leave_out_performance, minimise))
+                 for subset, leave_out_performance
+                 in zip(solver_subsets, leave_out_performances)]
+    rank_list.sort(key=lambda marginal_contribution: marginal_contribution[1],
+                   reverse=True)
+    return rank_list
+
+
 def get_list_predict_schedule(actual_portfolio_selector_path: str,
                               feature_data_csv: SparkleFeatureDataCSV,
                               instance: int) -> list[float]:
     """Return the solvers schedule suggested by the selector as a list.
 
+    The prediction is done by a prediction server that keeps the selector loaded
+    between calls. If the server is not available, the selector is called directly.
+
+    Args:
+      actual_portfolio_selector_path: Path to portfolio selector.
+      feature_data_csv: SparkleFeatureDataCSV object with the feature data.
+      instance: Instance ID, i.e., the number of the instance.
+
+    Returns:
+      List of floating point numbers.
+    """
+    feature_vector = [float(value) for value in feature_data_csv.dataframe.loc[instance]]
+    try:
+        server = sspred.get_prediction_server(
+            Path(actual_portfolio_selector_path),
+            sl.caller_log_dir / "predict_schedule_autofolio.err")
+        return server.predict_schedule(feature_vector)
+    except (OSError, RuntimeError, ValueError):
+        return get_list_predict_schedule_from_process(actual_portfolio_selector_path,
+                                                      feature_data_csv, instance)
+
+
+def get_list_predict_schedule_from_process(actual_portfolio_selector_path: str,
+                                           feature_data_csv: SparkleFeatureDataCSV,
+                                           instance: int) -> list[float]:
+    """Return the solvers schedule suggested by a new selector process as a list.
+
     Args:
       actual_portfolio_selector_path: Path to portfolio selector.
       feature_data_csv: SparkleFeatureDataCSV object with the feature data.
@@ -182,6 +296,106 @@ def get_list_predict_schedule(actual_portfolio_selector_path: str,
     return list_predict_schedule
 
 
+def get_list_predict_schedules(actual_portfolio_selector_path: str,
+                               feature_data_csv: SparkleFeatureDataCSV,
+                               instances: list[str]) -> list[list[tuple[str, float]]]:
+    """Return the solver schedules suggested by the selector for many instances.
+
+    All instances are predicted with a single request to the prediction server. If
+    the server is not available, the selector is called per instance.
+
+    Args:
+      actual_portfolio_selector_path: Path to portfolio selector.
+      feature_data_csv: SparkleFeatureDataCSV object with the feature data.
+      instances: The instances to predict a schedule for.
+
+    Returns:
+      The predicted schedule of each instance, as a list of (solver, budget).
+    """
+    feature_matrix = feature_data_csv.dataframe.reindex(instances)\
+        .apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    try:
+        server = sspred.get_prediction_server(
+            Path(actual_portfolio_selector_path),
+            sl.caller_log_dir / "predict_schedule_autofolio.err")
+        return server.predict(feature_matrix.tolist())
+    except (OSError, RuntimeError, ValueError):
+        return [get_list_predict_schedule_from_process(actual_portfolio_selector_path,
+                                                       feature_data_csv, instance)
+                for instance in instances]
+
+
+def simulate_predicted_schedules(
+        list_predict_schedules: list[list[tuple[str, float]]],
+        instances: list[str],
+        performance_data_csv: PerformanceDataFrame,
+        minimise: bool,
+        objective_type: PerformanceMeasure,
+        capvalue_list: list[float] | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """Simulate running the predicted schedules using the performance data.
+
+    For runtime, the solvers of a schedule are run one after another with their
+    budget, until a solver finishes within its budget or the cutoff time is
+    exceeded. For quality, the best performance of the scheduled solvers is taken.
+
+    Args:
+      list_predict_schedules: The predicted schedule of each instance.
+      instances: The instance of each schedule.
+      performance_data_csv: The performance data of the solvers.
+      minimise: Whether the performance value should be minimized or maximized
+      objective_type: Whether we are dealing with run time or not.
+      capvalue_list: Optional cap value of each instance.
+
+    Returns:
+      An array with the performance on each instance, and a boolean array
+      indicating whether each instance was solved within the cutoff time (Runtime)
+      or at least one solver performance did not exceed the cap value.
+    """
+    n_instances = len(instances)
+    n_steps = max((len(schedule) for schedule in list_predict_schedules), default=0)
+    # Pad the schedules to a (instances, steps) matrix, marking the padding invalid
+    valid = np.zeros((n_instances, n_steps), dtype=bool)
+    budgets = np.zeros((n_instances, n_steps))
+    solvers = np.full((n_instances, n_steps), "", dtype=object)
+    for index, schedule in enumerate(list_predict_schedules):
+        valid[index, :len(schedule)] = True
+        for step, (solver, budget) in enumerate(schedule):
+            solvers[index, step] = solver
+            budgets[index, step] = budget
+    performances = np.full((n_instances, n_steps), np.nan)
+    performances[valid] = performance_data_csv.get_values(
+        solvers[valid].tolist(), np.repeat(instances, valid.sum(axis=1)).tolist())
+
+    if objective_type == PerformanceMeasure.RUNTIME:
+        cutoff_time = sgh.settings.get_general_target_cutoff_time()
+        solved = valid & (performances <= budgets)
+        # A solver that does not finish within its budget uses its full budget
+        unsolved_cost = np.where(valid, budgets, 0.0)
+        cost_before = np.cumsum(unsolved_cost, axis=1) - unsolved_cost
+        solved_before = (np.cumsum(solved, axis=1) - solved) > 0
+        executed = valid & ~solved_before & (cost_before <= cutoff_time)
+        cost = np.where(solved, performances, budgets)
+        performance = np.where(executed, cost, 0.0).sum(axis=1)
+        flag_success = (executed & solved).any(axis=1) & (performance <= cutoff_time)
+        return performance, flag_success
+
+    # Minimum or maximum of predicted solvers (Aggregation function)
+    if minimise:
+        performance = np.where(valid, performances, np.inf)\
+            .min(axis=1, initial=np.inf)
+    else:
+        performance = np.where(valid, performances, -np.inf)\
+            .max(axis=1, initial=-np.inf)
+    if capvalue_list is None:
+        return performance, np.zeros(n_instances, dtype=bool)
+    capvalues = np.asarray(capvalue_list, dtype=float)
+    if minimise:
+        flag_success = performance <= capvalues
+    else:
+        flag_success = performance >= capvalues
+    return performance, flag_success
+
+
 def compute_actual_selector_performance(
         actual_portfolio_selector_path: str,
         performance_data_csv_path: str,
@@ -191,6 +405,9 @@ def compute_actual_selector_performance(
         capvalue_list: list[float] | None = None) -> float:
     """Return the performance of the selector over all instances.
 
+    The feature data is loaded once, the schedules of all instances are predicted
+    together, and running them is simulated with the performance data.
+
     Args:
       actual_portfolio_selector_path: Path to portfolio selector.
       performance_data_csv_path: Path to the CSV file with the performance data.
@@ -203,23 +420,47 @@ def compute_actual_selector_performance(
       The selector performance as a single floating point number.
     """
     performance_data_csv = PerformanceDataFrame(performance_data_csv_path)
+    feature_data_csv = sfdcsv.SparkleFeatureDataCSV(feature_data_csv_path)
+    instances = performance_data_csv.get_instances()
+
+    list_predict_schedules = get_list_predict_schedules(
+        actual_portfolio_selector_path, feature_data_csv, instances)
+    return get_selector_performance(list_predict_schedules, instances,
+                                    performance_data_csv, minimise,
+                                    aggregation_function, capvalue_list)
+
+
+def get_selector_performance(
+        list_predict_schedules: list[list[tuple[str, float]]],
+        instances: list[str],
+        performance_data_csv: PerformanceDataFrame,
+        minimise: bool,
+        aggregation_function: Callable[[list[float]], float],
+        capvalue_list: list[float] | None = None) -> float:
+    """Return the performance of the predicted schedules over all instances.
+
+    Args:
+      list_predict_schedules: The predicted schedule of each instance.
+      instances: The instance of each schedule.
+      performance_data_csv: The performance data of the solvers.
+      minimise: Flag indicating, if scores should be minimised.
+      aggregation_function: function to aggregate the performance per instance
+      capvalue_list: Optional list of cap-values.
+
+    Returns:
+      The selector performance as a single floating point number.
+    """
     penalty_factor = sgh.settings.get_general_penalty_multiplier()
-    performances = []
     perf_measure = sgh.settings.get_general_sparkle_objectives()[0].PerformanceMeasure
-    capvalue = None
-    for index, instance in enumerate(performance_data_csv.get_instances()):
-        if capvalue_list is not None:
-            capvalue = capvalue_list[index]
-        performance_instance, flag_success = compute_actual_performance_for_instance(
-            actual_portfolio_selector_path, instance, feature_data_csv_path,
-            performance_data_csv, minimise, perf_measure, capvalue)
+    performances, flag_success = simulate_predicted_schedules(
+        list_predict_schedules, instances, performance_data_csv, minimise,
+        perf_measure, capvalue_list)
 
-        if not flag_success and capvalue is not None:
-            performance_instance = capvalue * penalty_factor
+    if capvalue_list is not None:
+        penalised = np.asarray(capvalue_list, dtype=float) * penalty_factor
+        performances = np.where(flag_success, performances, penalised)
 
-        performances.append(performance_instance)
-
-    return aggregation_function(performances)
+    return aggregation_function(performances.tolist())
 
 
 def compute_actual_performance_for_instance(
@@ -252,49 +493,63 @@ def compute_actual_performance_for_instance(
     # Get the prediction of the selector over the solvers
     list_predict_schedule = get_list_predict_schedule(actual_portfolio_selector_path,
                                                       feature_data_csv, instance)
+    capvalue_list = None if capvalue is None else [capvalue]
+    performance, flag_success = simulate_predicted_schedules(
+        [list_predict_schedule], [instance], performance_data_csv, minimise,
+        objective_type, capvalue_list)
 
-    performance = None
-    flag_successfully_solving = False
-    cutoff_time = sgh.settings.get_general_target_cutoff_time()
-    if objective_type == PerformanceMeasure.RUNTIME:
-        performance_list = []
-        # In case of Runtime, we loop through the selected solvers
-        for prediction in list_predict_schedule:
-            # A prediction is a solver and its score given by the Selector
-            performance = float(performance_data_csv.get_value(prediction[0], instance))
-            performance_list.append(performance)
-            scheduled_cutoff_time_this_run = prediction[1]
-            # 1. if performance <= predicted runtime we have a successfull solver
-            if performance <= scheduled_cutoff_time_this_run:
-                # 2. Succes if the tried solvers < selector cutoff_time
-                if sum(performance_list) <= cutoff_time:
-                    flag_successfully_solving = True
-                break
-            # 3. Else, we set the failed solver to the cutoff time
-            performance_list[-1] = scheduled_cutoff_time_this_run
-
-            # 4. If we have exceeded cutoff_time, we are done
-            if sum(performance_list) > cutoff_time:
-                break
-
-        performance = sum(performance_list)
+    return float(performance[0]), bool(flag_success[0])
+
+
+def submit_selector_jobs(jobs: list[tuple[Path, Path, Path, bool]],
+                         feature_data_csv_path: Path,
+                         run_on: Runner = Runner.LOCAL) -> None:
+    """Construct the selectors and predict their schedules as a job array.
+
+    Waits until all jobs are done.
+
+    Args:
+      jobs: Per selector a 4-tuple of the selector path, the path to its performance
+        data, the path to write its predicted schedules to, and whether the selector
+        path is keyed by the data content so an existing selector can be reused.
+      feature_data_csv_path: Path to the feature data shared by all jobs.
+      run_on: Where to execute the jobs. Defaults to Runner.LOCAL.
+    """
+    cmd_base = "CLI/core/compute_selector_schedules.py"
+    cmd_list = [f"{cmd_base} --selector {selector_path} "
+                f"--performance-data-csv {performance_data_path} "
+                f"--feature-data-csv {feature_data_csv_path} --result {result_path} "
+                f"--log-dir {sl.caller_log_dir} --log-path {sl.caller_log_path}"
+                + (" --cached" if cached else "")
+                for selector_path, performance_data_path, result_path, cached in jobs]
+    if run_on == Runner.LOCAL:
+        parallel_jobs = srsh.get_number_of_local_workers(len(cmd_list))
     else:
-        # Minimum or maximum of predicted solvers (Aggregation function)
-        performance_list = []
-        for prediction in list_predict_schedule:
-            solver_performance = performance_data_csv.get_value(prediction[0], instance)
-            performance_list.append(float(solver_performance))
+        parallel_jobs = sgh.settings.get_slurm_number_of_runs_in_parallel()
+    run = rrr.add_to_queue(
+        runner=run_on,
+        cmd=cmd_list,
+        name=CommandName.COMPUTE_MARGINAL_CONTRIBUTION,
+        parallel_jobs=parallel_jobs,
+        base_dir=sgh.sparkle_tmp_path,
+        sbatch_options=ssh.get_slurm_options_list(),
+        srun_options=["-N1", "-n1"] + ssh.get_slurm_options_list())
+    run.wait()
 
-        if minimise:
-            performance = min(performance_list)
-            if performance <= capvalue:
-                flag_successfully_solving = True
-        else:
-            performance = max(performance_list)
-            if performance >= capvalue:
-                flag_successfully_solving = True
 
-    return performance, flag_successfully_solving
+def prune_selector_cache(selector_paths: list[Path]) -> None:
+    """Remove the cached selectors other than the given ones.
+
+    Args:
+      selector_paths: Paths of the cached selectors to keep.
+    """
+    cache_dir = sgh.sparkle_algorithm_selector_cache_dir
+    if not cache_dir.is_dir():
+        return
+    keep = {selector_path.parent.name for selector_path in selector_paths}
+    for entry in cache_dir.iterdir():
+        if entry.name not in keep:
+            shutil.rmtree(entry, ignore_errors=True)
 
 
 def compute_actual_selector_marginal_contribution(
@@ -303,27 +558,42 @@ def compute_actual_selector_marginal_contribution(
         minimise: bool = True,
         performance_data_csv_path: str = sgh.performance_data_csv_path,
         feature_data_csv_path: str = sgh.feature_data_csv_path,
-        flag_recompute: bool = False) -> list[tuple[str, float]]:
+        flag_recompute: bool = False,
+        run_on: Runner = Runner.LOCAL) -> list[tuple[str, float]]:
     """Compute the marginal contributions of solvers in the selector.
 
+    The selector with all solvers and the selectors leaving out each solver are
+    constructed and evaluated in parallel as a job array. Selectors for a subset of
+    the solvers are cached by the content of their data, and only constructed if the
+    data changed.
+
     Args:
       aggregation_function: Function to aggregate score values
       capvalue_list: List of cap values
       minimise: Flag indicating if scores should be minimised
-      performance_data_csv: SparklePerformanceDataCSV object that holds the
-        performance data.
+      performance_data_csv_path: Path to the CSV file with the performance data.
       feature_data_csv_path: Path to the CSV file with the feature data.
       flag_recompute: Boolean indicating whether marginal contributions should
         be recalculated even if they already exist in a file. Defaults to False.
+      run_on: Where to construct the selectors. Defaults to Runner.LOCAL.
 
     Returns:
       A list of 2-tuples where every 2-tuple is of the form
       (solver name, marginal contribution).
     """
     actual_margi_cont_path = sgh.sparkle_marginal_contribution_actual_path
-
-    # If the marginal contribution already exists in file, read it and return
-    if not flag_recompute and actual_margi_cont_path.is_file():
+    performance_df = PerformanceDataFrame(performance_data_csv_path)
+    feature_data_csv = SparkleFeatureDataCSV(feature_data_csv_path)
+    bool_exists_missing_value = feature_data_csv.bool_exists_missing_value()
+    if bool_exists_missing_value:
+        feature_data_csv.impute_missing_value_of_all_columns()
+    fingerprint = sfph.get_fingerprint(
+        scps.get_selector_fingerprint(performance_df, feature_data_csv),
+        aggregation_function.__name__, capvalue_list, minimise, get_penalty_settings())
+
+    # If the marginal contribution was computed from the same data, read it and return
+    if not flag_recompute and sfph.fingerprint_unchanged(actual_margi_cont_path,
+                                                         fingerprint):
         print("Marginal contribution for the actual selector already computed, reading "
               "from file instead! Use --recompute to force recomputation.")
         rank_list = read_marginal_contribution_csv(actual_margi_cont_path)
@@ -333,117 +603,95 @@ def compute_actual_selector_marginal_contribution(
     print("In this calculation, cutoff time for each run is "
           f"{sgh.settings.get_general_target_cutoff_time()} seconds")
 
-    rank_list = []
-
-    # Get values from CSV while all solvers and instances are included
-    performance_df = PerformanceDataFrame(performance_data_csv_path)
-
-    if not Path("Tmp/").exists():
-        Path("Tmp/").mkdir()
-
-    # Compute performance of actual selector
-    print("Computing actual performance for portfolio selector with all solvers ...")
-    actual_portfolio_selector_path = sgh.sparkle_algorithm_selector_path
-    scps.construct_sparkle_portfolio_selector(actual_portfolio_selector_path,
-                                              performance_data_csv_path,
-                                              feature_data_csv_path)
-
-    if not Path(actual_portfolio_selector_path).exists():
-        print(f"****** ERROR: {actual_portfolio_selector_path} does not exist! ******")
-        print("****** ERROR: AutoFolio constructing the actual portfolio selector with"
-              " all solvers failed! ******")
-        print("****** Use virtual best performance instead of actual "
-              "performance for this portfolio selector! ******")
-        sys.exit(-1)
-
-    actual_selector_performance = compute_actual_selector_performance(
-        actual_portfolio_selector_path, performance_data_csv_path,
-        feature_data_csv_path, minimise, aggregation_function, capvalue_list)
-
-    print("Actual performance for portfolio selector with all solvers is "
-          f"{str(actual_selector_performance)}")
-    print("Computing done!")
-
-    # Compute contribution per solver
+    work_dir = (Path(sgh.sparkle_tmp_path)
+                / f"marginal_contribution_{sgh.get_time_pid_random_string()}")
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    # All jobs read the same copy of the feature data, with missing values imputed once
+    if bool_exists_missing_value:
+        strategy = sgh.settings.get_general_feature_imputation_strategy()
+        print("****** WARNING: There are missing values in the feature data, and all "
+              f"missing values were imputed with strategy {strategy.name}! ******")
+    shared_feature_data_path = work_dir / "feature_data.csv"
+    feature_data_csv.save_csv(shared_feature_data_path)
+    shared_feature_data_path.chmod(0o444)
+
+    # The selector with all solvers, followed by one leaving out each solver
+    selectors = [(None, Path(performance_data_csv_path),
+                  sgh.sparkle_algorithm_selector_path, False)]
     for solver in performance_df.dataframe.columns:
-        solver_name = Path(solver).name
-        print("Computing actual performance for portfolio selector excluding solver "
-              f"{solver_name} ...")
-        # 1. Create a temporary df file name
-        tmp_performance_df_file = (
-            f"tmp_performance_data_csv_without_{solver_name}_"
-            f"{sgh.get_time_pid_random_string()}.csv")
-        # 2. Create the path using the log dir and the file name
-        tmp_performance_df_path = sl.caller_log_dir / tmp_performance_df_file
-
-        # 3. Copy the dataframe original df
-        tmp_performance_df = performance_df.copy(tmp_performance_df_path)
-
-        # 4. Remove the solver from this copy
+        tmp_performance_df = performance_df.copy(
+            work_dir / f"performance_data_without_{Path(solver).name}.csv")
         tmp_performance_df.remove_solver(solver)
-
-        # 5. Log this action
-        sl.add_output(str(tmp_performance_df_path),
-                      "[written] Temporary performance data")
-        # 6. Save the sub-dataframe with the removed solver
-        tmp_performance_df.save_csv()
-
-        # 7. create the actual selector path
-        tmp_actual_portfolio_selector_path = (
-            sgh.sparkle_algorithm_selector_dir / f"without_{solver_name}"
-            / f"{sgh.sparkle_algorithm_selector_name}")
-
-        if tmp_performance_df.get_num_solvers() >= 1:
-            # 8. Construct the portfolio selector for this subset
-            scps.construct_sparkle_portfolio_selector(
-                tmp_actual_portfolio_selector_path, tmp_performance_df_path,
-                feature_data_csv_path)
-        else:
+        if tmp_performance_df.get_num_solvers() < 1:
             print("****** WARNING: No solver exists ! ******")
+            continue
+        tmp_performance_df.save_csv(tmp_performance_df.csv_filepath)
+        subset_fingerprint = scps.get_selector_fingerprint(tmp_performance_df,
+                                                           feature_data_csv)
+        selector_path = (sgh.sparkle_algorithm_selector_cache_dir / subset_fingerprint
+                         / sgh.sparkle_algorithm_selector_name)
+        selectors.append((solver, tmp_performance_df.csv_filepath, selector_path, True))
+
+    print(f"Constructing and evaluating {len(selectors)} portfolio selectors ...")
+    jobs = [(selector_path, performance_path,
+             work_dir / f"schedules_{index}.json", cached)
+            for index, (_, performance_path, selector_path, cached)
+            in enumerate(selectors)]
+    submit_selector_jobs(jobs, shared_feature_data_path, run_on)
+    print("Computing done!")
+    # Selectors for other data than the current are not used again
+    prune_selector_cache([selector_path for _, _, selector_path, cached in selectors
+                          if cached])
 
-        if not Path(tmp_actual_portfolio_selector_path).exists():
-            print(f"****** ERROR: {tmp_actual_portfolio_selector_path} does not exist!"
-                  " ******")
+    # Aggregate the performance of the selectors into the marginal contributions
+    actual_selector_performance = None
+    rank_list = []
+    for (solver, performance_path, selector_path, _), (_, _, result_path, _) \
+            in zip(selectors, jobs):
+        solver_name = "all solvers" if solver is None else Path(solver).name
+        if not result_path.is_file():
+            print(f"****** ERROR: {selector_path} does not exist! ******")
             print("****** ERROR: AutoFolio constructing the actual portfolio selector "
-                  f"excluding solver {solver_name} failed! ******")
+                  f"with {solver_name} failed! ******")
+            print("****** Use virtual best performance instead of actual "
+                  "performance for this portfolio selector! ******")
+            shutil.rmtree(work_dir, ignore_errors=True)
             sys.exit(-1)
-
-        tmp_asp = compute_actual_selector_performance(
-            tmp_actual_portfolio_selector_path, tmp_performance_df_path,
-            feature_data_csv_path, minimise, aggregation_function, capvalue_list)
-
+        instances, schedules = sspred.read_predicted_schedules(result_path)
+        selector_performance = get_selector_performance(
+            schedules, instances, PerformanceDataFrame(performance_path), minimise,
+            aggregation_function, capvalue_list)
+        if solver is None:
+            actual_selector_performance = selector_performance
+            print("Actual performance for portfolio selector with all solvers is "
+                  f"{str(actual_selector_performance)}")
+            continue
         print(f"Actual performance for portfolio selector excluding solver "
-              f"{solver_name} is {str(tmp_asp)}")
-        sfh.rmfiles(tmp_performance_df_path)
-        sl.add_output(str(tmp_performance_df_path),
-                      "[removed] Temporary performance data")
-        print("Computing done!")
+              f"{solver_name} is {str(selector_performance)}")
 
         # 1. If the performance remains equal, this solver has no contribution
         # 2. If there is a performance decay without this solver, it has a contribution
         # 3. If there is a performance improvement, we have a bad selector
-        if tmp_asp == actual_selector_performance:
-            marginal_contribution = 0.0
-        elif minimise and tmp_asp > actual_selector_performance or not minimise and\
-                tmp_asp < actual_selector_performance:
-            marginal_contribution = tmp_asp / actual_selector_performance
-        else:
+        marginal_contribution = get_marginal_contribution(
+            actual_selector_performance, selector_performance, minimise)
+        if marginal_contribution == 0.0 and\
+                selector_performance != actual_selector_performance:
             print("****** WARNING DUBIOUS SELECTOR/SOLVER:"
                   f" The omission of solver {solver_name} yields an improvement."
                   "The selector improves better without this solver. It may be usefull"
                   " to construct a portfolio without this solver.")
-            marginal_contribution = 0.0
-
-        solver_tuple = (solver, marginal_contribution)
-        rank_list.append(solver_tuple)
+        rank_list.append((solver, marginal_contribution))
         print(f"Marginal contribution (to Actual Selector) for solver {solver_name} is "
               f"{str(marginal_contribution)}")
 
+    shutil.rmtree(work_dir, ignore_errors=True)
     rank_list.sort(key=lambda marginal_contribution: marginal_contribution[1],
                    reverse=True)
 
     # Write actual selector contributions to file
     write_marginal_contribution_csv(actual_margi_cont_path, rank_list)
+    sfph.write_fingerprint(actual_margi_cont_path, fingerprint)
 
     return rank_list
 
@@ -470,7 +718,7 @@ def print_rank_list(rank_list: list, mode: str) -> None:
 
 def compute_marginal_contribution(
         flag_compute_perfect: bool, flag_compute_actual: bool,
-        flag_recompute: bool) -> None:
+        flag_recompute: bool, run_on: Runner = Runner.LOCAL) -> None:
     """Compute the marginal contribution.
 
     Args:
@@ -480,6 +728,8 @@ def compute_marginal_contribution(
              selector should be computed.
         flag_recompute: Flag indicating whether marginal contributions
             should be recalculated.
+        run_on: Where to construct the selectors for the actual portfolio selector.
+            Defaults to Runner.LOCAL.
     """
     performance_data_csv = PerformanceDataFrame(sgh.performance_data_csv_path)
     performance_measure =\
@@ -523,7 +773,8 @@ def compute_marginal_contribution(
         rank_list = compute_actual_selector_marginal_contribution(
             aggregation_function,
             capvalue_list, minimise,
-            flag_recompute=flag_recompute
+            flag_recompute=flag_recompute,
+            run_on=run_on
         )
         print_rank_list(rank_list, "actual selector")
         print("Marginal contribution (actual selector) computing done!")
@@ -7,6 +7,25 @@ from pathlib import Path
 from sparkle.platform import file_help as sfh
 
 
+def get_solver_variations(solver: str) -> tuple[str, int]:
+    """Return the solver and number of variations of a portfolio solver argument.
+
+    Args:
+        solver: A solver name, optionally followed by ",<#solver_variations>", or a
+            solver list entry of the solver name, whether it is deterministic and the
+            number of variations.
+
+    Returns:
+        The solver name and the number of variations, which is 1 if not given.
+    """
+    if solver.rfind(",") >= 0:
+        return solver[:solver.rfind(",")], int(solver[solver.rfind(",") + 1:])
+    solver_line = solver.strip().split()
+    if len(solver_line) == 3:
+        return solver_line[0], int(solver_line[2])
+    return solver, 1
+
+
 def add_solvers(sparkle_parallel_portfolio_path: Path, solver_list: list[str]) -> bool:
     """Create a file containing the list of solvers within the given portfolio path.
 
@@ -23,8 +42,7 @@ def add_solvers(sparkle_parallel_portfolio_path: Path, solver_list: list[str]) -
 
     for solver in solver_list:
         if solver.rfind(",") >= 0:
-            solver_name = solver[:solver.rfind(",")]
-            solver_n_instances = solver[solver.rfind(",") + 1:]
+            solver_name, solver_n_instances = get_solver_variations(solver)
             solver = f"{solver_name} {solver_n_instances}"
         solver = f"{solver}\n"
         sfh.write_string_to_file(solvers_file, solver, append=True)
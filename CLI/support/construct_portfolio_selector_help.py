@@ -4,114 +4,47 @@
 import subprocess
 import sys
 import shutil
-from pathlib import Path, PurePath
+from pathlib import Path
 
 import global_variables as sgh
 from sparkle.platform import file_help as sfh
+from sparkle.platform import fingerprint_help as sfph
 from sparkle.structures import feature_data_csv_help as sfdcsv
 from sparkle.structures.performance_dataframe import PerformanceDataFrame
-from CLI.support import run_solvers_help as srsh
-from sparkle.instance import compute_features_help as scfh
 import sparkle_logging as sl
 from sparkle.types.objective import PerformanceMeasure
 
 
-def data_unchanged(sparkle_portfolio_selector_path: Path) -> bool:
+def data_unchanged(sparkle_portfolio_selector_path: Path, fingerprint: str) -> bool:
     """Return whether data has changed since the last portfolio selector construction.
 
     Args:
         sparkle_portfolio_selector_path: Portfolio selector path.
+        fingerprint: Fingerprint of the current data, see get_selector_fingerprint.
 
     Returns:
-        True if neither performance data id and feature data id remain the same.
+        True if the selector exists and was constructed from the same data.
     """
-    pd_id = srsh.get_performance_data_id()
-    fd_id = scfh.get_feature_data_id()
-    selector_dir = sparkle_portfolio_selector_path.parent
-    selector_pd_id = get_selector_pd_id(selector_dir)
-    selector_fd_id = get_selector_fd_id(selector_dir)
+    return sfph.fingerprint_unchanged(sparkle_portfolio_selector_path, fingerprint)
 
-    return pd_id == selector_pd_id and fd_id == selector_fd_id
 
+def get_selector_fingerprint(performance_data: PerformanceDataFrame,
+                             feature_data: sfdcsv.SparkleFeatureDataCSV) -> str:
+    """Return a fingerprint of the data and settings a selector is constructed from.
 
-def write_selector_pd_id(sparkle_portfolio_selector_path: Path) -> None:
-    """Write the ID of the performance data used to construct the portfolio selector.
+    Selectors constructed from data with the same fingerprint are interchangeable.
 
     Args:
-        sparkle_portfolio_selector_path: Portfolio selector path.
-    """
-    # Get pd_id
-    pd_id = srsh.get_performance_data_id()
-
-    # Write pd_id
-    pd_id_path = Path(sparkle_portfolio_selector_path.parent / "pd.id")
-
-    with pd_id_path.open("w") as pd_id_file:
-        pd_id_file.write(str(pd_id))
-
-        # Add file to log
-        sl.add_output(str(pd_id_path), "ID of the performance data used to construct "
-                      "the portfolio selector.")
-
-
-def get_selector_pd_id(selector_dir: PurePath) -> int:
-    """Return the ID of the performance data used to construct the portfolio selector.
-
-    Args:
-        selector_dir: Selector directory path.
+        performance_data: The performance data of the solvers in the selector.
+        feature_data: The feature data of the instances, with missing values imputed.
 
     Returns:
-        Selector performance data ID, -1 if no file with a saved ID is found.
+        The fingerprint as a hexadecimal string.
     """
-    pd_id_path = Path(selector_dir / "pd.id")
-
-    try:
-        with pd_id_path.open("r") as pd_id_file:
-            pd_id = int(pd_id_file.readline())
-    except FileNotFoundError:
-        pd_id = -1
-
-    return pd_id
-
-
-def write_selector_fd_id(sparkle_portfolio_selector_path: Path) -> None:
-    """Write the ID of the feature data used to construct the portfolio selector.
-
-    Args:
-        sparkle_portfolio_selector_path: Portfolio selector path.
-    """
-    # Get fd_id
-    fd_id = scfh.get_feature_data_id()
-
-    # Write fd_id
-    fd_id_path = Path(sparkle_portfolio_selector_path.parent / "fd.id")
-
-    with fd_id_path.open("w") as fd_id_file:
-        fd_id_file.write(str(fd_id))
-
-        # Add file to log
-        sl.add_output(str(fd_id_path),
-                      "ID of the feature data used to construct the portfolio selector.")
-
-
-def get_selector_fd_id(selector_dir: PurePath) -> int:
-    """Return the ID of the feature data used to construct the portfolio selector.
-
-    Args:
-        selector_dir: Selector directory path.
-
-    Returns:
-        Selector feature data ID, -1 if no file with a saved ID is found.
-    """
-    fd_id_path = Path(selector_dir / "fd.id")
-
-    try:
-        with fd_id_path.open("r") as fd_id_file:
-            fd_id = int(fd_id_file.readline())
-    except FileNotFoundError:
-        fd_id = -1
-
-    return fd_id
+    perf_measure = sgh.settings.get_general_sparkle_objectives()[0].PerformanceMeasure
+    return sfph.get_fingerprint(performance_data.dataframe, feature_data.dataframe,
+                                sgh.settings.get_general_target_cutoff_time(),
+                                perf_measure.name)
 
 
 def construct_sparkle_portfolio_selector(selector_path: Path,
@@ -130,9 +63,17 @@ def construct_sparkle_portfolio_selector(selector_path: Path,
     Returns:
         True if portfolio construction is successful.
     """
+    # The selector is constructed from the feature data with missing values imputed
+    feature_data_csv = sfdcsv.SparkleFeatureDataCSV(feature_data_csv_path)
+    bool_exists_missing_value = feature_data_csv.bool_exists_missing_value()
+    if bool_exists_missing_value:
+        feature_data_csv.impute_missing_value_of_all_columns()
+    performance_data = PerformanceDataFrame(performance_data_csv_path)
+    fingerprint = get_selector_fingerprint(performance_data, feature_data_csv)
+
     # If the selector exists and the data didn't change, do nothing;
     # unless the recompute flag is set
-    if selector_path.exists() and data_unchanged(selector_path) and not flag_recompute:
+    if data_unchanged(selector_path, fingerprint) and not flag_recompute:
         print("Portfolio selector already exists for the current feature and performance"
               " data.")
 
@@ -171,16 +112,10 @@ def construct_sparkle_portfolio_selector(selector_path: Path,
     if not Path(r"Tmp/").exists():
         Path(r"Tmp/").mkdir()
 
-    feature_data_csv = sfdcsv.SparkleFeatureDataCSV(feature_data_csv_path)
-    bool_exists_missing_value = feature_data_csv.bool_exists_missing_value()
-
     if bool_exists_missing_value:
+        strategy = sgh.settings.get_general_feature_imputation_strategy()
         print("****** WARNING: There are missing values in the feature data, and all "
-              "missing values will be imputed as the mean value of all other non-missing"
-              " values! ******")
-        print("Imputing all missing values starts ...")
-        feature_data_csv.impute_missing_value_of_all_columns()
-        print("Imputing all missing values done!")
+              f"missing values were imputed with strategy {strategy.name}! ******")
         impute_feature_data_csv_path = (
             f"{feature_data_csv_path}_{sgh.get_time_pid_random_string()}"
             "_impute.csv")
@@ -191,12 +126,17 @@ def construct_sparkle_portfolio_selector(selector_path: Path,
     err_file = selector_path.parent.name + "_autofolio.err"
     log_path_str = str(Path(sl.caller_log_dir / log_file))
     err_path_str = str(Path(sl.caller_log_dir / err_file))
-    performance_data = PerformanceDataFrame(performance_data_csv_path)
     pf_data_autofolio_path = performance_data.to_autofolio()
-    cmd_list = [python_executable, sgh.autofolio_path, "--performance_csv",
-                str(pf_data_autofolio_path), "--feature_csv", feature_data_csv_path,
+    # AutoFolio writes its tuning files to its working directory, give each
+    # construction its own so selectors can be constructed at the same time
+    autofolio_dir = (Path(sgh.sparkle_tmp_path)
+                     / f"autofolio_{sgh.get_time_pid_random_string()}").absolute()
+    autofolio_dir.mkdir(parents=True)
+    cmd_list = [python_executable, str(Path(sgh.autofolio_path).absolute()),
+                "--performance_csv", str(pf_data_autofolio_path.absolute()),
+                "--feature_csv", str(Path(feature_data_csv_path).absolute()),
                 objective_function, "--runtime_cutoff", cutoff_time_str, "--tune",
-                "--save", str(selector_path)]
+                "--save", str(selector_path.absolute())]
     # Write command line to log
     print("Running command below:\n", " ".join(cmd_list), file=open(log_path_str, "a+"))
     sl.add_output(log_path_str, "Command line used to construct portfolio through "
@@ -206,8 +146,9 @@ def construct_sparkle_portfolio_selector(selector_path: Path,
 
     process = subprocess.run(cmd_list,
                              stdout=Path(log_path_str).open("w+"),
-                             stderr=Path(err_path_str).open("w+"))
-    sfh.rmfiles("runhistory.json")
+                             stderr=Path(err_path_str).open("w+"),
+                             cwd=autofolio_dir)
+    shutil.rmtree(autofolio_dir, ignore_errors=True)
 
     if bool_exists_missing_value:
         sfh.rmfiles(impute_feature_data_csv_path)
@@ -220,11 +161,10 @@ def construct_sparkle_portfolio_selector(selector_path: Path,
         print("Error output log:", err_path_str)
         sys.exit(-1)
 
-    # Remove the data copy for AutoFolio
-    pf_data_autofolio_path.unlink()
-    # Update data IDs associated with this selector
-    write_selector_pd_id(selector_path)
-    write_selector_fd_id(selector_path)
+    # Store the fingerprint of the data this selector is constructed from
+    sfph.write_fingerprint(selector_path, fingerprint)
+    sl.add_output(str(sfph.get_fingerprint_path(selector_path)),
+                  "Fingerprint of the data used to construct the portfolio selector.")
 
     # If we reach this point portfolio construction should be successful
     return True
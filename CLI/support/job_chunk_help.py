@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Helper functions to pack short runs into chunks that run as a single parallel job.
+
+With small cutoff times a job per run spends most of its allocation on scheduling and
+start-up. A chunk runs its runs one after another in a single job instead.
+"""
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+
+import runrunner as rrr
+from runrunner.base import Runner
+
+import global_variables as sgh
+from sparkle.platform import slurm_help as ssh
+
+
+_chunk_runner_path = Path("CLI/core/run_job_chunk.py")
+_chunk_remover_path = Path("CLI/core/remove_job_chunks.py")
+
+
+def get_chunk_size(run_time: float) -> int:
+    """Return the number of runs that fit in a chunk.
+
+    Args:
+        run_time: The worst case time of a single run in seconds.
+
+    Returns:
+        The number of runs of which the summed worst case time fits the job chunk
+        duration setting, at least 1.
+    """
+    chunk_duration = sgh.settings.get_general_job_chunk_duration()
+    if chunk_duration <= 0 or run_time <= 0:
+        return 1
+    return max(1, int(chunk_duration // run_time))
+
+
+def pack_commands(cmd_list: list[str], run_time: float, chunk_dir: Path) -> list[str]:
+    """Pack the commands of runs into chunks, each run by a single command.
+
+    Args:
+        cmd_list: The commands of the runs, in the order to run them in.
+        run_time: The worst case time of a single run in seconds.
+        chunk_dir: Directory to write the chunks to.
+
+    Returns:
+        The commands that run the chunks, or the original commands if only one run
+        fits in a chunk.
+    """
+    chunk_size = get_chunk_size(run_time)
+    if chunk_size <= 1:
+        return cmd_list
+    chunk_dir.mkdir(parents=True, exist_ok=True)
+    packed_cmd_list = []
+    for index in range(0, len(cmd_list), chunk_size):
+        chunk_path = chunk_dir / f"chunk_{index // chunk_size}.json"
+        chunk_path.write_text(json.dumps(cmd_list[index:index + chunk_size]))
+        # Absolute paths, as the runs may have another working directory
+        packed_cmd_list.append(f"{_chunk_runner_path.absolute()} "
+                               f"--chunk {chunk_path.absolute()}")
+    return packed_cmd_list
+
+
+def remove_chunks(chunk_dir: Path) -> None:
+    """Remove the chunks of a run, and the record of their finished runs.
+
+    Only to be called once all chunks are done, as an interrupted chunk uses the
+    record to skip its finished runs when it is run again.
+
+    Args:
+        chunk_dir: Directory the chunks were written to.
+    """
+    shutil.rmtree(chunk_dir, ignore_errors=True)
+
+
+def remove_chunks_after_run(run: rrr.SlurmRun | rrr.LocalRun, chunk_dir: Path,
+                            run_on: Runner, name: str) -> None:
+    """Submit a job that removes the chunks of a run once all its jobs are done.
+
+    Args:
+        run: The run of the chunks.
+        chunk_dir: Directory the chunks were written to.
+        run_on: Where the run is executed.
+        name: Name of the run.
+    """
+    if not chunk_dir.exists():
+        # Only one run fitted in a chunk, so no chunks were written
+        return
+    rrr.add_to_queue(
+        runner=run_on,
+        cmd=f"{_chunk_remover_path} --chunks {chunk_dir}",
+        name=name,
+        dependencies=run,
+        base_dir=sgh.sparkle_tmp_path,
+        sbatch_options=ssh.get_slurm_options_list())
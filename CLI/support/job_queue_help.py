@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Helper functions for a job queue on disk shared by long-lived workers.
+
+Every job is a JSON file in the pending directory of the queue. A worker claims a job
+by renaming it into the claimed directory, which is atomic, so each job is claimed by
+exactly one worker without any locking. Jobs are claimed in the order they were given
+and workers keep claiming jobs until none are left, so faster workers take over the
+work that remains.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from collections import deque
+from pathlib import Path
+from typing import Iterator
+
+
+_pending_dir_name = "pending"
+_claimed_dir_name = "claimed"
+_job_suffix = ".job"
+
+
+def create_job_queue(queue_path: Path, jobs: list[dict]) -> Path:
+    """Create a queue on disk with the given jobs.
+
+    Args:
+        queue_path: Directory to create the queue in.
+        jobs: The jobs, as JSON serialisable dictionaries.
+
+    Returns:
+        The path to the queue.
+    """
+    queue_path = Path(queue_path)
+    pending_path = queue_path / _pending_dir_name
+    pending_path.mkdir(parents=True, exist_ok=True)
+    (queue_path / _claimed_dir_name).mkdir(exist_ok=True)
+    n_digits = len(str(len(jobs)))
+    for index, job in enumerate(jobs):
+        job_name = f"{str(index).zfill(n_digits)}{_job_suffix}"
+        # Write next to the pending jobs, so workers never see a partial job
+        tmp_job_path = queue_path / job_name
+        tmp_job_path.write_text(json.dumps(job))
+        tmp_job_path.replace(pending_path / job_name)
+    return queue_path
+
+
+def get_pending_job_names(queue_path: Path) -> list[str]:
+    """Return the names of the jobs that have not been claimed yet, in queue order."""
+    return sorted(name for name in os.listdir(Path(queue_path) / _pending_dir_name)
+                  if name.endswith(_job_suffix))
+
+
+def claim_job(queue_path: Path, worker_id: int,
+              job_names: deque[str] = None) -> tuple[Path, dict] | None:
+    """Claim the pending job with the smallest name, which is the first in the queue.
+
+    Args:
+        queue_path: Path to the queue.
+        worker_id: Identifier of the claiming worker.
+        job_names: Names of pending jobs to try in order, as listed before by
+            get_pending_job_names. Names are taken off the front until a job is
+            claimed, so a worker lists the queue only once for many claims. If None,
+            the pending jobs are listed.
+
+    Returns:
+        The path of the claimed job and the job, or None if no jobs are left.
+    """
+    if job_names is None:
+        job_names = deque(get_pending_job_names(queue_path))
+    pending_path = Path(queue_path) / _pending_dir_name
+    claimed_path = Path(queue_path) / _claimed_dir_name
+    while job_names:
+        job_name = job_names.popleft()
+        job_path = claimed_path / f"{job_name}.{worker_id}"
+        try:
+            (pending_path / job_name).rename(job_path)
+        except FileNotFoundError:
+            # Claimed by another worker in the meantime
+            continue
+        return job_path, json.loads(job_path.read_text())
+    return None
+
+
+def complete_job(job_path: Path) -> None:
+    """Remove a claimed job from the queue once it is done."""
+    Path(job_path).unlink(missing_ok=True)
+
+
+def release_claimed_jobs(queue_path: Path, worker_id: int) -> None:
+    """Return the unfinished jobs of a worker to the pending jobs.
+
+    A worker that is restarted first releases the jobs it claimed before, so they are
+    not lost.
+
+    Args:
+        queue_path: Path to the queue.
+        worker_id: Identifier of the worker.
+    """
+    worker_suffix = f".{worker_id}"
+    pending_path = Path(queue_path) / _pending_dir_name
+    for job_path in (Path(queue_path) / _claimed_dir_name).iterdir():
+        if job_path.name.endswith(worker_suffix):
+            job_path.replace(pending_path / job_path.name[:-len(worker_suffix)])
+
+
+def iterate_jobs(queue_path: Path, worker_id: int) -> Iterator[dict]:
+    """Claim and yield jobs of the queue until it is empty.
+
+    A job is completed when the next job is requested.
+
+    Args:
+        queue_path: Path to the queue.
+        worker_id: Identifier of the worker.
+
+    Returns:
+        An iterator over the jobs claimed by this worker.
+    """
+    release_claimed_jobs(queue_path, worker_id)
+    job_names = deque()
+    while True:
+        claimed = claim_job(queue_path, worker_id, job_names)
+        if claimed is None:
+            # List again, jobs may have been released by a restarted worker
+            job_names.extend(get_pending_job_names(queue_path))
+            if not job_names:
+                return
+            continue
+        job_path, job = claimed
+        yield job
+        complete_job(job_path)
+
+
+def get_number_of_pending_jobs(queue_path: Path) -> int:
+    """Return the number of jobs that have not been claimed yet."""
+    return len(get_pending_job_names(queue_path))
+
+
+def remove_job_queue(queue_path: Path) -> list[dict]:
+    """Remove a queue once all its workers have stopped.
+
+    Args:
+        queue_path: Path to the queue.
+
+    Returns:
+        The jobs that were not done, either never claimed or claimed by a worker that
+        stopped before completing them, in queue order.
+    """
+    queue_path = Path(queue_path)
+    unfinished = []
+    for dir_name in (_claimed_dir_name, _pending_dir_name):
+        if not (queue_path / dir_name).is_dir():
+            continue
+        for job_path in sorted((queue_path / dir_name).iterdir()):
+            unfinished.append(json.loads(job_path.read_text()))
+    shutil.rmtree(queue_path, ignore_errors=True)
+    return unfinished
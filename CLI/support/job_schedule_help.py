@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Helper functions to order parallel solver runs by their predicted duration.
+
+Runs are started longest first (longest-processing-time-first), so long runs do not
+start at the end of a parallel run while most parallel slots are already idle.
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+import global_variables as sgh
+from sparkle.platform import file_help as sfh
+from sparkle.structures.performance_dataframe import PerformanceDataFrame
+
+
+def predict_job_durations(performance_data: PerformanceDataFrame,
+                          jobs: list[tuple[str, str]],
+                          cutoff_time: float,
+                          runtime: bool = True) -> list[float]:
+    """Predict the duration of solver runs from the known performance data.
+
+    A known run time of the same solver on the same instance is used directly.
+    Otherwise the prediction is the mean run time of the solver, scaled by how much
+    harder the instance is than average for the other solvers. Runs without any
+    known run time of their solver or instance are predicted to take the cutoff time.
+
+    Args:
+        performance_data: The performance data of the jobs.
+        jobs: The jobs as (instance, solver) tuples.
+        cutoff_time: The cutoff time of each run.
+        runtime: Whether the performance data holds run times. If not, the data says
+            nothing about the duration and all runs are predicted to take the cutoff.
+
+    Returns:
+        The predicted duration of each job in seconds.
+    """
+    if not runtime:
+        return [float(cutoff_time)] * len(jobs)
+    instances, cube = performance_data.get_objective_cube()
+    with warnings.catch_warnings():
+        # Solvers and instances without any known run time give empty means
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        # Penalised run times exceed the cutoff, but a run never takes longer
+        times = np.minimum(np.nanmean(cube, axis=1), cutoff_time)
+        known = ~np.isnan(times)
+        solver_mean = np.nansum(times, axis=0) / known.sum(axis=0)
+        instance_mean = np.nansum(times, axis=1) / known.sum(axis=1)
+        overall_mean = np.nansum(times) / known.sum()
+        predicted = np.outer(instance_mean, solver_mean) / overall_mean
+    # Fall back to the solver or instance mean when only one of them is known
+    predicted = np.where(np.isnan(predicted), solver_mean[np.newaxis, :], predicted)
+    predicted = np.where(np.isnan(predicted), instance_mean[:, np.newaxis], predicted)
+    predicted = np.where(known, times, predicted)
+    predicted = np.nan_to_num(np.minimum(predicted, cutoff_time), nan=cutoff_time)
+
+    instance_pos = {instance: pos for pos, instance in enumerate(instances)}
+    solver_pos = {solver: pos
+                  for pos, solver in enumerate(performance_data.dataframe.columns)}
+    return [float(predicted[instance_pos[instance], solver_pos[solver]])
+            for instance, solver in jobs]
+
+
+def get_instance_size(instance_path: str) -> int:
+    """Return the size in bytes of an instance, which may consist of several files."""
+    size = 0
+    for path in instance_path.split():
+        try:
+            size += os.path.getsize(path)
+        except OSError:
+            pass
+    return size
+
+
+def order_jobs_longest_first(jobs: list[tuple[str, str]],
+                             durations: list[float]) \
+        -> tuple[list[tuple[str, str]], list[float]]:
+    """Order jobs by decreasing predicted duration.
+
+    Jobs with equal predicted durations are ordered by decreasing instance size.
+
+    Args:
+        jobs: The jobs as (instance, solver) tuples.
+        durations: The predicted duration of each job.
+
+    Returns:
+        The ordered jobs and their predicted durations.
+    """
+    sizes = {instance: get_instance_size(instance) for instance, _ in jobs}
+    order = sorted(range(len(jobs)),
+                   key=lambda i: (-durations[i], -sizes[jobs[i][0]]))
+    return [jobs[i] for i in order], [durations[i] for i in order]
+
+
+def get_predicted_makespan(durations: list[float], n_parallel: int) -> float:
+    """Return the makespan of starting jobs in order on the first free parallel slot.
+
+    Args:
+        durations: The predicted duration of each job, in the order they are started.
+        n_parallel: The number of jobs that run in parallel.
+
+    Returns:
+        The predicted time until all jobs are done.
+    """
+    if len(durations) == 0:
+        return 0.0
+    slot_end_times = [0.0] * max(1, min(n_parallel, len(durations)))
+    for duration in durations:
+        heapq.heappush(slot_end_times, heapq.heappop(slot_end_times) + duration)
+    return max(slot_end_times)
+
+
+def write_schedule(schedule_path: Path, predicted_makespan: float, n_jobs: int,
+                   n_parallel: int) -> None:
+    """Record the predicted makespan of a parallel run at the moment it is submitted.
+
+    Args:
+        schedule_path: Path to write the schedule to.
+        predicted_makespan: The predicted makespan in seconds.
+        n_jobs: The number of jobs of the run.
+        n_parallel: The number of jobs that run in parallel.
+    """
+    schedule_path.parent.mkdir(parents=True, exist_ok=True)
+    schedule_path.write_text(json.dumps({"predicted_makespan": predicted_makespan,
+                                         "n_jobs": n_jobs,
+                                         "n_parallel": n_parallel,
+                                         "submit_time": time.time()}))
+
+
+def report_makespan(schedule_path: Path) -> tuple[float, float]:
+    """Report the predicted and achieved makespan of a finished parallel run.
+
+    The achieved makespan is the time from submitting the run until now, so this is
+    meant to be called directly after the last job of the run. The report is printed
+    and written to the Sparkle system log, and the schedule is removed.
+
+    Args:
+        schedule_path: Path to the schedule written when the run was submitted.
+
+    Returns:
+        The predicted and achieved makespan in seconds.
+    """
+    schedule = json.loads(schedule_path.read_text())
+    predicted = schedule["predicted_makespan"]
+    achieved = time.time() - schedule["submit_time"]
+    report = (f"[Parallel run of {schedule['n_jobs']} job(s) on "
+              f"{schedule['n_parallel']} parallel slot(s)], "
+              f"[Predicted makespan: {predicted:.2f} second(s)], "
+              f"[Achieved makespan: {achieved:.2f} second(s)]")
+    print(report)
+    sfh.write_string_to_file(sgh.sparkle_system_log_path, report, append=True)
+    schedule_path.unlink()
+    return predicted, achieved
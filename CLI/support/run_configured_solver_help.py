@@ -10,6 +10,7 @@ from runrunner.base import Runner
 
 import global_variables as sgh
 from CLI.help.command_help import CommandName
+from CLI.support import job_chunk_help as sjch
 from sparkle.platform import slurm_help as ssh
 from sparkle.instance import instances_help as sih
 from sparkle.solver.solver import Solver
@@ -127,7 +128,6 @@ def call_configured_solver_parallel(
         if isinstance(value, list):
             instances_list[index] = " ".join([str(path) for path in value])
 
-    num_jobs = len(instances_list)
     custom_cutoff = sgh.settings.get_general_target_cutoff_time()
     cmd_list = []
     for instance_path in instances_list:
@@ -154,6 +154,11 @@ def call_configured_solver_parallel(
         solver_cmd[-1] = solver_cmd[-1].replace("'", '"')
         cmd_list.append(" ".join(solver_cmd))
 
+    # Pack short runs into chunks of several runs
+    chunk_dir = (Path(sgh.sparkle_tmp_path)
+                 / f"Job_Chunks_{sgh.get_time_pid_random_string()}")
+    cmd_list = sjch.pack_commands(cmd_list, custom_cutoff, chunk_dir)
+
     sbatch_options = ssh.get_slurm_options_list()
     srun_options = ["-N1", "-n1"]
     srun_options.extend(ssh.get_slurm_options_list())
@@ -163,7 +168,7 @@ def call_configured_solver_parallel(
         runner=run_on,
         cmd=cmd_list,
         name=CommandName.RUN_CONFIGURED_SOLVER,
-        parallel_jobs=num_jobs,
+        parallel_jobs=len(cmd_list),
         base_dir=sgh.sparkle_tmp_path,
         path=solver.raw_output_directory,
         sbatch_options=sbatch_options,
@@ -171,7 +176,10 @@ def call_configured_solver_parallel(
 
     if run_on == Runner.LOCAL:
         run.wait()
+        sjch.remove_chunks(chunk_dir)
     else:
+        sjch.remove_chunks_after_run(run, chunk_dir, run_on,
+                                     CommandName.RUN_CONFIGURED_SOLVER)
         print(f"Configured solver added to {run_on} queue.")
 
     return run
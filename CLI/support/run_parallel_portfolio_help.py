@@ -1,14 +1,18 @@
 #!/usr/bin/env python3
 # -*- coding: UTF-8 -*-
 """Helper functions for the execution of a parallel portfolio."""
+from __future__ import annotations
+import asyncio
 import shutil
 import os
+import re
+import shlex
+import signal
 import subprocess
+import time
 import datetime
 import fcntl
-import glob
-import sys
-import time
+import itertools
 from pathlib import Path
 from pathlib import PurePath
 
@@ -19,6 +23,7 @@ from sparkle.platform import file_help as sfh
 import global_variables as sgh
 import sparkle_logging as slog
 from sparkle.platform import slurm_help as ssh
+from CLI.support import run_solvers_help as srs
 from sparkle.platform.settings_help import ProcessMonitoring
 from sparkle.types.objective import PerformanceMeasure
 from CLI.help.command_help import CommandName
@@ -27,6 +32,18 @@ import functools
 print = functools.partial(print, flush=True)
 
 
+# Seconds between checks for new results of a running portfolio, growing while there
+# are none, and the minimum seconds between queries of the scheduler
+_min_poll_interval = 0.5
+_max_poll_interval = 8.0
+_scheduler_query_interval = 15.0
+# Seconds between checks for results of members running locally, and the seconds a
+# stopped member gets to exit before it is killed
+_min_local_poll_interval = 0.05
+_max_local_poll_interval = 0.5
+_kill_grace_period = 2.0
+
+
 def jobtime_to_seconds(jobtime: str) -> int:
     """Convert a jobtime string to an integer number of seconds.
 
@@ -102,7 +119,8 @@ def remove_temp_files_unfinished_solvers(solver_instance_list: list[str],
 
     Args:
         solver_instance_list: List of solver instances.
-        sbatch_script_path: Path to the sbatch script.
+        sbatch_script_path: Path to the sbatch script, None if the portfolio ran
+            locally.
         temp_solvers: A list of temporary solvers.
     """
     tmp_dir = sgh.sparkle_tmp_path
@@ -112,21 +130,22 @@ def remove_temp_files_unfinished_solvers(solver_instance_list: list[str],
         shutil.rmtree(f"{sgh.pap_sbatch_tmp_path}/{solver_instance}", ignore_errors=True)
 
     # Removes the generated sbatch files
-    sbatch_script_path.unlink()
-
-    # Removes the directories generated for the solver instances
-    for temp_solver in temp_solvers:
-        for directories in os.listdir(tmp_dir):
-            directories_path = f"{tmp_dir}{directories}"
-
-            for solver_instance in solver_instance_list:
-                if (Path(directories_path).is_dir()
-                        and directories.startswith(
-                            solver_instance[:len(temp_solver) + 1])):
-                    shutil.rmtree(directories_path)
+    if sbatch_script_path is not None:
+        sbatch_script_path.unlink()
+
+    # Removes the directories generated for the solver instances, listing the
+    # temporary directory only once for all of them
+    directory_prefixes = tuple(solver_instance[:len(temp_solver) + 1]
+                               for temp_solver in temp_solvers
+                               for solver_instance in solver_instance_list)
+    for directories in os.listdir(tmp_dir):
+        directories_path = f"{tmp_dir}{directories}"
+        if (directories.startswith(directory_prefixes)
+                and Path(directories_path).is_dir()):
+            shutil.rmtree(directories_path)
 
     # Removes or moves all remaining files
-    list_of_paths = os.listdir(tmp_dir)
+    list_of_paths = set(os.listdir(tmp_dir))
     to_be_deleted = list()
     to_be_moved = list()
 
@@ -158,391 +177,399 @@ def remove_temp_files_unfinished_solvers(solver_instance_list: list[str],
             Path(path_from).unlink(missing_ok=True)
 
 
-def find_finished_time_finished_solver(solver_instance_list: list[str],
-                                       finished_job_array_nr: str) -> str:
-    """Return the time at which a solver finished.
+def get_member_key(instance_path: str, solver_path: str) \
+        -> tuple[str, int | None, str]:
+    """Return the key of the portfolio member that wrote a result.
 
-    If there is a solver that ended but did not make a result file this means that it
-    was manually cancelled or it gave an error the template will ensure that all
-    solver on that instance will be cancelled.
     Args:
-        solver_instance_list: List of solver instances.
-        finished_job_array_nr: The Slurm array number of the finished job.
+        instance_path: The instance as written in the result file.
+        solver_path: The solver as written in the result file. Seeded members run
+            from a solver copy in a directory named after the seed.
 
     Returns:
-        A formatted string that represents the finishing time of a solver.
+        The solver name, seed (None for members without a seed) and instance name.
     """
-    time_in_format_str = "-1:00"
-    solutions_dir = sgh.pap_performance_data_tmp_path
-    results = sfh.get_list_all_extensions(solutions_dir, "result")
+    solver_path = Path(solver_path)
+    instance_name = Path(instance_path).name
+    seed_match = re.match(rf"{re.escape(solver_path.name)}_seed_(\d+)_",
+                          solver_path.parent.name)
+    if seed_match is not None:
+        return (solver_path.name, int(seed_match.group(1)), instance_name)
+    return (solver_path.name, None, instance_name)
 
-    for result in results:
-        if "_" in finished_job_array_nr:
-            finished_job_array_nr = finished_job_array_nr[
-                finished_job_array_nr.rfind("_") + 1:]
 
-        if result.startswith(solver_instance_list[int(finished_job_array_nr)]):
-            result_file_path = solutions_dir / result
+def get_member_name(member: tuple[str, int | None, str]) -> str:
+    """Return the name of a portfolio member, as used for its temporary files.
+
+    Args:
+        member: The solver name, seed and instance name of the member.
 
-            with result_file_path.open("r") as result_file:
-                result_lines = result_file.readlines()
-                result_time = int(float(result_lines[2].strip()))
-                time_in_format_str = str(datetime.timedelta(seconds=result_time))
+    Returns:
+        The member name.
+    """
+    solver_name, seed, instance_name = member
+    if seed is not None:
+        return f"{solver_name}_seed_{seed}_{instance_name}"
+    return f"{solver_name}_{instance_name}"
 
-    return time_in_format_str
 
+def read_new_results(result_dir: Path, seen_results: set[str]) \
+        -> list[tuple[tuple[str, int | None, str], float]]:
+    """Return the member keys and times of result files that were not seen before.
 
-def cancel_remaining_jobs(logging_file: str, job_id: str,
-                          finished_solver_id_list: list[str],
-                          portfolio_size: int, solver_instance_list: list[str],
-                          pending_job_with_new_cutoff: dict[str, int] = {}
-                          ) -> tuple[dict[str, list[str]], dict[str, int]]:
-    """Cancel jobs past the cutoff, update cutoff time for jobs that should continue.
+    Result files that are not completely written yet are left for a next call.
 
     Args:
-        logging_file: Path to the logging file.
-        job_id: Job ID as str.
-        finished_solver_id_list: List of str typed job IDs of finished solvers.
-        portfolio_size: Size of parallel algorithm portfolio.
-        solver_instance_list: List of solver instances as str.
-        pending_job_with_new_cutoff: Dict with jobid str as key, and cutoff_seconds int
-            as value. Defaults to an empty dict.
+        result_dir: Directory the portfolio members write their result files to.
+        seen_results: Names of the result files that were read before. Updated with
+            the newly read result files.
 
     Returns:
-        remaining_jobs: A dict containing a jobid str as key, and a (two
-            element) list of str with the jobtime and jobstatus.
-        pending_job_with_new_cutoff: A dict of pending jobs with new cutoff time
-            (jobid str as key, and cutoff_seconds int as value).
+        The member key and time of each new result.
     """
-    # Find all job_array_numbers that are currently running
-    # This is specific to Slurm
-    result = subprocess.run(["squeue", "--array", "--jobs", job_id,
-                             "--format", "%.18i %.9P %.8j %.8u %.2t %.10M %.6D %R"],
-                            capture_output=True, text=True)
-    remaining_jobs = {}
-
-    for jobs in result.stdout.strip().split("\n"):
-        jobid = jobs.strip().split()[0]  # First squeue column is JOBID
-        jobtime = jobs.strip().split()[5]  # Sixth squeue column is TIME
-        jobstatus = jobs.strip().split()[4]  # Fifth squeue column is ST (status)
-
-        # If option extended is used some jobs are not directly cancelled to allow all
-        # jobs to compute for at least the same running time.
-        if (sgh.settings.get_paraport_process_monitoring()
-                == ProcessMonitoring.EXTENDED):
-            # If a job in a portfolio with a finished solver starts running its timelimit
-            # needs to be updated.
-            if jobid in pending_job_with_new_cutoff and jobstatus == "R":
-                current_seconds = jobtime_to_seconds(jobtime)
-                sleep_time = pending_job_with_new_cutoff[jobid] - current_seconds
-                command_line = f"sleep {str(sleep_time)}; scancel {str(jobid)}"
-                add_log_statement_to_file(logging_file, command_line, jobtime)
-                pending_job_with_new_cutoff.pop(jobid)
-
-        if jobid.startswith(str(job_id)):
-            remaining_jobs[jobid] = [jobtime, jobstatus]
-
-    for job in remaining_jobs:
-        # Update all jobs in the same array segment as the finished job with its
-        # finishing time
-        for finished_solver_id in finished_solver_id_list:
-            # if job in the same array segment
-            if (int(int(job[job.find("_") + 1:]) / portfolio_size)
-                    == int(int(finished_solver_id) / portfolio_size)):
-                # If option extended is used some jobs are not directly cancelled to
-                # allow all jobs to compute for at least the same running time.
-                if (sgh.settings.get_paraport_process_monitoring()
-                        == ProcessMonitoring.EXTENDED):
-                    # Update the cutofftime of the to be cancelled job, if job if
-                    # already past that it automatically stops.
-                    new_cutoff_time = find_finished_time_finished_solver(
-                        solver_instance_list, finished_solver_id)
-                    current_seconds = jobtime_to_seconds(remaining_jobs[job][0])
-                    cutoff_seconds = jobtime_to_seconds(new_cutoff_time)
-                    actual_cutofftime = sgh.settings.get_general_target_cutoff_time()
-
-                    if (remaining_jobs[job][1] == "R"
-                            and int(cutoff_seconds) < int(actual_cutofftime)):
-                        if int(current_seconds) < int(cutoff_seconds):
-                            sleep_time = int(cutoff_seconds) - int(current_seconds)
-                            command_line = f"sleep {str(sleep_time)}; scancel {str(job)}"
-                            add_log_statement_to_file(logging_file, command_line,
-                                                      remaining_jobs[job][0])
-                        else:
-                            command_line = f"scancel {str(job)}"
-                            add_log_statement_to_file(logging_file, command_line,
-                                                      remaining_jobs[job][0])
-                            logging_file2 = (
-                                f'{logging_file[:logging_file.rfind(".")]}2.txt')
-                            log_computation_time(logging_file2, job, cutoff_seconds)
-                        # Shell is needed for admin rights to do scancel
-                        subprocess.Popen(command_line, shell=True)  # noqa # nosec
-                    else:
-                        pending_job_with_new_cutoff[job] = cutoff_seconds
-                else:
-                    command_line = f"scancel {str(job)}"
-                    add_log_statement_to_file(logging_file, command_line,
-                                              remaining_jobs[job][0])
-                    logging_file2 = logging_file[:logging_file.rfind(".")] + "2.txt"
-                    log_computation_time(logging_file2, job, "-1")
-                    # Shell is needed for admin rights to do scancel
-                    subprocess.Popen(command_line, shell=True)  # noqa # nosec
+    new_results = []
+    with os.scandir(result_dir) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".result") or entry.name in seen_results:
+                continue
+            lines = Path(entry.path).read_text().splitlines()
+            if len(lines) < 3:
+                continue
+            try:
+                result_time = float(lines[2].strip())
+            except ValueError:
+                continue
+            seen_results.add(entry.name)
+            new_results.append((get_member_key(lines[0], lines[1]), result_time))
+    return new_results
 
-    return remaining_jobs, pending_job_with_new_cutoff
 
+def index_results(new_results: list[tuple[tuple[str, int | None, str], float]],
+                  member_indices: dict[tuple[str, int | None, str], int],
+                  finished: dict[int, float]) -> list[tuple[int, float]]:
+    """Add new results to the index of finished members.
 
-def wait_for_finished_solver(
-        logging_file: str,
-        job_id: str,
-        solver_instance_list: list[str],
-        remaining_job_dict: dict[str, list[str]],
-        pending_job_with_new_cutoff: dict[str, int],
-        started: bool,
-        portfolio_size: int) -> tuple[list[str], dict[str, int], bool]:
-    """Wait for a solver to finish, then return which finished and which may still run.
+    Results of members that are not in the portfolio, or that already have a result,
+    are ignored.
 
     Args:
-        logging_file: Path to the logging file.
-        job_id: Job ID as string.
-        solver_instance_list: List of solver instances.
-        remaining_job_dict: Dict of remaining jobs (jobid str as key, and a list of str
-            as value).
-        pending_job_with_new_cutoff: Dict of pending jobs with new cutoff time
-            (jobid str as key, and cutoff_seconds int as value).
-        started: Boolean indicating whether the portfolio has started running.
-        portfolio_size: Size of the portfolio.
+        new_results: The member key and time of each new result.
+        member_indices: The index of each member, by member key.
+        finished: The time of each member with a result, by index. Updated with the
+            new results.
 
     Returns:
-        finished_solver_list: A list of str typed job IDs of finished solvers.
-        pending_job_with_new_cutoff: A dict with jobid str as key, and cutoff_seconds int
-            as value.
-        started: A bool indicating whether the PAP (parallel algorithm portfolio) has
-            started running.
+        The index and time of each member that newly finished.
     """
-    number_of_solvers = len(remaining_job_dict) if remaining_job_dict else portfolio_size
-    n_seconds = 1
-    done = False
-    # TODO: Fix weird situation. This starts as dict, later becomes a list...
-    current_solver_list = remaining_job_dict
-    finished_solver_list = list()
-    # TODO: This while loop is rather lengthy and chaotic. This should be refactored.
-    # Especially the output string handling of the subprocess should be more structured.
-    while not done:
-        # Ask the cluster for a list of all jobs which are currently running
-        result = subprocess.run(["squeue", "--array", "--jobs", job_id,
-                                 "--format", "%.18i %.9P %.8j %.8u %.2t %.10M %.6D %R"],
-                                capture_output=True, text=True)
-
-        # If none of the jobs on the cluster are running then nothing has to done yet,
-        # check back in n_seconds
-        if " R " not in str(result):
-            if len(result.stdout.strip().split("\n")) == 1:
-                done = True  # No jobs are remaining
-                break
-
-            time.sleep(n_seconds)  # No jobs have started yet;
-        # If the results are less than the number of solvers then this means that there
-        # are finished solvers(+1 becuase of the header of results)
-        elif len(result.stdout.strip().split("\n")) < (1 + number_of_solvers):
-            if started is False:  # Log starting time
-                now = datetime.datetime.now()
-                current_time = now.strftime("%H:%M:%S")
+    newly_finished = []
+    for member, result_time in new_results:
+        index = member_indices.get(member)
+        if index is None or index in finished:
+            continue
+        finished[index] = result_time
+        newly_finished.append((index, result_time))
+    return newly_finished
 
-                with Path(logging_file).open("a+") as outfile:
-                    fcntl.flock(outfile.fileno(), fcntl.LOCK_EX)
-                    outfile.write(f"starting time of portfolio: {current_time}\n")
 
-                started = True
+def get_scheduler_tasks(job_id: str) -> dict[int, tuple[str, int]]:
+    """Return the array tasks of a job that the scheduler still knows about.
 
-            unfinished_solver_list = list()
+    All tasks are queried with a single squeue call.
 
-            for jobs in result.stdout.strip().split("\n"):
-                jobid = jobs.strip().split()[0]
+    Args:
+        job_id: The Slurm job ID of the portfolio array.
 
-                if jobid.startswith(job_id):
-                    unfinished_solver_list.append(jobid[jobid.find("_") + 1:])
+    Returns:
+        The state and elapsed seconds of each remaining task, by array index.
+    """
+    result = subprocess.run(["squeue", "--array", "--noheader", "--jobs", job_id,
+                             "--format", "%i %t %M"], capture_output=True, text=True)
+    tasks = {}
+    for line in result.stdout.strip().splitlines():
+        task_id, state, jobtime = line.split()
+        index = task_id[task_id.rfind("_") + 1:]
+        if task_id.startswith(job_id) and index.isdigit():
+            tasks[int(index)] = (state, jobtime_to_seconds(jobtime))
+    return tasks
 
-            finished_solver_list = [item for item in current_solver_list
-                                    if item not in unfinished_solver_list]
 
-            for finished_solver in finished_solver_list:
-                new_cutoff_time = find_finished_time_finished_solver(
-                    solver_instance_list, finished_solver)
+def cancel_tasks(logging_file: str, job_id: str, indices: list[int]) -> None:
+    """Cancel array tasks of a job with a single scancel call.
 
-                if new_cutoff_time != "-1:00":
-                    log_statement = (f"{finished_solver} finished succesfully or "
-                                     "has reached the cutoff time")
-                    add_log_statement_to_file(logging_file, log_statement,
-                                              str(new_cutoff_time))
-                    logging_file2 = logging_file[:logging_file.rfind(".")] + r"2.txt"
-                    log_computation_time(logging_file2, finished_solver, new_cutoff_time)
+    Args:
+        logging_file: Path to the logging file.
+        job_id: The Slurm job ID of the portfolio array.
+        indices: Array indices of the tasks to cancel.
+    """
+    if len(indices) == 0:
+        return
+    task_ids = [f"{job_id}_{index}" for index in indices]
+    subprocess.run(["scancel", *task_ids], capture_output=True)
+    logging_file2 = logging_file[:logging_file.rfind(".")] + "2.txt"
+    for task_id in task_ids:
+        add_log_statement_to_file(logging_file, f"scancel {task_id}", "0")
+        log_computation_time(logging_file2, task_id, "-1")
 
-            done = True
-        # No jobs have finished but some jobs are running
-        else:
-            if started is False:  # Log starting time
-                now = datetime.datetime.now()
-                current_time = now.strftime("%H:%M:%S")
 
+async def monitor_parallel_portfolio(
+        logging_file: str,
+        job_id: str,
+        members: list[tuple[str, int | None, str]],
+        portfolio_size: int,
+        cancel_siblings: bool = True,
+        result_dir: Path = sgh.pap_performance_data_tmp_path) -> dict[int, float]:
+    """Follow a running portfolio until all of its members are done.
+
+    Finished members are found from the result files they write, checked often at
+    first and less often while nothing changes. The scheduler is only asked for the
+    remaining tasks in one call at a limited rate, to find members that ended without
+    a result and how long members have been running.
+
+    Args:
+        logging_file: Path to the logging file.
+        job_id: The Slurm job ID of the portfolio array.
+        members: Member keys, by array index. The members of the portfolio for an
+            instance have consecutive indices.
+        portfolio_size: Number of members per instance.
+        cancel_siblings: Whether to cancel the other members for an instance once one
+            of them is done. With extended process monitoring, they may first run as
+            long as the finished member did.
+        result_dir: Directory the members write their result files to.
+
+    Returns:
+        The time of each member with a result, by array index.
+    """
+    member_indices = {member: index for index, member in enumerate(members)}
+    n_members = len(members)
+    extended = (sgh.settings.get_paraport_process_monitoring()
+                == ProcessMonitoring.EXTENDED)
+    cutoff_time = float(sgh.settings.get_general_target_cutoff_time())
+    logging_file2 = logging_file[:logging_file.rfind(".")] + "2.txt"
+    seen_results = set()
+    finished = {}
+    # Members to be stopped, with the time they may run, for the extended monitoring
+    stopping = {}
+    done_groups = set()
+    poll_interval = _min_poll_interval
+    last_query = -_scheduler_query_interval
+    tasks = None
+    started = False
+    loop = asyncio.get_running_loop()
+
+    while True:
+        new_results = read_new_results(result_dir, seen_results)
+        to_cancel = []
+        for index, result_time in index_results(new_results, member_indices,
+                                                finished):
+            stopping.pop(index, None)
+            jobtime = str(datetime.timedelta(seconds=int(result_time)))
+            add_log_statement_to_file(
+                logging_file, f"{index} finished succesfully or has reached the "
+                "cutoff time", jobtime)
+            log_computation_time(logging_file2, str(index), jobtime)
+            group = index // portfolio_size
+            if not cancel_siblings or group in done_groups:
+                continue
+            done_groups.add(group)
+            siblings = [sibling for sibling in range(group * portfolio_size,
+                                                     min((group + 1) * portfolio_size,
+                                                         n_members))
+                        if sibling not in finished]
+            if extended and result_time < cutoff_time:
+                stopping.update((sibling, result_time) for sibling in siblings)
+            else:
+                to_cancel.extend(siblings)
+
+        if stopping and tasks is not None:
+            # Let members run as long as the finished member, from their elapsed time
+            for index, run_time in list(stopping.items()):
+                state, elapsed = tasks.get(index, ("", 0))
+                if state == "R":
+                    elapsed += int(loop.time() - last_query)
+                    if elapsed >= run_time:
+                        to_cancel.append(index)
+                    else:
+                        loop.call_later(run_time - elapsed, cancel_tasks,
+                                        logging_file, job_id, [index])
+                    stopping.pop(index)
+        cancel_tasks(logging_file, job_id, to_cancel)
+        if tasks is not None and len(tasks) == 0:
+            # All members are done, and their last results have been read
+            break
+
+        if new_results:
+            poll_interval = _min_poll_interval
+        else:
+            poll_interval = min(poll_interval * 2, _max_poll_interval)
+        if loop.time() - last_query >= _scheduler_query_interval:
+            tasks = get_scheduler_tasks(job_id)
+            last_query = loop.time()
+            if not started and any(state == "R" for state, _ in tasks.values()):
+                started = True
                 with Path(logging_file).open("a+") as outfile:
                     fcntl.flock(outfile.fileno(), fcntl.LOCK_EX)
-                    outfile.write(f"starting time of portfolio: {current_time}\n")
+                    outfile.write("starting time of portfolio: "
+                                  f"{datetime.datetime.now():%H:%M:%S}\n")
+            if len(tasks) == 0:
+                continue
+        await asyncio.sleep(poll_interval)
+
+    return finished
 
-                started = True
 
-            time.sleep(n_seconds)
-            current_solver_list = list()
-
-            # Check if the running jobs are from a portfolio which contain an already
-            # finished solver
-            for jobs in result.stdout.strip().split("\n"):
-                jobid = jobs.strip().split()[0]
-                jobtime = jobs.strip().split()[5]
-                jobstatus = jobs.strip().split()[4]
-
-                # If option extended is used some jobs are not directly cancelled to
-                # allow all jobs to compute for at least the same running time.
-                if (sgh.settings.get_paraport_process_monitoring()
-                        == ProcessMonitoring.EXTENDED):
-                    if jobid in pending_job_with_new_cutoff and jobstatus == "R":
-                        # Job is in a portfolio with a solver that already has finished
-                        # and has to be cancelled in the finishing time of that solver
-                        current_seconds = jobtime_to_seconds(jobtime)
-                        sleep_time = pending_job_with_new_cutoff[jobid] - current_seconds
-                        command_line = f"sleep {str(sleep_time)}; scancel {str(jobid)}"
-                        add_log_statement_to_file(logging_file, command_line, jobtime)
-                        pending_job_with_new_cutoff.pop(jobid)
-
-                if (jobid.startswith(job_id)):
-                    # add the job to the current solver list
-                    current_solver_list.append(jobid[jobid.find("_") + 1:])
-
-    return finished_solver_list, pending_job_with_new_cutoff, started
-
-
-def handle_waiting_and_removal_process(
-        instances: list[str],
+def _stop_member(process: subprocess.Popen, sig: signal.Signals) -> None:
+    """Send a signal to the process group of a member, with all processes it started."""
+    try:
+        os.killpg(process.pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+def run_parallel_portfolio_locally(
         logging_file: str,
-        job_id: str,
-        solver_instance_list: list[str],
-        sbatch_script_path: Path,
+        cmd_list: list[str],
+        members: list[tuple[str, int | None, str]],
         portfolio_size: int,
-        remaining_job_dict: dict[str, list[str]] = dict(),
-        finished_instances_dict: dict[str, list[str, int]] = dict(),
-        pending_job_with_new_cutoff: dict[str, int] = dict(),
-        started: bool = False) -> bool:
-    """Wait for solvers to finish running, and clean up after them.
+        result_dir: Path = sgh.pap_performance_data_tmp_path) -> dict[int, float]:
+    """Run the members of a portfolio on this machine, each on its own core.
+
+    All members for an instance start together. As soon as one of them reports a
+    result within the cutoff time the others are stopped, by signalling their process
+    groups so the solvers they started stop as well. When there are more cores than
+    members, the portfolios for several instances run side by side.
 
     Args:
-        instances: A list of instances.
         logging_file: Path to the logging file.
-        job_id: Job ID as string.
-        solver_instance_list: A list of solver instances.
-        sbatch_script_path: Path to sbatch script.
-        portfolio_size: Size of the portfolio.
-        remaining_job_dict: A dictionary of remaining jobs. Defaults to None.
-        finished_instances_dict: A dictionary of finished instances. Defaults to None.
-        pending_job_with_new_cutoff: A dictionary of pending jobs with new cutoff time.
-            Defaults to None.
-        started: A boolean value indicating whether the process has started. Defaults to
-            False.
+        cmd_list: Command of each member, by index.
+        members: Member keys, by index. The members of the portfolio for an instance
+            have consecutive indices.
+        portfolio_size: Number of members per instance.
+        result_dir: Directory the members write their result files to.
 
     Returns:
-        True on success, may stop program execution early for failure.
+        The time of each member with a result, by index.
     """
-    if len(remaining_job_dict) > 0:
-        print(f"A job has ended, remaining jobs = {str(len(remaining_job_dict))}")
-
-    if not finished_instances_dict:
-        for instance in instances:
-            finished_instances_dict[Path(instance).name] = ["UNSOLVED", 0]
-
-    perf_data_tmp_path = sgh.pap_performance_data_tmp_path
-
-    # For each finished instance
-    for instance in finished_instances_dict:
-        # Only look at solvers for this instance
-        current_sol_inst_list = [si for si in solver_instance_list if instance in si]
-        # Check results for each solver
-        for solver_instance in current_sol_inst_list:
-            finished_solver_files = glob.glob(f"{str(perf_data_tmp_path)}/*"
-                                              f"{solver_instance}*result")
-
-            # If there is more than one result file for this solver-instance combination
-            # something went wrong (probably during cleanup).
-            if len(finished_solver_files) > 1:
-                print(f"ERROR: {str(len(finished_solver_files))} result files found for"
-                      f" {solver_instance} while there should be only one!")
-                sys.exit(-1)
-
-            for finished_solver_file in finished_solver_files:
-                file_path = finished_solver_file
-
-                with Path(file_path).open("r") as infile:
-                    content = infile.readlines()
-
-                solving_time = float(content[2].strip())
-
-                # A new instance is solved
-                if (finished_instances_dict[instance][1] == float(0)):
-                    finished_instances_dict[instance][1] = solving_time
-
-                    if (solving_time
-                            > float(sgh.settings.get_general_target_cutoff_time())):
-                        print(f"{str(instance)} has reached the cutoff time without "
-                              "being solved.")
-                    else:
-                        print(f"{str(instance)} has been solved in "
-                              f"{str(solving_time)} seconds!")
-
-                        temp_files = glob.glob(f"{sgh.sparkle_tmp_path}{solver_instance}"
-                                               f"*.rawres")
-
-                        for rawres_file_path in temp_files:
-                            with Path(rawres_file_path).open("r") as rawres_file:
-                                raw_content = rawres_file.readlines()
-
-                            nr_of_lines_raw_content = len(raw_content)
-
-                            for lines in range(nr_of_lines_raw_content):
-                                if "\ts " in raw_content[
-                                        nr_of_lines_raw_content - lines - 1]:
-                                    results_line = raw_content[
-                                        nr_of_lines_raw_content - lines - 1]
-                                    print("result = " + str(results_line[
-                                        results_line.find("s") + 2:].strip()))
-                                    finished_instances_dict[instance][0] = str(
-                                        results_line[results_line.find("s") + 2:].strip()
-                                    )
-                                    break
-
-                # A solver has an improved performance time on an instance
-                elif (float(finished_instances_dict[instance][1]) > solving_time):
-                    finished_instances_dict[instance][1] = solving_time
-                    print(f"{str(instance)} has been solved with an improved solving "
-                          f"time of {str(solving_time)} seconds!")
-
-    # Monitors the running jobs waiting for a solver that finishes
-    finished_solver_id_list, pending_job_with_new_cutoff, started = (
-        wait_for_finished_solver(
-            logging_file, job_id, solver_instance_list, remaining_job_dict,
-            pending_job_with_new_cutoff, started, portfolio_size))
-
-    # Handles the updating of all jobs within the portfolios of which contain a finished
-    # job
-    remaining_job_dict, pending_job_with_new_cutoff = cancel_remaining_jobs(
-        logging_file, job_id, finished_solver_id_list, portfolio_size,
-        solver_instance_list, pending_job_with_new_cutoff)
-
-    # If there are still unfinished jobs recursively handle the remaining jobs.
-    if len(remaining_job_dict) > 0:
-        handle_waiting_and_removal_process(instances, logging_file, job_id,
-                                           solver_instance_list, sbatch_script_path,
-                                           portfolio_size, remaining_job_dict,
-                                           finished_instances_dict,
-                                           pending_job_with_new_cutoff, started)
+    member_indices = {member: index for index, member in enumerate(members)}
+    n_members = len(members)
+    cutoff_time = float(sgh.settings.get_general_target_cutoff_time())
+    logging_file2 = logging_file[:logging_file.rfind(".")] + "2.txt"
+    cores = srs.get_available_cores()
+    n_slots = max(1, len(cores) // portfolio_size)
+    free_slots = list(range(n_slots - 1, -1, -1))
+    pending_groups = list(range((n_members - 1) // portfolio_size, -1, -1))
+    group_slots = {}
+    running = {}
+    stopped = {}
+    seen_results = set()
+    finished = {}
+    done_groups = set()
+    poll_interval = _min_local_poll_interval
+
+    with Path(logging_file).open("a+") as outfile:
+        fcntl.flock(outfile.fileno(), fcntl.LOCK_EX)
+        outfile.write("starting time of portfolio: "
+                      f"{datetime.datetime.now():%H:%M:%S}\n")
+
+    while pending_groups or running:
+        while pending_groups and free_slots:
+            group, slot = pending_groups.pop(), free_slots.pop()
+            group_slots[group] = slot
+            # With fewer cores than members, the members share the cores
+            slot_cores = itertools.islice(itertools.cycle(cores), slot * portfolio_size,
+                                          (slot + 1) * portfolio_size)
+            for index, core in zip(range(group * portfolio_size,
+                                         min((group + 1) * portfolio_size, n_members)),
+                                   slot_cores):
+                out_path = Path(sgh.sparkle_tmp_path,
+                                f"{get_member_name(members[index])}.out")
+                with out_path.open("w") as outfile:
+                    running[index] = subprocess.Popen(
+                        shlex.split(cmd_list[index]), stdout=outfile,
+                        stderr=subprocess.STDOUT, start_new_session=True,
+                        preexec_fn=(functools.partial(os.sched_setaffinity, 0, {core})
+                                    if hasattr(os, "sched_setaffinity") else None))
+
+        # Collect ended members before reading results, so none are missed
+        for index, process in list(running.items()):
+            if process.poll() is not None:
+                del running[index]
+                stopped.pop(index, None)
+        for group, slot in list(group_slots.items()):
+            if not any(index // portfolio_size == group for index in running):
+                del group_slots[group]
+                free_slots.append(slot)
+
+        new_results = read_new_results(result_dir, seen_results)
+        for index, result_time in index_results(new_results, member_indices,
+                                                finished):
+            jobtime = str(datetime.timedelta(seconds=int(result_time)))
+            add_log_statement_to_file(
+                logging_file, f"{index} finished succesfully or has reached the "
+                "cutoff time", jobtime)
+            log_computation_time(logging_file2, str(index), jobtime)
+            group = index // portfolio_size
+            if result_time > cutoff_time or group in done_groups:
+                continue
+            done_groups.add(group)
+            for sibling, process in running.items():
+                if (sibling // portfolio_size == group and sibling != index
+                        and sibling not in stopped):
+                    _stop_member(process, signal.SIGTERM)
+                    stopped[sibling] = time.monotonic() + _kill_grace_period
+                    add_log_statement_to_file(logging_file, f"kill {sibling}", "0")
+                    log_computation_time(logging_file2, str(sibling), "-1")
+        for index, deadline in stopped.items():
+            if time.monotonic() >= deadline:
+                _stop_member(running[index], signal.SIGKILL)
+
+        if new_results:
+            poll_interval = _min_local_poll_interval
+        else:
+            poll_interval = min(poll_interval * 2, _max_local_poll_interval)
+        if running:
+            time.sleep(poll_interval)
 
-    return True
+    return finished
+
+
+def get_best_members(finished: dict[int, float], portfolio_size: int) \
+        -> dict[int, int]:
+    """Return the member with the best result for each instance of a portfolio.
+
+    Args:
+        finished: The time of each member with a result, by index.
+        portfolio_size: Number of members per instance.
+
+    Returns:
+        The index of the best member, by instance index.
+    """
+    best = {}
+    for index, result_time in finished.items():
+        group = index // portfolio_size
+        if group not in best or result_time < finished[best[group]]:
+            best[group] = index
+    return best
+
+
+def print_instance_results(members: list[tuple[str, int | None, str]],
+                           portfolio_size: int,
+                           finished: dict[int, float]) -> None:
+    """Print the best time per instance of a finished portfolio.
+
+    Args:
+        members: Member keys, by array index.
+        portfolio_size: Number of members per instance.
+        finished: The time of each member with a result, by array index.
+    """
+    cutoff_time = float(sgh.settings.get_general_target_cutoff_time())
+    best = get_best_members(finished, portfolio_size)
+    for group, index in sorted(best.items()):
+        solver_instance = get_member_name(members[index])
+        if finished[index] > cutoff_time:
+            print(f"{solver_instance} has reached the cutoff time without being "
+                  "solved.")
+        else:
+            print(f"{solver_instance} has been solved in {finished[index]} seconds!")
 
 
 def remove_result_files(instances: list[str]) -> None:
@@ -551,13 +578,12 @@ def remove_result_files(instances: list[str]) -> None:
     Args:
         instances: List of instance names.
     """
+    # List the directories once for all instances
+    result_files = (list(sgh.pap_performance_data_tmp_path.iterdir())
+                    + list(Path(sgh.sparkle_tmp_path).iterdir()))
     for instance in instances:
         instance = Path(instance).name
-        pap_files = [f for f in sgh.pap_performance_data_tmp_path.iterdir()
-                     if f"_{instance}_" in str(f)]
-        tmp_files = [f for f in Path(sgh.sparkle_tmp_path).iterdir()
-                     if f"_{instance}_" in str(f)]
-        sfh.rmfiles(pap_files + tmp_files)
+        sfh.rmfiles([f for f in result_files if f"_{instance}_" in str(f)])
 
 
 def run_parallel_portfolio(instances: list[str],
@@ -581,7 +607,7 @@ def run_parallel_portfolio(instances: list[str],
     parameters = []
     num_jobs = len(solver_list) * len(instances)
     temp_solvers = []
-    solver_instance_list = []
+    members = []
     # Create a command for each instance-solver combination
     for instance_path in instances:
         instance_name = Path(instance_path).name
@@ -589,14 +615,15 @@ def run_parallel_portfolio(instances: list[str],
             seeds = []
             # If the solver has a seed range specified, create a call per seed
             if " " in solver_path:
-                solver_path, _, seed_range = solver_path.strip().split()
-                seed_range = int(seed_range)
+                # Either the solver and its variations, or a solver list entry
+                solver_line = solver_path.strip().split()
+                solver_path, seed_range = solver_line[0], int(solver_line[-1])
                 seeds = [seed_val for seed_val in range(1, seed_range + 1)]
-                solver_name = Path(solver_path).name
-                temp_solvers.append(f"{solver_name}_seed_")
+                temp_solvers.append(f"{Path(solver_path).name}_seed_")
                 num_jobs += (seed_range - 1)
             else:
                 solver_path = Path(solver_path)
+            solver_name = Path(solver_path).name
 
             base_param = f"--instance {(instance_path)} --solver "\
                          f"{str(solver_path)} --performance-measure "\
@@ -604,11 +631,11 @@ def run_parallel_portfolio(instances: list[str],
             if len(seeds) > 0:
                 for seed_idx in seeds:
                     parameters.append(f"{base_param} --seed {seed_idx}")
-                    solver_instance_list.append(
-                        f"{solver_name}_seed_{str(seed_idx)}_{instance_name}")
+                    members.append((solver_name, seed_idx, instance_name))
             else:
                 parameters.append(base_param)
-                solver_instance_list.append(f"{solver_name}_{instance_name}")
+                members.append((solver_name, None, instance_name))
+    solver_instance_list = [get_member_name(member) for member in members]
 
     # Run the script and cancel the remaining solvers if a solver finishes before the
     # end of the cutoff_time
@@ -626,28 +653,39 @@ def run_parallel_portfolio(instances: list[str],
     # TODO: This try/except structure is absolutely massive.
     # This entire method should be refactored after everything works with RunRunner
     try:
-        run = rrr.add_to_queue(
-            runner=run_on,
-            cmd=cmd_list,
-            name=CommandName.RUN_SPARKLE_PARALLEL_PORTFOLIO,
-            parallel_jobs=parallel_jobs,
-            path="./",
-            base_dir=sgh.sparkle_tmp_path,
-            sbatch_options=sbatch_options_list,
-            srun_options=srun_options)
-        if run_on == Runner.LOCAL:
-            run.wait()
-
-        # NOTE: the IF statement below is Slurm only as well?
-        # As running runtime based performance may be less relevant for Local
-        # NOTE: Why does this command have its own waiting process? If we need to handle
-        # Something after the job is done, we can just create a callback script to that
         perf_m = sgh.settings.get_general_sparkle_objectives()[0].PerformanceMeasure
-        if (run_on == Runner.SLURM and perf_m == PerformanceMeasure.RUNTIME):
-            handle_waiting_and_removal_process(instances, file_path_output1, run.run_id,
-                                               solver_instance_list, run.script_filepath,
-                                               num_jobs / len(instances))
-
+        portfolio_size = num_jobs // len(instances)
+        script_path = None
+        if run_on == Runner.LOCAL and perf_m == PerformanceMeasure.RUNTIME:
+            # Run the members for an instance side by side, until one solves it
+            finished = run_parallel_portfolio_locally(
+                file_path_output1, cmd_list, members, portfolio_size)
+        else:
+            run = rrr.add_to_queue(
+                runner=run_on,
+                cmd=cmd_list,
+                name=CommandName.RUN_SPARKLE_PARALLEL_PORTFOLIO,
+                parallel_jobs=parallel_jobs,
+                path="./",
+                base_dir=sgh.sparkle_tmp_path,
+                sbatch_options=sbatch_options_list,
+                srun_options=srun_options)
+            if run_on == Runner.SLURM:
+                # Only for run time the other members stop when one member is done
+                finished = asyncio.run(monitor_parallel_portfolio(
+                    file_path_output1, run.run_id, members, portfolio_size,
+                    cancel_siblings=perf_m == PerformanceMeasure.RUNTIME))
+                script_path = run.script_filepath
+            else:
+                run.wait()
+                finished = {}
+                index_results(
+                    read_new_results(sgh.pap_performance_data_tmp_path, set()),
+                    {member: index for index, member in enumerate(members)},
+                    finished)
+
+        if perf_m == PerformanceMeasure.RUNTIME:
+            print_instance_results(members, portfolio_size, finished)
             now = datetime.datetime.now()
             current_time = now.strftime("%H:%M:%S")
 
@@ -655,74 +693,21 @@ def run_parallel_portfolio(instances: list[str],
                 fcntl.flock(outfile.fileno(), fcntl.LOCK_EX)
                 outfile.write(f"ending time of portfolio: {current_time}\n")
 
-            # After all jobs have finished remove/extract the files in temp only needed
-            # for the running of the portfolios.
-            remove_temp_files_unfinished_solvers(solver_instance_list,
-                                                 run.script_filepath,
+            # After all jobs have finished remove/extract the files in temp only
+            # needed for the running of the portfolios.
+            remove_temp_files_unfinished_solvers(solver_instance_list, script_path,
                                                  temp_solvers)
-        elif run_on == Runner.SLURM:
-            done = False
-            wait_cutoff_time = False
-            n_seconds = 4
-            # TODO: This piece of code is quite identical to the loop in
-            # wait_for_finished solver. Perhaps it can be merged.
-            while not done:
-                # Ask the cluster for a list of all jobs which are currently running
-                result = subprocess.run(["squeue", "--array",
-                                         "--jobs", run.run_id,
-                                         "--format",
-                                         "%.18i %.9P %.8j %.8u %.2t %.10M %.6D %R"],
-                                        capture_output=True, text=True)
-
-                # If none of the jobs on the cluster are running then nothing has to done
-                # yet, check back in n_seconds
-                if " R " not in str(result):
-                    if len(result.stdout.strip().split("\n")) == 1:
-                        done = True  # No jobs are remaining
-                        break
-                else:
-                    # Wait until the last few seconds before checking often
-                    if not wait_cutoff_time:
-                        n_seconds = sgh.settings.get_general_target_cutoff_time() - 6
-                        time.sleep(n_seconds)
-                        wait_cutoff_time = True
-                        n_seconds = 1  # Start checking often
-
-                time.sleep(n_seconds)
-        else:
-            run.wait()
 
-        finished_instances_dict = {}
-        for instance in instances:
+        best = get_best_members(finished, portfolio_size)
+        for group, instance in enumerate(instances):
             instance = Path(instance).name
-            finished_instances_dict[instance] = ["UNSOLVED", 0]
-
-        tmp_res_files = glob.glob(f"{str(sgh.pap_performance_data_tmp_path)}/*.result")
-        for finished_solver_files in tmp_res_files:
-            for instance in finished_instances_dict:
-                if str(instance) in str(finished_solver_files):
-                    file_path = f"{str(finished_solver_files)}"
-
-                    with Path(file_path).open("r") as infile:
-                        content = infile.readlines()
-
-                    # A new instance is solved
-                    if (finished_instances_dict[instance][0] == "UNSOLVED"):
-                        finished_instances_dict[instance][1] = float(content[2].strip())
-                        finished_instances_dict[instance][0] = "SOLVED"
-                    elif (float(finished_instances_dict[instance][1])
-                            > float(content[2].strip())):
-                        finished_instances_dict[instance][1] = float(content[2].strip())
-
-        for instances in finished_instances_dict:
-            if (finished_instances_dict[instances][0] == "SOLVED"
-                    and float(finished_instances_dict[instances][1]) > 0):
+            if group in best and finished[best[group]] > 0:
                 # To filter out constraint files
-                if "e" not in str(finished_instances_dict[instances][1]):
-                    print(f"{str(instances)} was solved with the result: "
-                          f"{str(finished_instances_dict[instances][1])}")
+                if "e" not in str(finished[best[group]]):
+                    print(f"{instance} was solved with the result: "
+                          f"{finished[best[group]]}")
             else:
-                print(f"{str(instances)} was not solved in the given cutoff-time.")
+                print(f"{instance} was not solved in the given cutoff-time.")
     except Exception as except_msg:
         print(f"Exception thrown during {CommandName.RUN_SPARKLE_PARALLEL_PORTFOLIO}: "
               f"{except_msg}")
@@ -15,12 +15,14 @@ from runrunner.base import Runner
 from sparkle.platform import file_help as sfh
 import global_variables as sgh
 from sparkle.structures import feature_data_csv_help as sfdcsv
+from CLI.support import selector_prediction_help as sspred
 from sparkle.structures.performance_dataframe import PerformanceDataFrame
 from CLI.support import run_solvers_help as srs
 from CLI.help.reporting_scenario import Scenario
 from sparkle.instance import instances_help as sih
 from CLI.help.command_help import CommandName
 from sparkle.platform import slurm_help as ssh
+import sparkle_logging as sl
 
 
 def get_list_feature_vector(extractor_path: str, instance_path: str, result_path: str,
@@ -60,10 +62,16 @@ def get_list_feature_vector(extractor_path: str, instance_path: str, result_path
     except Exception:
         print(f"****** WARNING: Feature vector computing on instance {instance_path}"
               " failed! ******")
-        print("****** WARNING: The feature vector of this instance will be imputed as "
-              "the mean value of all other non-missing values! ******")
-        feature_data_csv = sfdcsv.SparkleFeatureDataCSV(sgh.feature_data_csv_path)
-        list_feature_vector = feature_data_csv.generate_mean_value_feature_vector()
+        print("****** WARNING: The feature vector of this instance will be imputed "
+              "from the values of all other instances! ******")
+        column_statistics = sfdcsv.SparkleFeatureDataCSV.load_column_statistics(
+            sgh.feature_data_csv_path)
+        imputation_vector = sfdcsv.SparkleFeatureDataCSV.get_imputation_vector(
+            column_statistics)
+        # Only the features of this extractor
+        extractor_suffix = sgh.sparkle_special_string + Path(extractor_path).name
+        list_feature_vector = imputation_vector[
+            imputation_vector.index.str.endswith(extractor_suffix)].tolist()
     else:
         fin = Path(result_path).open("r+")
         fcntl.flock(fin.fileno(), fcntl.LOCK_EX)
@@ -109,6 +117,49 @@ def get_list_predict_schedule_from_file(predict_schedule_result_path: str) -> li
     return ast.literal_eval(predict_schedule_string)
 
 
+def get_list_predict_schedule(list_feature_vector: list[float]) -> list:
+    """Return the schedule the Sparkle portfolio selector predicts for features.
+
+    The prediction is done by a prediction server that keeps the selector loaded
+    between calls. If the server is not available, the selector is called directly.
+
+    Args:
+        list_feature_vector: The feature vector of the instance.
+
+    Returns:
+        The predicted schedule as a list of (solver, budget).
+    """
+    try:
+        # The server writes to its own log, which stays open as long as it runs
+        server = sspred.get_prediction_server(
+            Path(sgh.sparkle_algorithm_selector_path),
+            sl.caller_log_dir / "predict_schedule_autofolio.err")
+        return server.predict_schedule([float(value) for value in list_feature_vector])
+    except (OSError, RuntimeError, ValueError):
+        pass
+
+    predict_schedule_result_path = ("Tmp/predict_schedule_"
+                                    f"{sgh.get_time_pid_random_string()}"
+                                    ".predres")
+    cmd_list = [sgh.python_executable, sgh.autofolio_path, "--load",
+                sgh.sparkle_algorithm_selector_path, "--feature_vec",
+                " ".join(map(str, list_feature_vector))]
+
+    process = subprocess.run(cmd_list,
+                             stdout=Path(predict_schedule_result_path).open("w+"),
+                             stderr=Path(sgh.sparkle_err_path).open("w+"))
+
+    if process.returncode != 0:
+        # AutoFolio Error: "TypeError: Argument 'placement' has incorrect type"
+        print(f"Error getting predict schedule! See {sgh.sparkle_err_path} for output.")
+        sys.exit(process.returncode)
+
+    list_predict_schedule = get_list_predict_schedule_from_file(
+        predict_schedule_result_path)
+    sfh.rmfiles([predict_schedule_result_path, sgh.sparkle_err_path])
+    return list_predict_schedule
+
+
 def call_solver_solve_instance_within_cutoff(solver_path: str,
                                              instance_path: str,
                                              cutoff_time: int,
@@ -125,12 +176,9 @@ def call_solver_solve_instance_within_cutoff(solver_path: str,
     if performance_data_csv_path is not None:
         solver_name = "Sparkle_Portfolio_Selector"
         check_selector_status(solver_name)
-        with Path(performance_data_csv_path).open("r+") as fo:
-            fcntl.flock(fo.fileno(), fcntl.LOCK_EX)
-            performance_data_csv = PerformanceDataFrame(performance_data_csv_path)
-            performance_data_csv.set_value(cpu_time_penalised,
-                                           solver_name, instance_path)
-            performance_data_csv.save_csv()
+        PerformanceDataFrame.append_to_journal(performance_data_csv_path,
+                                               cpu_time_penalised,
+                                               solver_name, instance_path)
     else:
         if flag_solved:
             print(f"Instance solved by solver {solver_path}")
@@ -190,28 +238,10 @@ def call_sparkle_portfolio_selector_solve_instance(
 
     print(f"Sparkle computing features of instance {instance_files_str} done!")
 
-    predict_schedule_result_path = ("Tmp/predict_schedule_"
-                                    f"{sgh.get_time_pid_random_string()}"
-                                    ".predres")
     print("Sparkle portfolio selector predicting ...")
-    cmd_list = [sgh.python_executable, sgh.autofolio_path, "--load",
-                sgh.sparkle_algorithm_selector_path, "--feature_vec",
-                " ".join(map(str, list_feature_vector))]
-
-    process = subprocess.run(cmd_list,
-                             stdout=Path(predict_schedule_result_path).open("w+"),
-                             stderr=Path(sgh.sparkle_err_path).open("w+"))
-
-    if process.returncode != 0:
-        # AutoFolio Error: "TypeError: Argument 'placement' has incorrect type"
-        print(f"Error getting predict schedule! See {sgh.sparkle_err_path} for output.")
-        sys.exit(process.returncode)
+    list_predict_schedule = get_list_predict_schedule(list_feature_vector)
     print("Predicting done!")
-
-    print_predict_schedule(predict_schedule_result_path)
-    list_predict_schedule = get_list_predict_schedule_from_file(
-        predict_schedule_result_path)
-    sfh.rmfiles([predict_schedule_result_path, sgh.sparkle_err_path])
+    print(f"Selected Schedule [(algorithm, budget)]: {list_predict_schedule}")
 
     for pred in list_predict_schedule:
         solver_path = pred[0]
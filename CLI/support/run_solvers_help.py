@@ -1,11 +1,22 @@
 #!/usr/bin/env python3
 # -*- coding: UTF-8 -*-
 """Helper functions to run solvers."""
+from __future__ import annotations
 import os
 import subprocess
 import sys
 import ast
 import shutil
+import json
+import re
+import shlex
+import functools
+import fcntl
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from enum import Enum
+from typing import Iterator
 from tools.runsolver_parsing import get_runtime
 from pathlib import Path
 
@@ -16,6 +27,45 @@ from CLI.support import sparkle_job_help as sjh
 from sparkle.types.objective import PerformanceMeasure
 from sparkle.platform.settings_help import SolutionVerifier
 from sparkle.solver import sat_help as sssh
+from sparkle.solver import workspace_help as sswh
+from CLI.help.status_info import SolverRunStatusInfo
+
+
+class WrapperProtocol(str, Enum):
+    """Possible protocols for communicating with a solver wrapper.
+
+    With the LEGACY protocol the wrapper is called once to print the solver command,
+    and once more to parse the solver output. With the JSON protocol the wrapper is
+    run once, runs the solver itself, and prints a JSON result record as its last
+    output line.
+    """
+
+    LEGACY = "LEGACY"
+    JSON = "JSON"
+
+
+# A wrapper opts in to the JSON protocol with a line SPARKLE_WRAPPER_PROTOCOL = "json"
+_wrapper_protocol_pattern = re.compile(
+    r"""^SPARKLE_WRAPPER_PROTOCOL\s*=\s*["']json["']""", re.MULTILINE | re.IGNORECASE)
+
+
+@functools.lru_cache
+def get_wrapper_protocol(solver_wrapper_path: Path) -> WrapperProtocol:
+    """Return the protocol a solver wrapper implements.
+
+    Args:
+        solver_wrapper_path: Path to the solver wrapper.
+
+    Returns:
+        JSON if the wrapper declares it implements the JSON protocol, otherwise LEGACY.
+    """
+    try:
+        wrapper_source = Path(solver_wrapper_path).read_text(errors="ignore")
+    except OSError:
+        return WrapperProtocol.LEGACY
+    if _wrapper_protocol_pattern.search(wrapper_source):
+        return WrapperProtocol.JSON
+    return WrapperProtocol.LEGACY
 
 
 def get_solver_call_from_wrapper(solver_wrapper_path: str, instance_path: str,
@@ -49,9 +99,18 @@ def run_solver_on_instance(solver_path: str, solver_wrapper_path: str,
               "execution!")
         sys.exit(-1)
 
-    # Get the solver call command from the wrapper
-    cmd_solver_call = get_solver_call_from_wrapper(solver_wrapper_path, instance_path,
-                                                   seed_str)
+    if get_wrapper_protocol(Path(solver_wrapper_path)) == WrapperProtocol.JSON:
+        # The wrapper runs the solver itself, so it is the command to run
+        if seed_str is None:
+            seed_str = str(sgh.get_seed())
+        cutoff_time_str = str(sgh.settings.get_general_target_cutoff_time())
+        cmd_solver_call = (f"{Path(solver_wrapper_path).name} "
+                           f"--run {shlex.quote(instance_path)} "
+                           f"--seed {seed_str} --cutoff-time {cutoff_time_str}")
+    else:
+        # Get the solver call command from the wrapper
+        cmd_solver_call = get_solver_call_from_wrapper(solver_wrapper_path,
+                                                       instance_path, seed_str)
 
     run_solver_on_instance_with_cmd(Path(solver_path), cmd_solver_call,
                                     Path(raw_result_path),
@@ -97,15 +156,15 @@ def run_solver_on_instance_with_cmd(solver_path: Path, cmd_solver_call: str,
         # Update paths to match configured solver dirs
         rs_prefix = "../../"
         exec_path = str(raw_result_path).replace(".rawres", "_exec_dir/")
-        # Copy files
-        shutil.copytree(solver_path, exec_path, dirs_exist_ok=True)
+        # Link the files of the solver instead of copying them
+        sswh.create_workspace(solver_path, exec_path)
         # Executable is now in "current dir"
         solver_path = "."
 
     # Prepare runsolver call
     runsolver_path = rs_prefix + sgh.runsolver_path
     runsolver_values_log = f"{rs_prefix}{runsolver_values_path}"
-    runsolver_watch_data_path = runsolver_values_log.replace("val", "log")
+    runsolver_watch_data_path = str(Path(runsolver_values_log).with_suffix(".log"))
     raw_result_path_option = f"{rs_prefix}{raw_result_path}"
     cmd_solver_name, cmd_solver_args = cmd_solver_call.split(" ", 1)
     cmd = [runsolver_path, "--timestamp", "--use-pty",
@@ -157,10 +216,9 @@ def run_solver_on_instance_and_process_results(
     # Prepare paths
     # TODO: Fix result path for multi-file instances (only a single file is part of the
     # result path)
-    raw_result_path = (f"{sgh.sparkle_tmp_path}"
-                       f"{Path(solver_path).name}_"
-                       f"{Path(instance_path).name}_"
-                       f"{sgh.get_time_pid_random_string()}.rawres")
+    raw_result_path = str(sfh.get_scratch_path() / (
+        f"{Path(solver_path).name}_{Path(instance_path).name}_"
+        f"{sgh.get_time_pid_random_string()}.rawres"))
     runsolver_values_path = raw_result_path.replace(".rawres", ".val")
     solver_wrapper_path = Path(solver_path) / sgh.sparkle_run_default_wrapper
 
@@ -178,9 +236,84 @@ def run_solver_on_instance_and_process_results(
     return cpu_time, wc_time, cpu_time_penalised, quality, status, raw_result_path
 
 
+def get_available_cores() -> list[int]:
+    """Return the cores the current process is allowed to run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def get_number_of_local_workers(n_jobs: int) -> int:
+    """Return the number of local worker processes to use for a number of jobs."""
+    n_workers = sgh.settings.get_general_number_of_local_workers()
+    if n_workers < 1:
+        n_workers = len(get_available_cores())
+    return max(1, min(n_workers, n_jobs))
+
+
+def _pin_worker_to_core(core_queue: multiprocessing.Queue) -> None:
+    """Pin the current worker process, and the runs it starts, to its own core."""
+    core = core_queue.get()
+    if core is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {core})
+
+
+def _run_job(solver_path: str, instance_path: str) \
+        -> tuple[str, str, float, list[float], str, str]:
+    """Run a solver on an instance and return the result with the job it belongs to."""
+    # TODO: Fix printing of multi-file instance 'path' (only one file name is printed)
+    print(f"Solver {Path(solver_path).name} running on "
+          f"instance {Path(instance_path).name} ...", flush=True)
+    _, _, cpu_time_penalised, quality, status, raw_result_path = (
+        run_solver_on_instance_and_process_results(solver_path, instance_path))
+    return (solver_path, instance_path, cpu_time_penalised, quality, status,
+            raw_result_path)
+
+
+def run_jobs_locally(jobs: list[list[str]], n_workers: int) \
+        -> Iterator[tuple[str, str, float, list[float], str, str]]:
+    """Run solver jobs on a bounded pool of local processes.
+
+    Each worker process is pinned to its own core, and the results are yielded as
+    soon as a run finishes.
+
+    Args:
+        jobs: List of [instance_path, solver_path] jobs.
+        n_workers: The number of worker processes, 1 runs the jobs in this process.
+
+    Yields:
+        Tuples of solver path, instance path, penalised CPU time, quality, status and
+        the path to the raw result.
+    """
+    if n_workers <= 1:
+        for instance_path, solver_path in jobs:
+            yield _run_job(solver_path, instance_path)
+        return
+
+    context = multiprocessing.get_context("fork")
+    core_queue = context.Queue()
+    cores = get_available_cores()
+    for worker_id in range(n_workers):
+        core_queue.put(cores[worker_id] if worker_id < len(cores) else None)
+    executor = ProcessPoolExecutor(max_workers=n_workers, mp_context=context,
+                                   initializer=_pin_worker_to_core,
+                                   initargs=(core_queue, ))
+    try:
+        futures = [executor.submit(_run_job, solver_path, instance_path)
+                   for instance_path, solver_path in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
 def running_solvers(performance_data_csv_path: str, rerun: bool) -> None:
     """Run solvers on all instances.
 
+    The runs are executed by a local pool of worker processes, sized by the number of
+    local workers setting. Each result is appended to the journal of the performance
+    data, which is compacted into the stored data once all runs are done.
+
     If rerun is True, rerun for instances with existing performance data.
     """
     cutoff_time_str = str(sgh.settings.get_general_target_cutoff_time())
@@ -198,70 +331,160 @@ def running_solvers(performance_data_csv_path: str, rerun: bool) -> None:
           f"{cutoff_time_str} seconds", flush=True)
 
     total_job_num = sjh.get_num_of_total_job_from_list(list_performance_computation_job)
-    current_job_num = 1
     print("The total number of jobs to run is: " + str(total_job_num), flush=True)
 
     # If there are no jobs, stop
     if total_job_num < 1:
         return
-    # If there are jobs update performance data ID
-    else:
-        update_performance_data_id()
-
-    for job in list_performance_computation_job:
-        instance_path = job[0]
-        solver_list = job[1]
-        for solver_path in solver_list:
-            print("")
-            # TODO: Fix printing of multi-file instance 'path' (only one file name is
-            # printed)
-            print(f"Solver {Path(solver_path).name} running on "
-                  f"instance {Path(instance_path).name} ...")
-
-            _, _, cpu_time_penalised, quality, status, raw_result_path = (
-                run_solver_on_instance_and_process_results(solver_path, instance_path))
-
-            if status == "CRASHED":
-                print(f'Warning: Solver "{solver_path}" appears to have crashed on '
-                      f'instance "{instance_path}" for details see the solver log file '
-                      f"at {raw_result_path}")
-
-            # Handle timeouts
-            penalised_str = ""
-            if (perf_measure == PerformanceMeasure.RUNTIME
-               and (status == "TIMEOUT" or status == "UNKNOWN")):
-                penalised_str = " (penalised)"
-
-            # If status == 'WRONG' after verification remove solver
-            # TODO: Check whether things break when a solver is removed which still has
-            # instances left in the job list
-            if status == "WRONG":
+
+    n_workers = get_number_of_local_workers(total_job_num)
+    print(f"Running the solvers locally with {n_workers} worker(s)", flush=True)
+    jobs = sjh.expand_total_job_from_list(list_performance_computation_job)
+
+    wrong_solvers = set()
+    results = run_jobs_locally(jobs, n_workers)
+    for current_job_num, result in enumerate(results, start=1):
+        solver_path, instance_path, cpu_time_penalised, quality, status,\
+            raw_result_path = result
+        if status == "CRASHED":
+            print(f'Warning: Solver "{solver_path}" appears to have crashed on '
+                  f'instance "{instance_path}" for details see the solver log file '
+                  f"at {raw_result_path}")
+
+        # Handle timeouts
+        penalised_str = ""
+        if (perf_measure == PerformanceMeasure.RUNTIME
+           and (status == "TIMEOUT" or status == "UNKNOWN")):
+            penalised_str = " (penalised)"
+
+        # If status == 'WRONG' after verification remove solver
+        # TODO: Check whether things break when a solver is removed which still has
+        # instances left in the job list
+        if status == "WRONG" or solver_path in wrong_solvers:
+            if solver_path not in wrong_solvers:
                 remove_faulty_solver(solver_path, instance_path)
-                current_job_num += 1
-                continue  # Skip to the next job
-
-            # Update performance CSV
-            if perf_measure == PerformanceMeasure.QUALITY_ABSOLUTE_MAXIMISATION or\
-               perf_measure == PerformanceMeasure.QUALITY_ABSOLUTE_MINIMISATION:
-                # TODO: Handle the multi-objective case for quality
-                performance_data.set_value(quality[0], solver_path, instance_path)
-                print(f"Running Result: Status: {status}, Quality{penalised_str}: "
-                      f"{str(quality[0])}", flush=True)
-            else:
-                performance_data.set_value(cpu_time_penalised, solver_path,
-                                           instance_path)
-                print(f"Running Result: Status {status}, Runtime{penalised_str}: "
-                      f"{str(cpu_time_penalised)}", flush=True)
+                wrong_solvers.add(solver_path)
+            continue  # Skip to the next job
+
+        if perf_measure == PerformanceMeasure.QUALITY_ABSOLUTE_MAXIMISATION or\
+           perf_measure == PerformanceMeasure.QUALITY_ABSOLUTE_MINIMISATION:
+            # TODO: Handle the multi-objective case for quality
+            value = quality[0]
+            print(f"Running Result: Status: {status}, Quality{penalised_str}: "
+                  f"{str(quality[0])}", flush=True)
+        else:
+            value = cpu_time_penalised
+            print(f"Running Result: Status {status}, Runtime{penalised_str}: "
+                  f"{str(cpu_time_penalised)}", flush=True)
+        PerformanceDataFrame.append_to_journal(performance_data_csv_path, value,
+                                               solver_path, instance_path)
 
-            print(f"Executing Progress: {str(current_job_num)} out of "
-                  f"{str(total_job_num)}", flush=True)
-            current_job_num += 1
+        print(f"Executing Progress: {str(current_job_num)} out of "
+              f"{str(total_job_num)}", flush=True)
 
     performance_data.save_csv()
     print(f"Performance data file {performance_data_csv_path} has been updated!",
           flush=True)
 
 
+def run_solver_job(instance_path: str, solver_path: Path,
+                   performance_measure: PerformanceMeasure,
+                   run_status_path: Path = sgh.run_solvers_sbatch_tmp_path,
+                   seed: str = None) -> None:
+    """Run a solver on an instance and store the result, as a job of a parallel run.
+
+    The result is appended to the journal of the performance data, and written to a
+    result file for parallel portfolios.
+
+    Args:
+        instance_path: Path to the instance, or space separated paths for instances
+            that consist of multiple files.
+        solver_path: Path to the solver.
+        performance_measure: The performance measure of the result.
+        run_status_path: Directory of the run status of the job.
+        seed: Seed of the run. If given, the solver is run from its own copy.
+    """
+    instance_name = Path(instance_path).name
+    if Path(instance_path).is_file():
+        instance_name = Path(instance_path).parent.name
+    solver_path = Path(solver_path)
+    # The result belongs to the solver, not to the workspace it is run from
+    original_solver_path = solver_path
+    if seed is not None:
+        # Creating a new directory for the solver to facilitate running several
+        # solver_instances in parallel.
+        new_solver_directory_path = (sfh.get_scratch_path()
+                                     / f"{solver_path.name}_seed_{seed}_{instance_name}")
+        subtarget = new_solver_directory_path / solver_path.name
+        sswh.create_workspace(solver_path, subtarget)
+        solver_path = subtarget
+
+    key_str = (f"{solver_path.name}_"
+               f"{instance_name}_"
+               f"{sgh.get_time_pid_random_string()}")
+    start_time = time.time()
+    # create statusinfo file
+    status_info = SolverRunStatusInfo()
+    status_info.set_solver(solver_path.name)
+    status_info.set_instance(instance_name)
+    cutoff_str = str(sgh.settings.get_general_target_cutoff_time())
+    status_info.set_cutoff_time(f"{cutoff_str}"
+                                f" second(s)")
+    print("Writing run status to file")
+    status_info.save()
+    cpu_time, wc_time, cpu_time_penalised, quality, status, raw_result_path = (
+        run_solver_on_instance_and_process_results(solver_path, instance_path, seed))
+
+    description_str = (f"[Solver: {solver_path.name}, "
+                       f"Instance: {instance_name}]")
+    start_time_str = (
+        f"[Start Time: {time.strftime('%Y-%m-%d %H:%M:%S',time.localtime(start_time))}]")
+    end_time_str = ("[End Time (after completing run time + processing time): "
+                    f"{time.strftime('%Y-%m-%d %H:%M:%S',time.localtime(time.time()))}]")
+    run_time_str = "[Actual Run Time (wall clock): " + str(wc_time) + " second(s)]"
+    recorded_run_time_str = ("[Recorded Run Time (CPU PAR"
+                             f"{str(sgh.settings.get_general_penalty_multiplier())}): "
+                             f"{str(cpu_time_penalised)} second(s)]")
+    status_str = "[Run Status: " + status + "]"
+
+    log_str = (f"{description_str}, {cutoff_str}, {start_time_str}, {end_time_str}, "
+               f"{run_time_str}, {recorded_run_time_str}, {status_str}")
+    sfh.write_string_to_file(sgh.sparkle_system_log_path, log_str, append=True)
+    status_info.delete()
+
+    if run_status_path != sgh.pap_sbatch_tmp_path:
+        if sgh.sparkle_tmp_path in solver_path.parents:
+            shutil.rmtree(solver_path)
+
+    if performance_measure == PerformanceMeasure.QUALITY_ABSOLUTE:
+        obj_str = str(quality[0])  # TODO: Handle the multi-objective case
+    elif performance_measure == PerformanceMeasure.RUNTIME:
+        obj_str = str(cpu_time_penalised)
+    else:
+        print(f"*** ERROR: Unknown performance measure detected: {performance_measure}")
+    PerformanceDataFrame.append_to_journal(sgh.performance_data_csv_path,
+                                           float(obj_str), str(original_solver_path),
+                                           instance_path)
+
+    pap_result_path = sgh.pap_performance_data_tmp_path / f"{key_str}.result"
+    with pap_result_path.open("w+") as fout:
+        fcntl.flock(fout.fileno(), fcntl.LOCK_EX)
+        fout.write(f"{instance_path}\n"
+                   f"{solver_path}\n"
+                   f"{obj_str}\n")
+
+    # TODO: Make removal conditional on a success status (SUCCESS, SAT or UNSAT)
+    # sfh.rmfiles(raw_result_path)
+
+    if sfh.uses_scratch_path():
+        # Only the result record is kept, the transient files of the run are removed
+        raw_result_path = Path(raw_result_path)
+        sfh.rmfiles([raw_result_path, raw_result_path.with_suffix(".val"),
+                     raw_result_path.with_suffix(".log")])
+        if seed is not None:
+            shutil.rmtree(new_solver_directory_path, ignore_errors=True)
+
+
 def handle_timeouts(runtime: float, status: str,
                     custom_cutoff: int = None) -> tuple[float, str]:
     """Check if there is a timeout and return the status and penalised runtime."""
@@ -297,6 +520,9 @@ def process_results(
     # By default runtime comes from runsolver, may be overwritten by user wrapper
     cpu_time, wc_time = get_runtime(Path(runsolver_values_path))
 
+    if get_wrapper_protocol(Path(solver_wrapper_path)) == WrapperProtocol.JSON:
+        return process_json_results(raw_result_path, cpu_time, wc_time)
+
     # Get results from the wrapper
     cmd_get_results_from_wrapper = (
         f"{solver_wrapper_path} --print-output {raw_result_path}")
@@ -354,6 +580,79 @@ def process_results(
     return cpu_time, wc_time, quality, status
 
 
+def get_json_result_record(raw_result_path: str) -> dict | None:
+    """Return the last JSON result record a wrapper wrote to its output.
+
+    Lines may be prefixed with runsolver timestamps, so each record is read from the
+    first opening brace onwards.
+
+    Args:
+        raw_result_path: Path to the output of the wrapper.
+
+    Returns:
+        The result record as dict, or None if the output contains no record.
+    """
+    if not Path(raw_result_path).exists():
+        return None
+    lines = Path(raw_result_path).read_text(errors="ignore").splitlines()
+    for line in reversed(lines):
+        start = line.find("{")
+        if start < 0:
+            continue
+        try:
+            record = json.loads(line[start:])
+        except ValueError:
+            continue
+        if isinstance(record, dict):
+            return record
+    return None
+
+
+def process_json_results(raw_result_path: str, cpu_time: float, wc_time: float)\
+        -> tuple[float, float, list[float], str]:
+    """Process the results of a wrapper that implements the JSON protocol.
+
+    The record may contain the keys status, quality (a number or a list of
+    numbers), runtime (overwrites the runtime measured by runsolver) and parser (to
+    ask Sparkle to use its own parser, only SAT is available).
+
+    Args:
+        raw_result_path: Path to the output of the wrapper.
+        cpu_time: CPU time measured by runsolver.
+        wc_time: Wallclock time measured by runsolver.
+
+    Returns:
+        The CPU time, wallclock time, list of qualities and status of the run.
+    """
+    record = get_json_result_record(raw_result_path)
+    if record is None:
+        print(f"WARNING: No result record found in {raw_result_path}, the run is "
+              "considered crashed!", flush=True)
+        return cpu_time, wc_time, [], "CRASHED"
+
+    if "runtime" in record:
+        cpu_time = float(record["runtime"])
+        wc_time = cpu_time
+
+    quality = record.get("quality", [])
+    if not isinstance(quality, list):
+        quality = [quality]
+    quality = [float(value) for value in quality]
+
+    parser = record.get("parser")
+    if parser is not None:
+        if str(parser).lower() != "sat":
+            print(f'ERROR: Wrapper output "{raw_result_path}" requested Sparkle to use '
+                  "an internal parser that does not exist\n"
+                  "Possible internal parsers: SAT\nStopping execution!", flush=True)
+            sys.exit(-1)
+        status = sssh.sparkle_sat_parser(raw_result_path, cpu_time)
+    else:
+        status = get_status_from_wrapper(str(record.get("status", "UNKNOWN")))
+
+    return cpu_time, wc_time, quality, status
+
+
 # quality -- comma separated list of quality measurements; [required when one or more
 # quality objectives are used, optional otherwise]
 def get_quality_from_wrapper(result_list: list[str]) -> list[float]:
@@ -413,23 +712,3 @@ def remove_faulty_solver(solver_path: str, instance_path: str) -> None:
 
     print(f"Solver {solver_name} is a wrong solver, running on instance {instance_name} "
           " ignored!", flush=True)
-
-
-def update_performance_data_id() -> None:
-    """Update the performance data ID."""
-    # Get next pd_id
-    pd_id = get_performance_data_id() + 1
-    # Write new pd_id
-    pd_id_path = sgh.performance_data_id_path
-    with Path(pd_id_path).open("w") as pd_id_file:
-        pd_id_file.write(str(pd_id))
-
-    return
-
-
-def get_performance_data_id() -> int:
-    """Return the current performance data ID."""
-    pd_id = 0
-    if Path(sgh.performance_data_id_path).exists():
-        pd_id = int(Path(sgh.performance_data_id_path).open("r").readline())
-    return pd_id
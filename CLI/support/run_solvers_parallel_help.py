@@ -3,13 +3,18 @@
 """Helper functions for parallel execution of solvers."""
 from __future__ import annotations
 
+from pathlib import Path
+
 import runrunner as rrr
 from runrunner.base import Runner
 
 import global_variables as sgh
 from sparkle.structures.performance_dataframe import PerformanceDataFrame
-from CLI.support import run_solvers_help as srs
+from CLI.support import job_chunk_help as sjch
+from CLI.support import job_queue_help as sjqh
+from CLI.support import job_schedule_help as sjsh
 from sparkle.platform import slurm_help as ssh
+from sparkle.types.objective import PerformanceMeasure
 from CLI.help.command_help import CommandName
 
 
@@ -54,9 +59,6 @@ def running_solvers_parallel(
     # If there are no jobs, stop
     if num_jobs == 0:
         return None
-    # If there are jobs update performance data ID
-    else:
-        srs.update_performance_data_id()
 
     if run_on == Runner.LOCAL:
         print("Running the solvers locally")
@@ -65,11 +67,52 @@ def running_solvers_parallel(
 
     srun_options = ["-N1", "-n1"] + ssh.get_slurm_options_list()
     sbatch_options = ssh.get_slurm_options_list()
-    cmd_base = "CLI/core/run_solvers_core.py"
     perf_m = sgh.settings.get_general_sparkle_objectives()[0].PerformanceMeasure
-    cmd_list = [f"{cmd_base} --instance {inst_p} --solver {solver_p} "
-                f"--performance-measure {perf_m.name}" for inst_p, solver_p in jobs]
+    n_queue_workers = min(sgh.settings.get_general_number_of_queue_workers(), num_jobs)
+    n_parallel = num_job_in_parallel
+    if n_queue_workers > 0:
+        n_parallel = min(n_queue_workers, num_job_in_parallel)
+
+    # Start the longest runs first, so they do not hold up the end of the run
+    durations = sjsh.predict_job_durations(
+        performance_data_csv, jobs, float(cutoff_time_str),
+        runtime=perf_m == PerformanceMeasure.RUNTIME)
+    jobs, durations = sjsh.order_jobs_longest_first(jobs, durations)
+
+    report_cmd = "CLI/core/report_makespan.py"
+    if n_queue_workers > 0:
+        # Long-lived workers share the runs through a queue on disk
+        queue_path = sjqh.create_job_queue(
+            Path(sgh.sparkle_tmp_path)
+            / f"Job_Queue_{sgh.get_time_pid_random_string()}",
+            [{"instance": inst_p, "solver": solver_p,
+              "performance_measure": perf_m.name} for inst_p, solver_p in jobs])
+        print(f"Running the solvers with {n_queue_workers} worker(s) sharing a queue")
+        cmd_base = "CLI/core/run_solvers_worker.py"
+        cmd_list = [f"{cmd_base} --queue {queue_path} --worker-id {worker_id}"
+                    for worker_id in range(n_queue_workers)]
+        report_cmd += f" --queue {queue_path}"
+    else:
+        cmd_base = "CLI/core/run_solvers_core.py"
+        cmd_list = [f"{cmd_base} --instance {inst_p} --solver {solver_p} "
+                    f"--performance-measure {perf_m.name}" for inst_p, solver_p in jobs]
+        # Pack short runs into chunks of several runs
+        chunk_dir = (Path(sgh.sparkle_tmp_path)
+                     / f"Job_Chunks_{sgh.get_time_pid_random_string()}")
+        cmd_list = sjch.pack_commands(cmd_list, float(cutoff_time_str), chunk_dir)
+        report_cmd += f" --chunks {chunk_dir}"
+        # The runs of a chunk take up a single parallel slot one after another
+        chunk_size = sjch.get_chunk_size(float(cutoff_time_str))
+        durations = [sum(durations[index:index + chunk_size])
+                     for index in range(0, num_jobs, chunk_size)]
+    predicted_makespan = sjsh.get_predicted_makespan(durations, n_parallel)
+    print(f"Predicted makespan: {predicted_makespan:.2f} seconds")
 
+    # Not directly in Tmp, where parallel portfolios remove files without a result
+    schedule_path = (sgh.job_schedule_tmp_path
+                     / f"Job_Schedule_{sgh.get_time_pid_random_string()}.json")
+    report_cmd += f" --schedule {schedule_path}"
+    sjsh.write_schedule(schedule_path, predicted_makespan, num_jobs, n_parallel)
     run = rrr.add_to_queue(
         runner=run_on,
         cmd=cmd_list,
@@ -78,5 +121,14 @@ def running_solvers_parallel(
         base_dir=sgh.sparkle_tmp_path,
         sbatch_options=sbatch_options,
         srun_options=srun_options)
+    # Compare the achieved makespan to the prediction once the last run is done, and
+    # remove the files of the run
+    rrr.add_to_queue(
+        runner=run_on,
+        cmd=report_cmd,
+        name=CommandName.RUN_SOLVERS,
+        dependencies=run,
+        base_dir=sgh.sparkle_tmp_path,
+        sbatch_options=sbatch_options)
 
     return run
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Helper functions to get predictions from an algorithm selector."""
+from __future__ import annotations
+
+import atexit
+import json
+import subprocess
+from pathlib import Path
+
+import global_variables as sgh
+
+
+prediction_server_path = Path("CLI/core/autofolio_prediction_server.py")
+
+
+class SelectorPredictionServer:
+    """Long-lived process that loads a selector once and answers predictions."""
+
+    def __init__(self: SelectorPredictionServer, selector_path: Path,
+                 err_path: Path = None) -> None:
+        """Start the prediction server for a selector.
+
+        Args:
+            selector_path: Path to the AutoFolio selector.
+            err_path: Path to write the error output of the server to. Defaults to
+                discarding it.
+        """
+        self.selector_path = Path(selector_path)
+        self.selector_mtime = self.selector_path.stat().st_mtime_ns
+        autofolio_dir = Path(sgh.autofolio_path).parent.parent
+        cmd = [sgh.python_executable, str(prediction_server_path),
+               "--load", str(self.selector_path), "--autofolio", str(autofolio_dir)]
+        self.err_file = None if err_path is None else Path(err_path).open("a+")
+        stderr = subprocess.DEVNULL if self.err_file is None else self.err_file
+        self.process = subprocess.Popen(cmd, stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE, stderr=stderr,
+                                        text=True, bufsize=1)
+        self._read_response()
+
+    def _read_response(self: SelectorPredictionServer) -> dict:
+        """Read one response line from the server."""
+        line = self.process.stdout.readline()
+        if not line:
+            self.close()
+            raise RuntimeError("Selector prediction server for "
+                               f"{self.selector_path} stopped unexpectedly")
+        response = json.loads(line)
+        if "error" in response:
+            raise RuntimeError(f"Selector prediction failed: {response['error']}")
+        return response
+
+    def is_alive(self: SelectorPredictionServer) -> bool:
+        """Return whether the server is running and serves the current selector."""
+        return (self.process.poll() is None and self.selector_path.exists()
+                and self.selector_path.stat().st_mtime_ns == self.selector_mtime)
+
+    def predict(self: SelectorPredictionServer,
+                feature_vectors: list[list[float]]) -> list[list[tuple[str, float]]]:
+        """Return the predicted schedules for a list of feature vectors.
+
+        Args:
+            feature_vectors: One feature vector per instance.
+
+        Returns:
+            The schedule for each feature vector, as a list of (solver, budget).
+        """
+        if len(feature_vectors) == 0:
+            return []
+        request = {"features": [[float(value) for value in feature_vector]
+                                for feature_vector in feature_vectors]}
+        self.process.stdin.write(json.dumps(request) + "\n")
+        self.process.stdin.flush()
+        schedules = self._read_response()["schedules"]
+        return [[(solver, budget) for solver, budget in schedule]
+                for schedule in schedules]
+
+    def predict_schedule(self: SelectorPredictionServer,
+                         feature_vector: list[float]) -> list[tuple[str, float]]:
+        """Return the predicted schedule for a single feature vector."""
+        return self.predict([feature_vector])[0]
+
+    def close(self: SelectorPredictionServer) -> None:
+        """Stop the prediction server."""
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        if self.err_file is not None:
+            self.err_file.close()
+
+
+_prediction_servers: dict[Path, SelectorPredictionServer] = {}
+
+
+def get_prediction_server(selector_path: Path, err_path: Path = None) \
+        -> SelectorPredictionServer:
+    """Return a running prediction server for a selector, starting one if needed.
+
+    Servers are reused for later calls with the same selector, and restarted when the
+    selector file has changed.
+
+    Args:
+        selector_path: Path to the AutoFolio selector.
+        err_path: Path to write the error output of the server to.
+
+    Returns:
+        The prediction server for the selector.
+    """
+    key = Path(selector_path).resolve()
+    server = _prediction_servers.get(key)
+    if server is None or not server.is_alive():
+        if server is not None:
+            server.close()
+        server = SelectorPredictionServer(selector_path, err_path)
+        _prediction_servers[key] = server
+    return server
+
+
+def write_predicted_schedules(path: Path, instances: list[str],
+                              schedules: list[list[tuple[str, float]]]) -> None:
+    """Write the predicted schedules of a selector to a JSON file.
+
+    Args:
+        path: Path of the file to write.
+        instances: The instances that were predicted.
+        schedules: The schedule of each instance, as a list of (solver, budget).
+    """
+    tmp_path = Path(path).with_suffix(".tmp")
+    with tmp_path.open("w") as output_file:
+        json.dump({"instances": instances, "schedules": schedules}, output_file)
+    # Readers only ever see a complete file
+    tmp_path.replace(path)
+
+
+def read_predicted_schedules(path: Path) \
+        -> tuple[list[str], list[list[tuple[str, float]]]]:
+    """Read the predicted schedules of a selector from a JSON file.
+
+    Args:
+        path: Path of the file written by write_predicted_schedules.
+
+    Returns:
+        The instances and the schedule of each instance.
+    """
+    with Path(path).open() as input_file:
+        predictions = json.load(input_file)
+    schedules = [[(solver, budget) for solver, budget in schedule]
+                 for schedule in predictions["schedules"]]
+    return predictions["instances"], schedules
+
+
+@atexit.register
+def close_prediction_servers() -> None:
+    """Stop all running prediction servers."""
+    for server in _prediction_servers.values():
+        server.close()
+    _prediction_servers.clear()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Helper functions to simulate a parallel portfolio from recorded run times.
+
+A parallel portfolio solves an instance as soon as one of its members does, so its
+run time on an instance is the minimum over its members. Each member draws its run
+time from the recorded runs of its solver on the instance, so more variations of a
+solver make a short run time more likely. The simulation computes the expected
+penalised run time and the probability to solve each instance exactly from these
+recorded runs, without running anything. This also allows to select the members of a
+portfolio for a number of cores.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import global_variables as sgh
+from sparkle.structures.performance_dataframe import PerformanceDataFrame
+from CLI.support import construct_parallel_portfolio_help as scpph
+
+
+def get_run_times(performance_data: PerformanceDataFrame,
+                  objective: str = None) -> tuple[list[str], list[str], np.ndarray]:
+    """Return the recorded run times as an instance x solver x run array.
+
+    Args:
+        performance_data: The performance data with run times.
+        objective: The objective to select. Optional in case of single objective.
+
+    Returns:
+        A tuple of the instance names, the solver names and the 3D array of run
+        times. Missing run times are NaN.
+    """
+    instances, cube = performance_data.get_objective_cube(objective)
+    solvers = performance_data.dataframe.columns.tolist()
+    return instances, solvers, cube.transpose(0, 2, 1)
+
+
+def simulate_portfolio_times(run_times: np.ndarray,
+                             members: list[int],
+                             cutoff_time: float,
+                             penalty_multiplier: float,
+                             core_slowdown: float = 0.0,
+                             start_delay: float = 0.0) -> tuple[np.ndarray, np.ndarray]:
+    """Return the expected penalised run time and solve probability per instance.
+
+    The run time of a member on an instance is drawn from the known runs of its
+    solver. Missing runs are left out, so a member without known runs never solves
+    the instance. A member run that takes longer than the cutoff time does not solve
+    the instance, and an unsolved instance scores the cutoff time times the penalty
+    multiplier.
+
+    Args:
+        run_times: Instance x solver x run array of recorded run times.
+        members: The solver index of each member, in the order the members start.
+        cutoff_time: The cutoff time of the portfolio.
+        penalty_multiplier: Multiplier of the cutoff time for unsolved instances.
+        core_slowdown: Fraction by which every member slows down per other member
+            running at the same time, e.g. from sharing memory bandwidth.
+        start_delay: Seconds between the start of consecutive members.
+
+    Returns:
+        The expected penalised run time and the probability to solve each instance.
+    """
+    n_instances = run_times.shape[0]
+    slowdown = 1.0 + core_slowdown * max(len(members) - 1, 0)
+    delays = start_delay * np.arange(len(members))
+    times = (run_times[:, members, :] * slowdown
+             + delays[np.newaxis, :, np.newaxis])
+    n_known = (~np.isnan(times)).sum(axis=2)
+    times = np.where(times > cutoff_time, np.inf, times)
+    # The portfolio time can only be one of the member run times, in sorted order
+    candidates = np.sort(times.reshape(n_instances, -1), axis=1)
+    finite = np.isfinite(candidates)
+    # Probability that no member finishes at or before each candidate time
+    survival = np.ones(candidates.shape)
+    for member in range(len(members)):
+        member_times = times[:, member, np.newaxis, :]
+        later = (member_times > candidates[:, :, np.newaxis]).sum(axis=2)
+        known = n_known[:, member, np.newaxis]
+        survival *= np.where(known > 0, later / np.maximum(known, 1), 1.0)
+    survival = np.minimum.accumulate(np.where(finite, survival, 1.0), axis=1)
+    previous = np.hstack([np.ones((n_instances, 1)), survival[:, :-1]])
+    unsolved = survival[:, -1] if survival.shape[1] > 0 else np.ones(n_instances)
+    expected = (np.where(finite, candidates, 0.0) * (previous - survival)).sum(axis=1)
+    expected += unsolved * cutoff_time * penalty_multiplier
+    return expected, 1.0 - unsolved
+
+
+def select_portfolio_members(run_times: np.ndarray,
+                             n_cores: int,
+                             max_variations: list[int],
+                             cutoff_time: float,
+                             penalty_multiplier: float,
+                             core_slowdown: float = 0.0,
+                             start_delay: float = 0.0) -> list[int]:
+    """Select the members of a portfolio that minimise its expected PAR.
+
+    Members are added greedily, each time the solver variation that lowers the
+    expected PAR the most, until the cores are used or no member improves it.
+
+    Args:
+        run_times: Instance x solver x run array of recorded run times.
+        n_cores: The number of cores, which is the maximum number of members.
+        max_variations: The maximum number of variations of each solver.
+        cutoff_time: The cutoff time of the portfolio.
+        penalty_multiplier: Multiplier of the cutoff time for unsolved instances.
+        core_slowdown: Fraction by which every member slows down per other member
+            running at the same time.
+        start_delay: Seconds between the start of consecutive members.
+
+    Returns:
+        The solver index of each selected member, in the order they were selected.
+    """
+    members = []
+    best_par = cutoff_time * penalty_multiplier
+    while len(members) < n_cores:
+        best_solver = None
+        for solver, n_variations in enumerate(max_variations):
+            if members.count(solver) >= n_variations:
+                continue
+            expected, _ = simulate_portfolio_times(
+                run_times, members + [solver], cutoff_time, penalty_multiplier,
+                core_slowdown, start_delay)
+            if expected.mean() < best_par:
+                best_par, best_solver = expected.mean(), solver
+        if best_solver is None:
+            break
+        members.append(best_solver)
+    return members
+
+
+def get_members(solvers: list[str], solver_list: list[str]) -> list[int]:
+    """Return the solver index of each member of a portfolio.
+
+    Args:
+        solvers: The solver names of the performance data.
+        solver_list: The solvers of the portfolio, as given for its construction.
+
+    Returns:
+        The solver index of each member, with a member for each solver variation.
+
+    Raises:
+        ValueError: If a solver has no performance data.
+    """
+    solver_indices = {str(Path(solver)): index
+                      for index, solver in enumerate(solvers)}
+    members = []
+    for solver in solver_list:
+        solver_name, n_variations = scpph.get_solver_variations(solver)
+        index = solver_indices.get(str(Path(solver_name)))
+        if index is None:
+            raise ValueError(f"No performance data of solver {solver_name}")
+        members.extend([index] * n_variations)
+    return members
+
+
+def simulate_parallel_portfolio(performance_data: PerformanceDataFrame,
+                                solver_list: list[str],
+                                core_slowdown: float = 0.0,
+                                start_delay: float = 0.0,
+                                objective: str = None) -> pd.DataFrame:
+    """Simulate a parallel portfolio on the instances of the performance data.
+
+    Args:
+        performance_data: The performance data with run times.
+        solver_list: The solvers of the portfolio, as given for its construction.
+        core_slowdown: Fraction by which every member slows down per other member
+            running at the same time.
+        start_delay: Seconds between the start of consecutive members.
+        objective: The objective to select. Optional in case of single objective.
+
+    Returns:
+        DataFrame with the instances as rows, and the expected penalised run time and
+        the probability to solve the instance as columns.
+    """
+    instances, solvers, run_times = get_run_times(performance_data, objective)
+    members = get_members(solvers, solver_list)
+    expected, solved = simulate_portfolio_times(
+        run_times, members, float(sgh.settings.get_general_target_cutoff_time()),
+        sgh.settings.get_general_penalty_multiplier(), core_slowdown, start_delay)
+    return pd.DataFrame({"Expected PAR": expected, "Solve probability": solved},
+                        index=instances)
+
+
+def optimise_parallel_portfolio(performance_data: PerformanceDataFrame,
+                                solver_list: list[str],
+                                n_cores: int,
+                                deterministic_solvers: list[str] = [],
+                                core_slowdown: float = 0.0,
+                                start_delay: float = 0.0,
+                                objective: str = None) -> list[str]:
+    """Select solvers and their number of variations for a number of cores.
+
+    Args:
+        performance_data: The performance data with run times.
+        solver_list: The solvers to select from.
+        n_cores: The number of cores the portfolio may use.
+        deterministic_solvers: Solvers of which a single variation is selected, since
+            their variations take equally long.
+        core_slowdown: Fraction by which every member slows down per other member
+            running at the same time.
+        start_delay: Seconds between the start of consecutive members.
+        objective: The objective to select. Optional in case of single objective.
+
+    Returns:
+        The selected solvers, as given for the construction of a portfolio.
+    """
+    _, solvers, run_times = get_run_times(performance_data, objective)
+    candidates = set(get_members(solvers, [scpph.get_solver_variations(solver)[0]
+                                           for solver in solver_list]))
+    deterministic = {str(Path(solver)) for solver in deterministic_solvers}
+    max_variations = [0 if index not in candidates
+                      else 1 if str(Path(solver)) in deterministic else n_cores
+                      for index, solver in enumerate(solvers)]
+    members = select_portfolio_members(
+        run_times, n_cores, max_variations,
+        float(sgh.settings.get_general_target_cutoff_time()),
+        sgh.settings.get_general_penalty_multiplier(), core_slowdown, start_delay)
+    # Solvers in order of selection, with their number of variations
+    selected = {solvers[index]: members.count(index) for index in members}
+    return [solver if n_variations == 1 else f"{solver},{n_variations}"
+            for solver, n_variations in selected.items()]
+
+
+def report_simulation(simulation: pd.DataFrame, n_members: int) -> None:
+    """Print the expected performance of a simulated portfolio.
+
+    Args:
+        simulation: The simulated result per instance.
+        n_members: The number of members, each using a core.
+    """
+    penalty_multiplier = sgh.settings.get_general_penalty_multiplier()
+    print(f"Simulated parallel portfolio of {n_members} members on "
+          f"{len(simulation)} instances:")
+    print(f"Expected PAR{penalty_multiplier}: "
+          f"{simulation['Expected PAR'].mean():.3f} seconds")
+    print("Expected number of solved instances: "
+          f"{simulation['Solve probability'].sum():.2f} of {len(simulation)}")
@@ -110,6 +110,9 @@ configuration_output_raw = configuration_output_general / rawdata_dir_name
 parallel_portfolio_output_raw = parallel_portfolio_output_general / rawdata_dir_name
 selection_output_raw = selection_output_general / rawdata_dir_name
 
+# Selectors constructed for subsets of the solvers, keyed by their data fingerprint
+sparkle_algorithm_selector_cache_dir = selection_output_general / "Selector_Cache"
+
 # Analysis directories
 analysis_dir_name = Path("Analysis")
 configuration_output_analysis = configuration_output_general / analysis_dir_name
@@ -129,12 +132,11 @@ sparkle_solver_wrapper = "sparkle_solver_wrapper.py"
 ablation_dir = "Components/ablationAnalysis-0.9.4/"
 
 feature_data_csv_path = "Feature_Data/sparkle_feature_data.csv"
-feature_data_id_path = "Feature_Data/sparkle_feature_data.id"
 performance_data_csv_path = "Performance_Data/sparkle_performance_data.csv"
-performance_data_id_path = "Performance_Data/sparkle_performance_data.id"
 pap_performance_data_tmp_path = Path("Performance_Data/Tmp_PaP/")
 pap_sbatch_tmp_path = Path(f"{sparkle_tmp_path}SBATCH_Parallel_Portfolio_Jobs/")
 run_solvers_sbatch_tmp_path = Path(f"{sparkle_tmp_path}SBATCH_Solver_Jobs/")
+job_schedule_tmp_path = Path(f"{sparkle_tmp_path}Job_Schedules/")
 
 reference_list_dir = Path("Reference_Lists/")
 instance_list_postfix = "_instance_list.txt"
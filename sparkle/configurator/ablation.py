@@ -16,6 +16,7 @@ from sparkle.platform import slurm_help as ssh
 from CLI.help.command_help import CommandName
 from sparkle.solver.solver import Solver
 from sparkle.solver import pcs
+from sparkle.solver import workspace_help as sswh
 
 
 def get_ablation_scenario_directory(solver_name: str, instance_train_name: str,
@@ -54,9 +55,11 @@ def prepare_ablation_scenario(solver_name: str, instance_train_name: str,
                                                             instance_test_name)
 
     ablation_scenario_solver_dir = Path(ablation_scenario_dir, "solver/")
-    # Copy solver
+    # Link the solver files, staged with the ablation component as the scenario is
+    # kept after the run
     solver_directory = "Solvers/" + solver_name
-    shutil.copytree(solver_directory, ablation_scenario_solver_dir, dirs_exist_ok=True)
+    sswh.create_workspace(solver_directory, ablation_scenario_solver_dir,
+                          Path(sgh.ablation_dir) / "solver_stage")
     return ablation_scenario_dir
 
 
@@ -11,9 +11,9 @@ from runrunner.base import Runner
 import global_variables as gv
 from sparkle.platform import file_help as sfh
 from sparkle.platform import slurm_help as ssh
-from CLI.support import sparkle_job_help as sjh
 from sparkle.structures import feature_data_csv_help as sfdcsv
 from CLI.support import sparkle_job_help
+from CLI.support import job_chunk_help as sjch
 from CLI.help.command_help import CommandName
 
 
@@ -89,9 +89,6 @@ def computing_features(feature_data_csv_path: Path, recompute: bool) -> None:
         print("No feature computation jobs to run; stopping execution! To recompute "
               "feature values use the --recompute flag.")
         sys.exit()
-    # If there are jobs update feature data ID
-    else:
-        update_feature_data_id()
 
     current_job_num = 1
     print(f"Total number of jobs to run: {total_job_num}")
@@ -185,22 +182,18 @@ def computing_features_parallel(feature_data_csv_path: Path,
 
     """
     feature_data_csv = sfdcsv.SparkleFeatureDataCSV(feature_data_csv_path)
-    list_feature_computation_job = get_feature_computation_job_list(
-        feature_data_csv, recompute)
-    n_jobs = sparkle_job_help.get_num_of_total_job_from_list(
-        list_feature_computation_job)
+    if recompute:
+        feature_data_csv.clean_csv()
+    total_job_list = feature_data_csv.get_job_list(recompute)
+    n_jobs = len(total_job_list)
 
     # If there are no jobs, stop
     if n_jobs < 1:
         print("No feature computation jobs to run; stopping execution! To recompute "
               "feature values use the --recompute flag.")
         sys.exit()
-    # If there are jobs update feature data ID
-    else:
-        update_feature_data_id()
 
     print("The number of total running jobs: " + str(n_jobs))
-    total_job_list = sjh.expand_total_job_from_list(list_feature_computation_job)
 
     if run_on == Runner.LOCAL:
         print("Running the solvers locally")
@@ -212,6 +205,14 @@ def computing_features_parallel(feature_data_csv_path: Path,
     cmd_list = [f"CLI/core/compute_features.py --instance {inst_path} "
                 f"--extractor {ex_path} --feature-csv {feature_data_csv_path}"
                 for inst_path, ex_path in total_job_list]
+    # Pack short feature computations into chunks of several computations
+    cutoff_time = gv.settings.get_general_extractor_cutoff_time()
+    if len(gv.extractor_list) > 0:
+        cutoff_time = cutoff_time / len(gv.extractor_list)
+    chunk_dir = (Path(gv.sparkle_tmp_path)
+                 / f"Job_Chunks_{gv.get_time_pid_random_string()}")
+    cmd_list = sjch.pack_commands(cmd_list, cutoff_time, chunk_dir)
+    parallel_jobs = min(len(cmd_list), parallel_jobs)
     sbatch_options = ssh.get_slurm_options_list()
     srun_options = ["-N1", "-n1"] + ssh.get_slurm_options_list()
     run = rrr.add_to_queue(
@@ -222,6 +223,7 @@ def computing_features_parallel(feature_data_csv_path: Path,
         base_dir=gv.sparkle_tmp_path,
         sbatch_options=sbatch_options,
         srun_options=srun_options)
+    sjch.remove_chunks_after_run(run, chunk_dir, run_on, CommandName.COMPUTE_FEATURES)
 
     return run
 
@@ -251,24 +253,3 @@ def get_feature_computation_job_list(feature_data_csv: sfdcsv.SparkleFeatureData
             feature_data_csv.get_list_remaining_feature_computation_job())
 
     return list_feature_computation_job
-
-
-def update_feature_data_id() -> None:
-    """Updates the feature data ID by incrementing the current feature data ID by 1."""
-    # Get the incremented fd_id
-    fd_id = get_feature_data_id() + 1
-    # Write it
-    with Path(gv.feature_data_id_path).open("w") as fd_id_file:
-        fd_id_file.write(str(fd_id))
-
-
-def get_feature_data_id() -> int:
-    """Returns the current feature data ID.
-
-    Returns:
-        An int containing the current feature data ID.
-    """
-    fd_id_path = Path(gv.feature_data_id_path)
-    if not fd_id_path.exists():
-        return 0
-    return int(Path(fd_id_path).open("r").readline())
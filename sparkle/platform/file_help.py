@@ -220,6 +220,26 @@ def create_temporary_directories() -> None:
     return
 
 
+def get_scratch_path() -> Path:
+    """Return the directory in which runs write their transient files.
+
+    The directory is created if needed. Without a scratch directory setting this is
+    the temporary directory of the platform.
+    """
+    scratch_directory = sgh.settings.get_general_scratch_directory()
+    if scratch_directory == "":
+        return Path(sgh.sparkle_tmp_path)
+    # Expanded where the run is executed, e.g. to a node-local $TMPDIR
+    scratch_path = Path(os.path.expandvars(scratch_directory)).expanduser()
+    scratch_path.mkdir(parents=True, exist_ok=True)
+    return scratch_path
+
+
+def uses_scratch_path() -> bool:
+    """Return whether runs write their transient files outside the platform."""
+    return sgh.settings.get_general_scratch_directory() != ""
+
+
 def remove_temporary_files() -> None:
     """Remove temporary files. Only removes files not affecting the sparkle state."""
     sparkle_help_path = Path("CLI/sparkle_help")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+"""Helper functions to detect whether the inputs of a derived file changed."""
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+import pandas as pd
+
+
+_fingerprint_suffix = ".fingerprint"
+
+
+def get_fingerprint(*inputs: pd.DataFrame | str | float | list | None) -> str:
+    """Return a fingerprint of the content of the inputs.
+
+    Args:
+        inputs: The data and settings a file is derived from. Dataframes are hashed by
+            their content, other values by their representation.
+
+    Returns:
+        The fingerprint as a hexadecimal string.
+    """
+    fingerprint = hashlib.sha256()
+    for value in inputs:
+        if isinstance(value, pd.DataFrame):
+            fingerprint.update(repr(value.columns.tolist()).encode())
+            fingerprint.update(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+        else:
+            fingerprint.update(repr(value).encode())
+        # Separate the inputs, so their order and boundaries matter
+        fingerprint.update(b"\0")
+    return fingerprint.hexdigest()
+
+
+def get_fingerprint_path(path: Path) -> Path:
+    """Return the path of the fingerprint stored with a file."""
+    path = Path(path)
+    return path.with_name(path.name + _fingerprint_suffix)
+
+
+def write_fingerprint(path: Path, fingerprint: str) -> None:
+    """Store the fingerprint of the inputs a file was derived from with the file.
+
+    Args:
+        path: Path to the derived file.
+        fingerprint: Fingerprint of its inputs.
+    """
+    get_fingerprint_path(path).write_text(fingerprint)
+
+
+def read_fingerprint(path: Path) -> str | None:
+    """Return the fingerprint stored with a file, None if there is none."""
+    fingerprint_path = get_fingerprint_path(path)
+    if not fingerprint_path.is_file():
+        return None
+    return fingerprint_path.read_text().strip()
+
+
+def fingerprint_unchanged(path: Path, fingerprint: str) -> bool:
+    """Return whether a file exists and was derived from inputs with this fingerprint.
+
+    Args:
+        path: Path to the derived file.
+        fingerprint: Fingerprint of the current inputs.
+
+    Returns:
+        True if the file is up to date with the inputs, False if it should be rebuilt.
+    """
+    return Path(path).exists() and read_fingerprint(path) == fingerprint
@@ -11,6 +11,8 @@ import subprocess
 
 import global_variables as sgh
 from sparkle.platform import file_help as sfh, tex_help as stex
+from sparkle.platform import fingerprint_help as sfph
+from sparkle.structures.feature_data_csv_help import SparkleFeatureDataCSV
 from sparkle.structures.performance_dataframe import PerformanceDataFrame
 from CLI.support import compute_marginal_contribution_help as scmch
 import sparkle_logging as sl
@@ -179,11 +181,14 @@ def get_dict_vbs_penalty_time_on_each_instance() -> dict[str, int]:
 def get_dict_actual_portfolio_selector_penalty_time_on_each_instance() -> dict[str, int]:
     """Returns a dictionary with the portfolio selector performance on each instance.
 
+    The schedules of all instances are predicted together from the feature data, and
+    running them is simulated in a single pass over the performance data.
+
     Returns:
         A dict that maps instance name str to their penalised performance int.
     """
-    actual_selector_penalty = {}
     performance_data_csv = PerformanceDataFrame(sgh.performance_data_csv_path)
+    feature_data_csv = SparkleFeatureDataCSV(sgh.feature_data_csv_path)
     actual_portfolio_selector_path = sgh.sparkle_algorithm_selector_path
     minimise = True
     performance_measure = \
@@ -193,18 +198,39 @@ def get_dict_actual_portfolio_selector_penalty_time_on_each_instance() -> dict[s
     if performance_measure == PerformanceMeasure.QUALITY_ABSOLUTE_MAXIMISATION:
         minimise = False
 
-    for instance in performance_data_csv.get_instances():
-        used_time_for_this_instance, flag_successfully_solving = \
-            scmch.compute_actual_performance_for_instance(
-                actual_portfolio_selector_path, instance, sgh.feature_data_csv_path,
-                performance_data_csv, minimise, performance_measure, capvalue)
+    instances = performance_data_csv.get_instances()
+    list_predict_schedules = scmch.get_list_predict_schedules(
+        actual_portfolio_selector_path, feature_data_csv, instances)
+    capvalue_list = None if capvalue is None else [capvalue] * len(instances)
+    performances, flags_successfully_solving = scmch.simulate_predicted_schedules(
+        list_predict_schedules, instances, performance_data_csv, minimise,
+        performance_measure, capvalue_list)
+    penalised_time = sgh.settings.get_penalised_time()
 
-        if flag_successfully_solving:
-            actual_selector_penalty[instance] = used_time_for_this_instance
-        else:
-            actual_selector_penalty[instance] = sgh.settings.get_penalised_time()
+    return {instance: float(performance) if flag_successfully_solving
+            else penalised_time
+            for instance, performance, flag_successfully_solving
+            in zip(instances, performances, flags_successfully_solving)}
 
-    return actual_selector_penalty
+
+def get_selector_figure_fingerprint(figure_filename: str) -> str:
+    """Return a fingerprint of the data and settings a selector figure is made from.
+
+    Args:
+        figure_filename: Filename of the figure without filetype.
+
+    Returns:
+        The fingerprint as a hexadecimal string.
+    """
+    performance_data_csv = PerformanceDataFrame(sgh.performance_data_csv_path)
+    feature_data_csv = SparkleFeatureDataCSV(sgh.feature_data_csv_path)
+    perf_measure = sgh.settings.get_general_sparkle_objectives()[0].PerformanceMeasure
+    return sfph.get_fingerprint(
+        figure_filename, performance_data_csv.dataframe, feature_data_csv.dataframe,
+        sfph.read_fingerprint(sgh.sparkle_algorithm_selector_path),
+        perf_measure.name, sgh.settings.get_general_target_cutoff_time(),
+        sgh.settings.get_general_penalty_multiplier(),
+        sgh.settings.get_general_cap_value())
 
 
 def get_figure_portfolio_selector_sparkle_vs_sbs(output_dir: Path) -> str:
@@ -216,6 +242,14 @@ def get_figure_portfolio_selector_sparkle_vs_sbs(output_dir: Path) -> str:
     Returns:
         LaTeX str to include the comparison plot in a LaTeX report.
     """
+    figure_filename = (
+        "figure_portfolio_selector_sparkle_vs_sbs")
+    figure_path = Path(output_dir) / f"{figure_filename}.pdf"
+    fingerprint = get_selector_figure_fingerprint(figure_filename)
+    # Only plot again when the selector or its data changed
+    if sfph.fingerprint_unchanged(figure_path, fingerprint):
+        return "\\includegraphics[width=0.6\\textwidth]{" + figure_filename + "}"
+
     sbs_penalty_time = get_dict_sbs_penalty_time_on_each_instance()
     actual_portfolio_selector_penalty = (
         get_dict_actual_portfolio_selector_penalty_time_on_each_instance())
@@ -232,9 +266,6 @@ def get_figure_portfolio_selector_sparkle_vs_sbs(output_dir: Path) -> str:
                  actual_portfolio_selector_penalty[instance]]
         points.append(point)
 
-    figure_filename = (
-        "figure_portfolio_selector_sparkle_vs_sbs")
-
     performance_data_csv = PerformanceDataFrame(sgh.performance_data_csv_path)
     solver_penalty_time_ranking_list = (
         performance_data_csv.get_solver_penalty_time_ranking_list())
@@ -251,6 +282,7 @@ def get_figure_portfolio_selector_sparkle_vs_sbs(output_dir: Path) -> str:
                              penalty_time=sgh.settings.get_penalised_time(),
                              replace_zeros=True,
                              output_dir=output_dir)
+    sfph.write_fingerprint(figure_path, fingerprint)
     return "\\includegraphics[width=0.6\\textwidth]{" + figure_filename + "}"
 
 
@@ -263,6 +295,14 @@ def get_figure_portfolio_selector_sparkle_vs_vbs(output_dir: Path) -> str:
     Returns:
         LaTeX str to include the comparison plot in a LaTeX report.
     """
+    figure_filename = (
+        "figure_portfolio_selector_sparkle_vs_vbs")
+    figure_path = Path(output_dir) / f"{figure_filename}.pdf"
+    fingerprint = get_selector_figure_fingerprint(figure_filename)
+    # Only plot again when the selector or its data changed
+    if sfph.fingerprint_unchanged(figure_path, fingerprint):
+        return "\\includegraphics[width=0.6\\textwidth]{" + figure_filename + "}"
+
     vbs_penalty_time = get_dict_vbs_penalty_time_on_each_instance()
     actual_portfolio_selector_penalty = (
         get_dict_actual_portfolio_selector_penalty_time_on_each_instance())
@@ -279,8 +319,6 @@ def get_figure_portfolio_selector_sparkle_vs_vbs(output_dir: Path) -> str:
                  actual_portfolio_selector_penalty[instance]]
         points.append(point)
 
-    figure_filename = (
-        "figure_portfolio_selector_sparkle_vs_vbs")
     penalty = sgh.settings.get_general_penalty_multiplier()
 
     generate_comparison_plot(points,
@@ -293,6 +331,7 @@ def get_figure_portfolio_selector_sparkle_vs_vbs(output_dir: Path) -> str:
                              penalty_time=sgh.settings.get_penalised_time(),
                              replace_zeros=True,
                              output_dir=output_dir)
+    sfph.write_fingerprint(figure_path, fingerprint)
 
     return "\\includegraphics[width=0.6\\textwidth]{" + figure_filename + "}"
 
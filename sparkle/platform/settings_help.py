@@ -50,6 +50,31 @@ class ProcessMonitoring(str, Enum):
         return ProcessMonitoring(process_monitoring)
 
 
+class DataFormat(str, Enum):
+    """Possible file formats for storing platform data."""
+
+    CSV = "CSV"
+    PARQUET = "PARQUET"
+
+    @staticmethod
+    def from_str(data_format: str) -> DataFormat:
+        """Return a given str as DataFormat."""
+        return DataFormat(data_format.upper())
+
+
+class ImputationStrategy(str, Enum):
+    """Possible strategies for imputing missing feature values."""
+
+    MEAN = "MEAN"
+    MEDIAN = "MEDIAN"
+    CONSTANT = "CONSTANT"
+
+    @staticmethod
+    def from_str(strategy: str) -> ImputationStrategy:
+        """Return a given str as ImputationStrategy."""
+        return ImputationStrategy(strategy.upper())
+
+
 class SettingState(Enum):
     """Possible setting states."""
 
@@ -74,6 +99,12 @@ class Settings:
     DEFAULT_general_target_cutoff_time = 60
     DEFAULT_general_penalty_multiplier = 10
     DEFAULT_general_extractor_cutoff_time = 60
+    DEFAULT_general_performance_data_format = DataFormat.CSV
+    DEFAULT_general_feature_imputation_strategy = ImputationStrategy.MEAN
+    DEFAULT_general_number_of_local_workers = 0
+    DEFAULT_general_number_of_queue_workers = 0
+    DEFAULT_general_job_chunk_duration = 0
+    DEFAULT_general_scratch_directory = ""
 
     DEFAULT_config_budget_per_run = 600
     DEFAULT_config_number_of_runs = 25
@@ -102,6 +133,12 @@ class Settings:
         self.__general_penalty_multiplier_set = SettingState.NOT_SET
         self.__general_metric_aggregation_function_set = SettingState.NOT_SET
         self.__general_extractor_cutoff_time_set = SettingState.NOT_SET
+        self.__general_performance_data_format_set = SettingState.NOT_SET
+        self.__general_feature_imputation_strategy_set = SettingState.NOT_SET
+        self.__general_number_of_local_workers_set = SettingState.NOT_SET
+        self.__general_number_of_queue_workers_set = SettingState.NOT_SET
+        self.__general_job_chunk_duration_set = SettingState.NOT_SET
+        self.__general_scratch_directory_set = SettingState.NOT_SET
 
         self.__config_budget_per_run_set = SettingState.NOT_SET
         self.__config_number_of_runs_set = SettingState.NOT_SET
@@ -189,6 +226,49 @@ class Settings:
                     self.set_general_extractor_cutoff_time(value, state)
                     file_settings.remove_option(section, option)
 
+            option_names = ("performance_data_format", )
+            for option in option_names:
+                if file_settings.has_option(section, option):
+                    value = DataFormat.from_str(file_settings.get(section, option))
+                    self.set_general_performance_data_format(value, state)
+                    file_settings.remove_option(section, option)
+
+            option_names = ("feature_imputation_strategy", )
+            for option in option_names:
+                if file_settings.has_option(section, option):
+                    value = ImputationStrategy.from_str(
+                        file_settings.get(section, option))
+                    self.set_general_feature_imputation_strategy(value, state)
+                    file_settings.remove_option(section, option)
+
+            option_names = ("number_of_local_workers", )
+            for option in option_names:
+                if file_settings.has_option(section, option):
+                    value = file_settings.getint(section, option)
+                    self.set_general_number_of_local_workers(value, state)
+                    file_settings.remove_option(section, option)
+
+            option_names = ("number_of_queue_workers", )
+            for option in option_names:
+                if file_settings.has_option(section, option):
+                    value = file_settings.getint(section, option)
+                    self.set_general_number_of_queue_workers(value, state)
+                    file_settings.remove_option(section, option)
+
+            option_names = ("job_chunk_duration", )
+            for option in option_names:
+                if file_settings.has_option(section, option):
+                    value = file_settings.getint(section, option)
+                    self.set_general_job_chunk_duration(value, state)
+                    file_settings.remove_option(section, option)
+
+            option_names = ("scratch_directory", )
+            for option in option_names:
+                if file_settings.has_option(section, option):
+                    value = file_settings.get(section, option)
+                    self.set_general_scratch_directory(value, state)
+                    file_settings.remove_option(section, option)
+
             section = "configuration"
             option_names = ("budget_per_run", "smac_whole_time_budget")
             for option in option_names:
@@ -547,6 +627,155 @@ class Settings:
 
         return int(self.__settings["general"]["extractor_cutoff_time"])
 
+    def set_general_performance_data_format(
+            self: Settings, value: DataFormat = DEFAULT_general_performance_data_format,
+            origin: SettingState = SettingState.DEFAULT) -> None:
+        """Set the file format in which the performance data is stored."""
+        section = "general"
+        name = "performance_data_format"
+
+        if value is not None and self.__check_setting_state(
+                self.__general_performance_data_format_set, origin, name):
+            self.__init_section(section)
+            self.__general_performance_data_format_set = origin
+            self.__settings[section][name] = value.name
+
+        return
+
+    def get_general_performance_data_format(self: Settings) -> DataFormat:
+        """Return the file format in which the performance data is stored."""
+        if self.__general_performance_data_format_set == SettingState.NOT_SET:
+            self.set_general_performance_data_format()
+
+        return DataFormat.from_str(
+            self.__settings["general"]["performance_data_format"])
+
+    def set_general_feature_imputation_strategy(
+            self: Settings,
+            value: ImputationStrategy = DEFAULT_general_feature_imputation_strategy,
+            origin: SettingState = SettingState.DEFAULT) -> None:
+        """Set the strategy with which missing feature values are imputed."""
+        section = "general"
+        name = "feature_imputation_strategy"
+
+        if value is not None and self.__check_setting_state(
+                self.__general_feature_imputation_strategy_set, origin, name):
+            self.__init_section(section)
+            self.__general_feature_imputation_strategy_set = origin
+            self.__settings[section][name] = value.name
+
+        return
+
+    def get_general_feature_imputation_strategy(self: Settings) -> ImputationStrategy:
+        """Return the strategy with which missing feature values are imputed."""
+        if self.__general_feature_imputation_strategy_set == SettingState.NOT_SET:
+            self.set_general_feature_imputation_strategy()
+
+        return ImputationStrategy.from_str(
+            self.__settings["general"]["feature_imputation_strategy"])
+
+    def set_general_number_of_local_workers(
+            self: Settings, value: int = DEFAULT_general_number_of_local_workers,
+            origin: SettingState = SettingState.DEFAULT) -> None:
+        """Set the number of runs that can be executed in parallel locally.
+
+        A value of 0 means one run per available core.
+        """
+        section = "general"
+        name = "number_of_local_workers"
+
+        if value is not None and self.__check_setting_state(
+                self.__general_number_of_local_workers_set, origin, name):
+            self.__init_section(section)
+            self.__general_number_of_local_workers_set = origin
+            self.__settings[section][name] = str(value)
+
+        return
+
+    def get_general_number_of_local_workers(self: Settings) -> int:
+        """Return the number of runs that can be executed in parallel locally."""
+        if self.__general_number_of_local_workers_set == SettingState.NOT_SET:
+            self.set_general_number_of_local_workers()
+
+        return int(self.__settings["general"]["number_of_local_workers"])
+
+    def set_general_number_of_queue_workers(
+            self: Settings, value: int = DEFAULT_general_number_of_queue_workers,
+            origin: SettingState = SettingState.DEFAULT) -> None:
+        """Set the number of workers that pull parallel solver runs from a queue.
+
+        A value of 0 submits a separate job for every solver run instead.
+        """
+        section = "general"
+        name = "number_of_queue_workers"
+
+        if value is not None and self.__check_setting_state(
+                self.__general_number_of_queue_workers_set, origin, name):
+            self.__init_section(section)
+            self.__general_number_of_queue_workers_set = origin
+            self.__settings[section][name] = str(value)
+
+        return
+
+    def get_general_number_of_queue_workers(self: Settings) -> int:
+        """Return the number of workers that pull parallel solver runs from a queue."""
+        if self.__general_number_of_queue_workers_set == SettingState.NOT_SET:
+            self.set_general_number_of_queue_workers()
+
+        return int(self.__settings["general"]["number_of_queue_workers"])
+
+    def set_general_job_chunk_duration(
+            self: Settings, value: int = DEFAULT_general_job_chunk_duration,
+            origin: SettingState = SettingState.DEFAULT) -> None:
+        """Set the target duration in seconds of a parallel job running several runs.
+
+        A value of 0 runs every run as a separate job.
+        """
+        section = "general"
+        name = "job_chunk_duration"
+
+        if value is not None and self.__check_setting_state(
+                self.__general_job_chunk_duration_set, origin, name):
+            self.__init_section(section)
+            self.__general_job_chunk_duration_set = origin
+            self.__settings[section][name] = str(value)
+
+        return
+
+    def get_general_job_chunk_duration(self: Settings) -> int:
+        """Return the target duration in seconds of a parallel job of several runs."""
+        if self.__general_job_chunk_duration_set == SettingState.NOT_SET:
+            self.set_general_job_chunk_duration()
+
+        return int(self.__settings["general"]["job_chunk_duration"])
+
+    def set_general_scratch_directory(
+            self: Settings, value: str = DEFAULT_general_scratch_directory,
+            origin: SettingState = SettingState.DEFAULT) -> None:
+        """Set the directory in which runs write their transient files.
+
+        Environment variables in the value are expanded where the run is executed, so
+        a node-local directory such as $TMPDIR can be used. An empty value uses the
+        temporary directory of the platform.
+        """
+        section = "general"
+        name = "scratch_directory"
+
+        if value is not None and self.__check_setting_state(
+                self.__general_scratch_directory_set, origin, name):
+            self.__init_section(section)
+            self.__general_scratch_directory_set = origin
+            self.__settings[section][name] = value
+
+        return
+
+    def get_general_scratch_directory(self: Settings) -> str:
+        """Return the directory in which runs write their transient files."""
+        if self.__general_scratch_directory_set == SettingState.NOT_SET:
+            self.set_general_scratch_directory()
+
+        return self.__settings["general"]["scratch_directory"]
+
     # Configuration settings ###
 
     def set_config_budget_per_run(
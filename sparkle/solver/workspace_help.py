@@ -0,0 +1,102 @@
+"""Methods to give runs their own solver directory without copying the solver.
+
+The solver is staged once as a read-only copy, shared by all runs that use the same
+stage directory. A workspace of a run has its own directories, in which every file is
+a hardlink to the staged file, or a symlink if hardlinks are not possible. Files the
+wrapper creates or replaces are therefore private to the run, while the staged files
+cannot be changed in place by a run.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import stat
+from pathlib import Path
+
+from sparkle.platform import file_help as sfh
+from sparkle.platform import fingerprint_help as sfph
+
+
+_stage_dir_name = "Solver_Stage"
+
+
+def get_solver_tree_fingerprint(solver_path: Path) -> str:
+    """Return a fingerprint of the files of a solver, by their path, size and time."""
+    entries = []
+    for root, dirs, files in os.walk(solver_path):
+        dirs.sort()
+        for file_name in sorted(files):
+            file_path = Path(root, file_name)
+            file_stat = file_path.lstat()
+            entries.append((str(file_path.relative_to(solver_path)),
+                            file_stat.st_size, file_stat.st_mtime_ns))
+    return sfph.get_fingerprint(entries)
+
+
+def stage_solver(solver_path: Path, stage_root: Path = None) -> Path:
+    """Return a read-only copy of a solver, creating it if it does not exist yet.
+
+    Runs that stage the same solver at the same time each build their own copy and
+    only the first one is kept, so a staged solver is always complete.
+
+    Args:
+        solver_path: Path to the solver directory.
+        stage_root: Directory to stage solvers in. Defaults to the scratch directory.
+
+    Returns:
+        Path to the staged solver.
+    """
+    solver_path = Path(solver_path)
+    if stage_root is None:
+        stage_root = sfh.get_scratch_path() / _stage_dir_name
+    fingerprint = get_solver_tree_fingerprint(solver_path)
+    stage_path = Path(stage_root) / f"{solver_path.name}_{fingerprint[:16]}"
+    if stage_path.is_dir():
+        return stage_path
+
+    tmp_stage_path = stage_path.with_name(f"{stage_path.name}.{os.getpid()}.tmp")
+    shutil.copytree(solver_path, tmp_stage_path, symlinks=True, dirs_exist_ok=True)
+    for root, _, files in os.walk(tmp_stage_path):
+        for file_name in files:
+            file_path = Path(root, file_name)
+            if not file_path.is_symlink():
+                mode = file_path.stat().st_mode
+                file_path.chmod(mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+    try:
+        tmp_stage_path.rename(stage_path)
+    except OSError:
+        # Staged by another run in the meantime
+        shutil.rmtree(tmp_stage_path, ignore_errors=True)
+    return stage_path
+
+
+def create_workspace(solver_path: Path, workspace_path: Path,
+                     stage_root: Path = None) -> Path:
+    """Create a solver directory for a run from links to the staged solver.
+
+    Args:
+        solver_path: Path to the solver directory.
+        workspace_path: Path of the solver directory of the run.
+        stage_root: Directory to stage solvers in. Defaults to the scratch directory.
+
+    Returns:
+        The path to the workspace.
+    """
+    stage_path = stage_solver(solver_path, stage_root).absolute()
+    workspace_path = Path(workspace_path)
+    for root, _, files in os.walk(stage_path):
+        target_dir = workspace_path / Path(root).relative_to(stage_path)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        for file_name in files:
+            source, target = Path(root, file_name), target_dir / file_name
+            if target.exists() or target.is_symlink():
+                continue
+            if source.is_symlink():
+                target.symlink_to(os.readlink(source))
+                continue
+            try:
+                os.link(source, target)
+            except OSError:
+                # E.g. the workspace is on another file system than the stage
+                target.symlink_to(source)
+    return workspace_path
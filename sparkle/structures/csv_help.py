@@ -4,6 +4,7 @@
 from __future__ import annotations
 import pandas as pd
 import fcntl
+import os
 from pathlib import Path
 
 
@@ -42,9 +43,12 @@ class SparkleCSV:
         """
         if csv_filepath is None:
             csv_filepath = self.csv_filepath
-        with Path(csv_filepath).open("w+") as fo:
-            fcntl.flock(fo.fileno(), fcntl.LOCK_EX)
-            self.dataframe.to_csv(csv_filepath)
+        csv_filepath = Path(csv_filepath)
+        # Replace the file atomically, so it is never left partially written
+        tmp_filepath = csv_filepath.with_name(
+            f".{csv_filepath.name}.{os.getpid()}.tmp")
+        self.dataframe.to_csv(tmp_filepath)
+        tmp_filepath.replace(csv_filepath)
 
     def get_value(self: SparkleCSV, row: str, column: str) -> str:
         """Get a value by name."""
@@ -1,38 +1,130 @@
 #!/usr/bin/env python3
 # -*- coding: UTF-8 -*-
 """Merge new performance/feature data into CSVs, only for internal calls from Sparkle."""
+from __future__ import annotations
 import fcntl
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import global_variables as sgh
 from sparkle.platform import file_help as sfh
-from sparkle.sparkle.structures import feature_data_csv_help as sfdcsv
-from sparkle.sparkle_performance_dataframe import PerformanceDataFrame
+from sparkle.structures import feature_data_csv_help as sfdcsv
+from sparkle.structures.performance_dataframe import PerformanceDataFrame
 
 
-def feature_data_csv_merge() -> None:
-    """Merge feature data of new results into the main feature data CSV."""
+# Lists the files of a merge that were saved into the data, but not yet removed
+_applied_ledger_name = ".merge_applied"
+
+
+def write_applied_ledger(tmp_directory: Path, applied_paths: list[str]) -> None:
+    """Record which files were merged, once the merged data has been saved.
+
+    Args:
+        tmp_directory: Directory of the merged files.
+        applied_paths: The merged files.
+    """
+    ledger_path = tmp_directory / _applied_ledger_name
+    tmp_path = ledger_path.with_name(f"{ledger_path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("w") as fout:
+        fout.write("".join(f"{path}\n" for path in applied_paths))
+        fout.flush()
+        os.fsync(fout.fileno())
+    tmp_path.replace(ledger_path)
+
+
+def remove_applied_files(tmp_directory: Path) -> None:
+    """Remove the files recorded as merged, and then the record itself.
+
+    After an interrupted merge, this removes the files that are already in the
+    merged data, so they are not merged again.
+
+    Args:
+        tmp_directory: Directory of the merged files.
+    """
+    ledger_path = tmp_directory / _applied_ledger_name
+    if not ledger_path.exists():
+        return
+    for applied_path in ledger_path.read_text().splitlines():
+        try:
+            sfh.rmfiles(applied_path)
+        except Exception:
+            print(f"ERROR: Could not remove file: {applied_path}")
+    ledger_path.unlink()
+
+
+def read_result_file(result_path: str) -> tuple[str, str, float] | None:
+    """Read the instance, solver and value from a result file.
+
+    Args:
+        result_path: Path to the result file.
+
+    Returns:
+        The instance path, solver path and value, or None if the result file is not
+        complete or could not be read.
+    """
+    try:
+        with Path(result_path).open("r+") as fin:
+            fcntl.flock(fin.fileno(), fcntl.LOCK_EX)
+            instance_path = fin.readline().strip()
+            solver_path = fin.readline().strip()
+            runtime_str = fin.readline().strip()
+        if not instance_path or not solver_path or not runtime_str:
+            return None
+        return instance_path, solver_path, float(runtime_str)
+    except (OSError, ValueError):
+        # A single unreadable result should not stop merging the others
+        print(f"WARNING: Could not read result file: {result_path}")
+        return None
+
+
+def feature_data_csv_merge(
+        feature_data_csv_path: str = sgh.feature_data_csv_path,
+        tmp_feature_data_csv_directory: Path = sgh.feature_data_dir / "Tmp") -> None:
+    """Merge feature data of new results into the main feature data CSV.
+
+    All new feature data CSVs are read in parallel and combined into the feature data
+    at once, which is then saved a single time.
+
+    Args:
+        feature_data_csv_path: Path to the main feature data CSV.
+        tmp_feature_data_csv_directory: Directory with the new feature data CSVs.
+    """
     try:
-        feature_data_csv = sfdcsv.SparkleFeatureDataCSV(
-            sgh.feature_data_csv_path)
-        tmp_feature_data_csv_directory = sgh.feature_data_dir / "Tmp"
+        remove_applied_files(tmp_feature_data_csv_directory)
+        feature_data_csv = sfdcsv.SparkleFeatureDataCSV(feature_data_csv_path)
         csv_list = sfh.get_list_all_extensions(tmp_feature_data_csv_directory, "csv")
     except Exception:
         return
-    for csv_name in csv_list:
-        tmp_feature_data_csv = sfdcsv.SparkleFeatureDataCSV(str(csv_name))
-        feature_data_csv.combine(tmp_feature_data_csv)
-        feature_data_csv.save_csv()
-        Path(csv_name).unlink(missing_ok=True)
+    if len(csv_list) == 0:
+        return
+    with ThreadPoolExecutor() as executor:
+        tmp_feature_data_csvs = list(executor.map(sfdcsv.SparkleFeatureDataCSV,
+                                                  csv_list))
+    feature_data_csv.combine(*tmp_feature_data_csvs)
+    feature_data_csv.save_csv()
+    write_applied_ledger(tmp_feature_data_csv_directory, csv_list)
+    remove_applied_files(tmp_feature_data_csv_directory)
     return
 
 
-def performance_data_csv_merge() -> None:
-    """Merge performance data of new results into the main performance data CSV."""
+def performance_data_csv_merge(
+        performance_data_csv_path: str = sgh.performance_data_csv_path,
+        tmp_performance_data_result_directory: Path =
+        sgh.performance_data_dir / "Tmp") -> None:
+    """Merge performance data of new results into the main performance data CSV.
+
+    Results journalled by the jobs are compacted into the CSV, as well as any results
+    that were written to separate result files. The result files are read in
+    parallel, applied as one update and the CSV is saved a single time.
+
+    Args:
+        performance_data_csv_path: Path to the main performance data CSV.
+        tmp_performance_data_result_directory: Directory with the result files.
+    """
     try:
-        performance_data_csv = PerformanceDataFrame(
-            sgh.performance_data_csv_path)
-        tmp_performance_data_result_directory = sgh.performance_data_dir / "Tmp"
+        remove_applied_files(tmp_performance_data_result_directory)
+        performance_data_csv = PerformanceDataFrame(performance_data_csv_path)
         result_list = sfh.get_list_all_extensions(
             tmp_performance_data_result_directory, "result")
     except Exception:
@@ -40,25 +132,23 @@ def performance_data_csv_merge() -> None:
 
     wrong_solver_list = []
 
-    for result_path in result_list:
-        try:
-            with Path(result_path).open("r+") as fin:
-                fcntl.flock(fin.fileno(), fcntl.LOCK_EX)
-                instance_path = fin.readline().strip()
-                if not instance_path:
-                    continue
-                solver_path = fin.readline().strip()
-                if not solver_path:
-                    continue
-                runtime_str = fin.readline().strip()
-                if not runtime_str:
-                    continue
-                runtime = float(runtime_str)
-                performance_data_csv.set_value(runtime, solver_path, instance_path)
-            performance_data_csv.save_csv()
-            sfh.rmfiles(result_path)
-        except Exception:
-            print(f"ERROR: Could not remove file: {result_path}")
+    with ThreadPoolExecutor() as executor:
+        results = list(executor.map(read_result_file, result_list))
+    values, solvers, instances, merged_paths = [], [], [], []
+    for result_path, result in zip(result_list, results):
+        if result is None:
+            continue
+        instance_path, solver_path, value = result
+        values.append(value)
+        solvers.append(solver_path)
+        instances.append(instance_path)
+        merged_paths.append(result_path)
+    performance_data_csv.set_values(values, solvers, instances)
+    # Save once, which also compacts the journal into the CSV
+    performance_data_csv.save_csv()
+    if merged_paths:
+        write_applied_ledger(tmp_performance_data_result_directory, merged_paths)
+        remove_applied_files(tmp_performance_data_result_directory)
     for wrong_solver_path in wrong_solver_list:
         performance_data_csv.remove_solver(wrong_solver_path)
         performance_data_csv.save_csv()
@@ -3,12 +3,19 @@
 """Module to manage feature data CSV files and common operation son them."""
 from __future__ import annotations
 import sys
+import fcntl
+from pathlib import Path
 import numpy as np
+import pandas as pd
 
 import global_variables as sgh
+from sparkle.platform.settings_help import ImputationStrategy
 from sparkle.structures import csv_help as scsv
 
 
+_statistics_suffix = ".stats"
+
+
 class SparkleFeatureDataCSV(scsv.SparkleCSV):
     """Class to manage feature data CSV files and common operations on them."""
 
@@ -28,6 +35,30 @@ class SparkleFeatureDataCSV(scsv.SparkleCSV):
 
         return list_recompute_feature_computation_job
 
+    def get_remaining_extractor_mask(self: SparkleFeatureDataCSV)\
+            -> tuple[list[str], np.ndarray]:
+        """Return per instance and extractor whether a feature computation is needed.
+
+        Returns:
+            A list of extractor paths, in order of their first feature column, and a
+            boolean array of shape (instances, extractors) that is True where an
+            extractor has at least one missing feature value for the instance.
+        """
+        if (self.dataframe.index.has_duplicates
+                or self.dataframe.columns.has_duplicates):
+            print("ERROR: Duplicate feature computation job.")
+            sys.exit(-1)
+        column_extractors = [self.get_extractor_path_from_feature(column)
+                             for column in self.dataframe.columns]
+        extractor_list = list(dict.fromkeys(column_extractors))
+        column_extractors = np.array(column_extractors, dtype=object)
+        bool_array_isnull = self.dataframe.isnull().to_numpy()
+        mask = np.zeros((bool_array_isnull.shape[0], len(extractor_list)), dtype=bool)
+        for i, extractor_path in enumerate(extractor_list):
+            mask[:, i] = bool_array_isnull[:, column_extractors == extractor_path]\
+                .any(axis=1)
+        return extractor_list, mask
+
     def get_list_remaining_feature_computation_job(self: SparkleFeatureDataCSV)\
             -> list[list[str, str]]:
         """Return a list of needed feature computations per instance and solver.
@@ -36,29 +67,30 @@ class SparkleFeatureDataCSV(scsv.SparkleCSV):
             A list of feature computation jobs. Each job is a list containing a str row
             name and a str column name.
         """
-        list_remaining_feature_computation_job = []
-        bool_array_isnull = self.dataframe.isnull()
-        for row_name in self.list_rows():
-            current_extractor_list = []
+        extractor_list, mask = self.get_remaining_extractor_mask()
+        extractor_array = np.array(extractor_list, dtype=object)
+        return [[row_name, extractor_array[row_mask].tolist()]
+                for row_name, row_mask in zip(self.list_rows(), mask)]
 
-            for column_name in self.list_columns():
-                flag_value_is_null = bool_array_isnull.at[row_name, column_name]
+    def get_job_list(self: SparkleFeatureDataCSV, recompute: bool = False)\
+            -> list[tuple[str, str]]:
+        """Return a list of feature computation jobs there are to be done.
 
-                if (type(flag_value_is_null) is not np.bool_
-                        and len(flag_value_is_null) > 1):
-                    print("ERROR: Duplicate feature computation job.")
-                    sys.exit(-1)
-
-                if flag_value_is_null:
-                    extractor_path = self.get_extractor_path_from_feature(column_name)
-
-                    if extractor_path not in current_extractor_list:
-                        current_extractor_list.append(extractor_path)
-
-            list_item = [row_name, current_extractor_list]
-            list_remaining_feature_computation_job.append(list_item)
+        Args:
+            recompute: Boolean indicating if we want to recompute all jobs for all
+                extractors in the platform.
 
-        return list_remaining_feature_computation_job
+        Returns:
+            A list of tuple[instance, extractor] in instance major order.
+        """
+        if recompute:
+            return [(row_name, extractor_path) for row_name in self.list_rows()
+                    for extractor_path in self.extractor_list]
+        extractor_list, mask = self.get_remaining_extractor_mask()
+        rows, columns = np.nonzero(mask)
+        row_names = self.dataframe.index[rows].tolist()
+        return [(row_name, extractor_list[column])
+                for row_name, column in zip(row_names, columns)]
 
     def get_extractor_path_from_feature(self: SparkleFeatureDataCSV,
                                         given_column_name: str) -> str:
@@ -79,48 +111,35 @@ class SparkleFeatureDataCSV(scsv.SparkleCSV):
         """Return whether a column with a given name exists."""
         return given_column_name in self.list_columns()
 
-    def combine(self: SparkleFeatureDataCSV, second_sfdcsv: SparkleFeatureDataCSV)\
-            -> None:
-        """Combine this CSV with a given CSV."""
-        list_columns_second_sfdcsv = second_sfdcsv.list_columns()
-        list_rows_second_sfdcsv = second_sfdcsv.list_rows()
-
-        len_list_columns_second_sfdcsv = len(list_columns_second_sfdcsv)
-        len_list_rows_second_sfdcsv = len(list_rows_second_sfdcsv)
-
-        for i in range(len_list_rows_second_sfdcsv):
-            row_name_second_sfdcsv = str(second_sfdcsv.dataframe.index[i])
-            bool_in_rows = self.get_bool_in_rows(row_name_second_sfdcsv)
-
-            for j in range(len_list_columns_second_sfdcsv):
-                column_name_second_sfdcsv = second_sfdcsv.dataframe.columns[j]
-                bool_in_columns = self.get_bool_in_columns(column_name_second_sfdcsv)
-                value = second_sfdcsv.dataframe.iloc[i, j]
-
-                if bool_in_rows:
-                    if bool_in_columns:
-                        self.set_value(str(row_name_second_sfdcsv),
-                                       column_name_second_sfdcsv,
-                                       value)
-                    else:
-                        self.add_column(column_name_second_sfdcsv)
-                        self.set_value(str(row_name_second_sfdcsv),
-                                       column_name_second_sfdcsv,
-                                       value)
-                else:
-                    if bool_in_columns:
-                        self.add_row(row_name_second_sfdcsv)
-                        self.set_value(str(row_name_second_sfdcsv),
-                                       column_name_second_sfdcsv,
-                                       value)
-                    else:
-                        self.add_row(row_name_second_sfdcsv)
-                        self.add_column(column_name_second_sfdcsv)
-                        self.set_value(str(row_name_second_sfdcsv),
-                                       column_name_second_sfdcsv,
-                                       value)
-
-        return
+    def combine(self: SparkleFeatureDataCSV,
+                *feature_data_csvs: SparkleFeatureDataCSV) -> None:
+        """Combine this CSV with one or more given CSVs.
+
+        Rows and columns of the given CSVs that are not yet present are added, and
+        values of the given CSVs overwrite the values in this CSV. Missing values in
+        the given CSVs do not overwrite existing values. When several CSVs hold a value
+        for the same cell, the last one takes precedence.
+
+        Args:
+            feature_data_csvs: The feature data CSVs to merge into this CSV.
+        """
+        frames = [feature_data_csv.dataframe.set_axis(
+                  feature_data_csv.dataframe.index.astype(str), axis=0)
+                  for feature_data_csv in feature_data_csvs]
+        if len(frames) == 0:
+            return
+        index = self.dataframe.index.append([frame.index for frame in frames]).unique()
+        columns = self.dataframe.columns.append(
+            [frame.columns for frame in frames]).unique()
+        if len(frames) == 1:
+            incoming = frames[0]
+        else:
+            # Collapse all frames at once, keeping the last non missing value per cell
+            incoming = pd.concat(frames, axis=0)
+            incoming = incoming.groupby(level=0, sort=False).last()
+        incoming = incoming[~incoming.index.duplicated(keep="last")]
+        self.dataframe = self.dataframe.reindex(index=index, columns=columns)
+        self.dataframe.update(incoming)
 
     def get_feature_vector_string(self: SparkleFeatureDataCSV, instance: int) -> str:
         """Return the feature vector of an instance as str."""
@@ -133,33 +152,118 @@ class SparkleFeatureDataCSV(scsv.SparkleCSV):
 
         return feature_vector_string.strip()
 
+    def save_csv(self: SparkleFeatureDataCSV, csv_filepath: str = None) -> None:
+        """Write the feature data to a CSV file.
+
+        When saving to the own CSV path, the column statistics are written alongside
+        the feature data, so they do not need to be recomputed on the next use.
+
+        Args:
+            csv_filepath: String path to the csv file. Defaults to self.csv_filepath.
+        """
+        scsv.SparkleCSV.save_csv(self, csv_filepath)
+        if csv_filepath is None:
+            self.save_column_statistics()
+
+    @staticmethod
+    def get_statistics_path(csv_filepath: str) -> Path:
+        """Return the path of the column statistics belonging to a feature data CSV."""
+        return Path(csv_filepath).with_suffix(_statistics_suffix)
+
+    def calc_column_statistics(self: SparkleFeatureDataCSV) -> pd.DataFrame:
+        """Return the statistics over all non-missing values of each column.
+
+        Returns:
+            A DataFrame with a row per statistic (mean, median) and the feature
+            columns. Columns with only missing values have missing statistics.
+        """
+        values = self.dataframe.apply(pd.to_numeric, errors="coerce")
+        return pd.DataFrame([values.mean(), values.median()],
+                            index=[ImputationStrategy.MEAN.name,
+                                   ImputationStrategy.MEDIAN.name])
+
+    def save_column_statistics(self: SparkleFeatureDataCSV) -> None:
+        """Write the column statistics next to the feature data CSV."""
+        statistics_path = self.get_statistics_path(self.csv_filepath)
+        with statistics_path.open("w+") as fo:
+            fcntl.flock(fo.fileno(), fcntl.LOCK_EX)
+            self.calc_column_statistics().to_csv(fo)
+
+    @staticmethod
+    def load_column_statistics(csv_filepath: str) -> pd.DataFrame:
+        """Return the column statistics of a feature data CSV.
+
+        The cached statistics are used when they are at least as recent as the
+        feature data, otherwise they are recomputed and cached again.
+
+        Args:
+            csv_filepath: Path to the feature data CSV.
+
+        Returns:
+            A DataFrame with a row per statistic and the feature columns.
+        """
+        statistics_path = SparkleFeatureDataCSV.get_statistics_path(csv_filepath)
+        if (statistics_path.exists() and statistics_path.stat().st_mtime_ns
+                >= Path(csv_filepath).stat().st_mtime_ns):
+            return pd.read_csv(statistics_path, index_col=0)
+        feature_data_csv = SparkleFeatureDataCSV(csv_filepath)
+        feature_data_csv.save_column_statistics()
+        return feature_data_csv.calc_column_statistics()
+
+    @staticmethod
+    def get_imputation_vector(column_statistics: pd.DataFrame,
+                              strategy: ImputationStrategy = None,
+                              fill_value: float = 0.0) -> pd.Series:
+        """Return the value per column with which missing values are imputed.
+
+        Args:
+            column_statistics: The column statistics of the feature data.
+            strategy: The imputation strategy. Defaults to the strategy in the
+                settings.
+            fill_value: The value used by the constant strategy, and for columns
+                without any non-missing values.
+
+        Returns:
+            A Series with the imputation value for each column.
+        """
+        if strategy is None:
+            strategy = sgh.settings.get_general_feature_imputation_strategy()
+        if strategy == ImputationStrategy.CONSTANT:
+            return pd.Series(fill_value, index=column_statistics.columns)
+        return column_statistics.loc[strategy.name].fillna(fill_value)
+
     def calc_mean_over_all_non_missing_values_of_this_column(self: SparkleFeatureDataCSV,
                                                              column_name: str) -> float:
         """Return the mean over all non-missing values for this column."""
-        sum_value = 0
-        num = 0
-
-        for row_name in self.list_rows():
-            tmp_value = self.get_value(row_name, column_name)
-            if tmp_value != sgh.sparkle_missing_value:
-                num += 1
-                sum_value += tmp_value
-
-        if num == 0:
+        mean_value = pd.to_numeric(self.dataframe[column_name], errors="coerce").mean()
+        if np.isnan(mean_value):
             # all values are missing value
             return sgh.sparkle_missing_value
-
-        return sum_value / num
+        return mean_value
 
     def generate_mean_value_feature_vector(self: SparkleFeatureDataCSV) -> list[float]:
         """Return a list with the mean over all non-missing values for all columns."""
-        list_mean_value_feature_vector = []
-        for column_name in self.list_columns():
-            list_item = self.calc_mean_over_all_non_missing_values_of_this_column(
-                column_name)
-            list_mean_value_feature_vector.append(list_item)
+        return self.calc_column_statistics().loc[ImputationStrategy.MEAN.name].tolist()
 
-        return list_mean_value_feature_vector
+    def impute_missing_values(self: SparkleFeatureDataCSV,
+                              strategy: ImputationStrategy = None,
+                              fill_value: float = 0.0,
+                              columns: list[str] = None) -> None:
+        """Impute the missing data of this feature data CSV.
+
+        Args:
+            strategy: The imputation strategy. Defaults to the strategy in the
+                settings.
+            fill_value: The value used by the constant strategy, and for columns
+                without any non-missing values.
+            columns: The columns to impute. Defaults to all columns.
+        """
+        if columns is None:
+            columns = self.list_columns()
+        imputation_vector = self.get_imputation_vector(self.calc_column_statistics(),
+                                                       strategy, fill_value)
+        self.dataframe[columns] = self.dataframe[columns].fillna(
+            imputation_vector[columns])
 
     def impute_missing_value_of_this_column(self: SparkleFeatureDataCSV,
                                             column_name: str) -> None:
@@ -171,34 +275,13 @@ class SparkleFeatureDataCSV(scsv.SparkleCSV):
         Args:
             column_name: column to be imputed
         """
-        sum_value = 0
-        num = 0
-
-        list_missing_value_row_name = []
-        for row_name in self.list_rows():
-            tmp_value = self.get_value(row_name, column_name)
-            if tmp_value == np.nan:
-                # this is missing value
-                missing_item = row_name
-                list_missing_value_row_name.append(missing_item)
-            else:
-                # this is non-missing value
-                num += 1
-                sum_value += tmp_value
-
-        if len(list_missing_value_row_name) == 0 or num == 0:
-            return  # no missing value, or all missing values
-
-        mean_value = sum_value / num
-        for row_name in list_missing_value_row_name:
-            self.set_value(row_name, column_name, mean_value)
+        if self.dataframe[column_name].isnull().all():
+            return  # all missing values
+        self.impute_missing_values(ImputationStrategy.MEAN, columns=[column_name])
 
     def impute_missing_value_of_all_columns(self: SparkleFeatureDataCSV) -> None:
         """Impute missing data for all columns in this feature data CSV."""
-        for column_name in self.list_columns():
-            self.impute_missing_value_of_this_column(column_name)
-
-        return
+        self.impute_missing_values()
 
     def bool_exists_missing_value(self: SparkleFeatureDataCSV) -> bool:
         """Return whether there are missing values in the feature data."""
@@ -6,18 +6,66 @@
 from __future__ import annotations
 from typing import Callable
 import fcntl
+import json
+import os
 from pathlib import Path
 import sys
+import warnings
 
+import statistics
 from statistics import mean
+import numpy as np
 import pandas as pd
 import global_variables as sgh
 from sparkle.platform import settings_help
+from sparkle.platform import fingerprint_help as sfph
 
 global settings
 sgh.settings = settings_help.Settings()
 
 
+# File suffix used for storing performance data in each format
+_data_format_suffixes = {settings_help.DataFormat.CSV: ".csv",
+                         settings_help.DataFormat.PARQUET: ".parquet"}
+
+# Suffixes of the journal of results that are not yet written to the stored data
+_journal_suffix = ".journal"
+_compacting_suffix = ".compacting"
+
+# Run aggregators with a vectorised, missing value ignoring, NumPy equivalent
+_numpy_run_aggregators = {mean: np.nanmean,
+                          statistics.median: np.nanmedian,
+                          min: np.nanmin,
+                          max: np.nanmax,
+                          sum: np.nansum,
+                          np.mean: np.nanmean,
+                          np.median: np.nanmedian,
+                          np.min: np.nanmin,
+                          np.max: np.nanmax,
+                          np.sum: np.nansum}
+
+
+def aggregate_runs(cube: np.ndarray, run_aggregator: Callable = mean) -> np.ndarray:
+    """Aggregate the runs of an instance x run x solver array.
+
+    Args:
+        cube: The 3D array of values.
+        run_aggregator: Callable combining the values of multiple runs.
+
+    Returns:
+        A 2D instance x solver array.
+    """
+    if cube.shape[1] == 1:
+        return cube[:, 0, :]
+    with warnings.catch_warnings():
+        # All-NaN slices are allowed and result in NaN
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        if run_aggregator in _numpy_run_aggregators:
+            return _numpy_run_aggregators[run_aggregator](cube, axis=1)
+    return np.apply_along_axis(
+        lambda runs: run_aggregator(runs[~np.isnan(runs)]), 1, cube)
+
+
 class PerformanceDataFrame():
     """Class to manage performance data and common operations on them."""
 
@@ -63,27 +111,15 @@ class PerformanceDataFrame():
         # Runs is a ``static'' dimension
         self.n_runs = n_runs
         self.run_ids = list(range(1, self.n_runs + 1))
+        # Number of bytes of each journal file (by inode) applied to the dataframe
+        self.journal_bytes_applied = {}
         if init_df:
-            if self.csv_filepath.exists():
-                self.dataframe = pd.read_csv(csv_filepath, index_col=0)
-                # Enforce dimensions
-                if self.multi_dim_names[0] not in self.dataframe.columns:
-                    # No Objective, cast column
-                    self.objective_names = [self.multi_dim_names[0]]
-                    self.dataframe[self.multi_dim_names[0]] = self.objective_names[0]
-                    self.multi_objective = False
-                if self.multi_dim_names[2] not in self.dataframe.columns:
-                    # No runs column
-                    self.n_runs = 1
-                    self.dataframe[self.multi_dim_names[2]] = self.n_runs
-                    self.run_ids = [self.n_runs]
-                if self.multi_dim_names[1] not in self.dataframe.columns:
-                    # Instances are listed as rows, force into column
-                    self.dataframe = self.dataframe.reset_index().rename(
-                        columns={"index": self.multi_dim_names[1]})
-
-                # Cast Columns to multi dim
-                self.dataframe = self.dataframe.set_index(self.multi_dim_names)
+            load_path = self.get_stored_path(self.csv_filepath)
+            if load_path is not None:
+                self.dataframe = self.read_dataframe(load_path)
+                # Overlay the results that have not been compacted yet
+                for journal_path in self.get_journal_paths():
+                    self.apply_journal(journal_path)
             else:
                 # Initialize empty DataFrame
                 midx = pd.MultiIndex.from_product(
@@ -94,6 +130,166 @@ class PerformanceDataFrame():
                                               columns=solvers)
                 self.save_csv()
 
+    @staticmethod
+    def get_stored_path(csv_filepath: Path) -> Path | None:
+        """Return the path under which the data for this CSV path is stored.
+
+        The data can be stored in any of the DataFormats, with the file suffix
+        indicating the format. If multiple exist, the most recently written is used.
+
+        Args:
+            csv_filepath: The CSV path of the performance data.
+
+        Returns:
+            The path of the stored data, or None if no stored data exists.
+        """
+        candidates = [path for path in
+                      (Path(csv_filepath).with_suffix(suffix)
+                       for suffix in _data_format_suffixes.values())
+                      if path.exists()]
+        if len(candidates) == 0:
+            return None
+        return max(candidates, key=lambda path: path.stat().st_mtime)
+
+    def get_storage_path(self: PerformanceDataFrame,
+                         data_format: settings_help.DataFormat = None) -> Path:
+        """Return the path to save to for a given format.
+
+        Args:
+            data_format: The DataFormat. Defaults to the format set in the settings.
+        """
+        if data_format is None:
+            data_format = sgh.settings.get_general_performance_data_format()
+        return self.csv_filepath.with_suffix(_data_format_suffixes[data_format])
+
+    def get_journal_paths(self: PerformanceDataFrame) -> list[Path]:
+        """Return the existing journal files, oldest first."""
+        journal_path = self.csv_filepath.with_suffix(_journal_suffix)
+        compacting_path = journal_path.with_name(journal_path.name + _compacting_suffix)
+        return [path for path in (compacting_path, journal_path) if path.exists()]
+
+    @staticmethod
+    def append_to_journal(csv_filepath: Path,
+                          value: float,
+                          solver: str,
+                          instance: str,
+                          objective: str = None,
+                          run: int = None) -> None:
+        """Append a result to the journal of the performance data.
+
+        Appending is atomic and does not require loading the performance data, which
+        makes it the preferred way for jobs to store their results. The journal is
+        overlayed when loading the data and folded into it by save_csv.
+
+        Args:
+            csv_filepath: The CSV path of the performance data.
+            value: Float value to be assigned.
+            solver: The solver that produced the value.
+            instance: The instance that the value was produced on.
+            objective: The objective for which the result was produced.
+                Optional in case of using single objective.
+            run: The run index for which the result was produced.
+                Optional in case of doing single run results.
+        """
+        journal_path = Path(csv_filepath).with_suffix(_journal_suffix)
+        record = json.dumps([objective, instance, run, solver, float(value)]) + "\n"
+        while True:
+            with journal_path.open("a") as fo:
+                fcntl.flock(fo.fileno(), fcntl.LOCK_EX)
+                # The journal may have been moved for compaction while waiting
+                if journal_path.exists() and\
+                        os.fstat(fo.fileno()).st_ino == journal_path.stat().st_ino:
+                    fo.write(record)
+                    return
+
+    def apply_journal(self: PerformanceDataFrame,
+                      journal_path: Path,
+                      wait_for_writers: bool = False) -> None:
+        """Set the values of the records in a journal file that were not yet applied.
+
+        Records of solvers or instances that are not in the DataFrame are ignored,
+        with a warning.
+
+        Args:
+            journal_path: Path to the journal file.
+            wait_for_writers: Whether to wait for records being appended.
+        """
+        with journal_path.open("rb") as fo:
+            if wait_for_writers:
+                fcntl.flock(fo.fileno(), fcntl.LOCK_EX)
+            inode = os.fstat(fo.fileno()).st_ino
+            start = self.journal_bytes_applied.get(inode, 0)
+            fo.seek(start)
+            data = fo.read()
+        # Only consume complete records
+        data = data[:data.rfind(b"\n") + 1]
+        self.journal_bytes_applied[inode] = start + len(data)
+        records = [json.loads(line) for line in data.decode().splitlines()]
+        instances = set(self.dataframe.index.unique(self.multi_dim_names[1]))
+        solvers = set(self.dataframe.columns)
+        n_records = len(records)
+        records = [record for record in records
+                   if record[1] in instances and record[3] in solvers]
+        if len(records) < n_records:
+            print(f"WARNING: {n_records - len(records)} result(s) in {journal_path} "
+                  "are of a solver or instance that is not in the performance data, "
+                  "and are ignored")
+        if len(records) == 0:
+            return
+        objectives, instances, runs, solvers, values = zip(*records)
+        self.set_values(values, solvers, instances, objectives, runs)
+
+    def fold_journal(self: PerformanceDataFrame) -> list[Path]:
+        """Apply all journalled results for compaction into the stored data.
+
+        The journal is moved aside, so jobs can continue to append to a new journal.
+
+        Returns:
+            The journal files that can be removed once the data has been saved.
+        """
+        journal_path = self.csv_filepath.with_suffix(_journal_suffix)
+        compacting_path = journal_path.with_name(journal_path.name + _compacting_suffix)
+        if not compacting_path.exists() and journal_path.exists():
+            journal_path.rename(compacting_path)
+        if not compacting_path.exists():
+            return []
+        self.apply_journal(compacting_path, wait_for_writers=True)
+        return [compacting_path]
+
+    def read_dataframe(self: PerformanceDataFrame, filepath: Path) -> pd.DataFrame:
+        """Read the stored data and cast it to the multi dimensional format.
+
+        Args:
+            filepath: Path to the stored data, the suffix determines the format.
+        """
+        if filepath.suffix == _data_format_suffixes[settings_help.DataFormat.PARQUET]:
+            # Binary data is stored with its MultiIndex and float types
+            dataframe = pd.read_parquet(filepath)
+            self.objective_names = dataframe.index.unique(0).tolist()
+            self.multi_objective = len(self.objective_names) > 1
+            self.run_ids = dataframe.index.unique(2).tolist()
+            self.n_runs = len(self.run_ids)
+            return dataframe
+        dataframe = pd.read_csv(filepath, index_col=0)
+        # Enforce dimensions
+        if self.multi_dim_names[0] not in dataframe.columns:
+            # No Objective, cast column
+            self.objective_names = [self.multi_dim_names[0]]
+            dataframe[self.multi_dim_names[0]] = self.objective_names[0]
+            self.multi_objective = False
+        if self.multi_dim_names[2] not in dataframe.columns:
+            # No runs column
+            self.n_runs = 1
+            dataframe[self.multi_dim_names[2]] = self.n_runs
+            self.run_ids = [self.n_runs]
+        if self.multi_dim_names[1] not in dataframe.columns:
+            # Instances are listed as rows, force into column
+            dataframe = dataframe.reset_index().rename(
+                columns={"index": self.multi_dim_names[1]})
+
+        # Cast Columns to multi dim
+        return dataframe.set_index(self.multi_dim_names)
+
     def verify_objective(self: PerformanceDataFrame,
                          objective: str) -> str:
         """Method to check whether the specified objective is valid.
@@ -197,7 +393,6 @@ class PerformanceDataFrame():
             self.dataframe = pd.concat([self.dataframe, edf])
         return
 
-    # Can we make this handle a sequence of inputs instead of just 1?
     def set_value(self: PerformanceDataFrame,
                   value: float,
                   solver: str,
@@ -218,6 +413,99 @@ class PerformanceDataFrame():
         objective, run = self.verify_indexing(objective, run)
         self.dataframe.loc[(objective, instance, run), solver] = value
 
+    def get_positions(self: PerformanceDataFrame,
+                      solvers: list[str],
+                      instances: list[str],
+                      objectives: list[str] = None,
+                      runs: list[int] = None) -> tuple[np.ndarray, np.ndarray]:
+        """Return the row and column positions of many cells in the Dataframe.
+
+        Args:
+            solvers: The solver of each cell.
+            instances: The instance of each cell.
+            objectives: The objective of each cell. Optional in case of using single
+                objective, in which case None entries are also allowed.
+            runs: The run index of each cell. Optional in case of single run results,
+                in which case None entries are also allowed.
+
+        Returns:
+            Arrays of the row and column positions, -1 for cells that do not exist.
+        """
+        instances = list(instances)
+        if objectives is None:
+            objectives = [self.verify_objective(None)] * len(instances)
+        else:
+            objectives = [self.verify_objective(o) for o in objectives]
+        if runs is None:
+            runs = [self.verify_run_id(None)] * len(instances)
+        else:
+            runs = [self.verify_run_id(r) for r in runs]
+        keys = pd.MultiIndex.from_arrays([objectives, instances, runs])
+        rows = self.dataframe.index.get_indexer(keys)
+        columns = self.dataframe.columns.get_indexer(list(solvers))
+        return rows, columns
+
+    def set_values(self: PerformanceDataFrame,
+                   values: list[float],
+                   solvers: list[str],
+                   instances: list[str],
+                   objectives: list[str] = None,
+                   runs: list[int] = None) -> None:
+        """Assign many values to the Dataframe in place.
+
+        All arguments are sequences of equal length, describing one value each. Only
+        the given cells are written, with one vectorised write per solver. Cells that
+        are not yet in the Dataframe are added one by one with set_value.
+
+        Args:
+            values: Float values to be assigned.
+            solvers: The solver that produced each value.
+            instances: The instance that each value was produced on.
+            objectives: The objective for which each value was produced.
+                Optional in case of using single objective.
+            runs: The run index for which each value was produced.
+                Optional in case of doing single run results.
+        """
+        values = np.asarray(values, dtype=float)
+        rows, columns = self.get_positions(solvers, instances, objectives, runs)
+        found = (rows >= 0) & (columns >= 0)
+        if found.any():
+            n_columns = len(self.dataframe.columns)
+            # When a cell is given multiple times, the last value is assigned
+            cells = (rows * n_columns + columns)[found][::-1]
+            cells, last = np.unique(cells, return_index=True)
+            cell_values = values[found][::-1][last]
+            cell_rows, cell_columns = np.divmod(cells, n_columns)
+            for column in np.unique(cell_columns):
+                if self.dataframe.dtypes.iloc[column] != float:
+                    # Columns read without fractional values are integer typed
+                    self.dataframe.isetitem(
+                        column, self.dataframe.iloc[:, column].astype(float))
+                in_column = cell_columns == column
+                self.dataframe.iloc[cell_rows[in_column], column] =\
+                    cell_values[in_column]
+        for i in np.flatnonzero(~found):
+            self.set_value(values[i], solvers[i], instances[i],
+                           None if objectives is None else objectives[i],
+                           None if runs is None else runs[i])
+
+    def get_values(self: PerformanceDataFrame,
+                   solvers: list[str],
+                   instances: list[str],
+                   objectives: list[str] = None,
+                   runs: list[int] = None) -> np.ndarray:
+        """Index many values of the DataFrame at once, see set_values.
+
+        Returns:
+            Float array of the values, NaN for cells that are not in the Dataframe.
+        """
+        rows, columns = self.get_positions(solvers, instances, objectives, runs)
+        found = (rows >= 0) & (columns >= 0)
+        values = np.full(rows.size, np.nan)
+        values[found] = self.dataframe.to_numpy(dtype=float)[rows[found],
+                                                             columns[found]]
+        return values
+
     def remove_solver(self: PerformanceDataFrame, solver_name: str) -> None:
         """Drop a solver from the Dataframe."""
         self.dataframe.drop(solver_name, axis=1, inplace=True)
@@ -264,15 +552,55 @@ class PerformanceDataFrame():
         return self.dataframe.index.levels[1].tolist()
 
     def save_csv(self: PerformanceDataFrame, csv_filepath: Path = None) -> None:
-        """Write a CSV to the given path.
+        """Write the data to the given path.
+
+        When writing to the own storage path, the journal is compacted into the data.
+        The file is replaced atomically, so readers never see partially written data.
 
         Args:
-            csv_filepath: String path to the csv file. Defaults to self.csv_filepath.
+            csv_filepath: Path to write to, the suffix determines the format. Defaults
+                to self.csv_filepath in the format set in the settings.
         """
-        csv_filepath = self.csv_filepath if csv_filepath is None else csv_filepath
-        with csv_filepath.open("w+") as fo:
-            fcntl.flock(fo.fileno(), fcntl.LOCK_EX)
-            self.dataframe.to_csv(csv_filepath)
+        compacted_journals = []
+        if csv_filepath is None:
+            csv_filepath = self.get_storage_path()
+            compacted_journals = self.fold_journal()
+        csv_filepath = Path(csv_filepath)
+        # Write to a temporary file first, so the data is never left partially written
+        tmp_filepath = csv_filepath.with_name(
+            f".{csv_filepath.name}.{os.getpid()}.tmp")
+        if csv_filepath.suffix ==\
+                _data_format_suffixes[settings_help.DataFormat.PARQUET]:
+            self.dataframe.astype(float).to_parquet(tmp_filepath)
+        else:
+            self.dataframe.to_csv(tmp_filepath)
+        tmp_filepath.replace(csv_filepath)
+        for journal_path in compacted_journals:
+            self.journal_bytes_applied.pop(journal_path.stat().st_ino, None)
+            journal_path.unlink()
+
+    def get_job_array(self: PerformanceDataFrame, rerun: bool = False) \
+            -> tuple[np.ndarray, np.ndarray]:
+        """Return the performance computation jobs as arrays of positions.
+
+        Args:
+            rerun: Boolean indicating if we want to rerun all jobs
+
+        Returns:
+            Arrays of the row and column positions of the jobs, in row major order.
+        """
+        if rerun:
+            mask = np.ones(self.dataframe.shape, dtype=bool)
+        else:
+            mask = self.dataframe.isnull().to_numpy()
+        return np.nonzero(mask)
+
+    def get_row_keys(self: PerformanceDataFrame) -> list:
+        """Return the row keys, simplified to the instance for unused dimensions."""
+        index = self.dataframe.index
+        if not self.multi_objective and self.n_runs == 1:
+            return index.get_level_values(self.multi_dim_names[1]).tolist()
+        return index.tolist()
 
     def get_job_list(self: PerformanceDataFrame, rerun: bool = False) \
             -> list[tuple[str, str]]:
@@ -285,30 +613,23 @@ class PerformanceDataFrame():
         Args:
             rerun: Boolean indicating if we want to rerun all jobs
         """
-        df = self.dataframe.stack(future_stack=True)
-        if not rerun:
-            df = df[df.isnull()]
+        rows, columns = self.get_job_array(rerun)
+        index = self.dataframe.index
         if not self.multi_objective:
-            df.index = df.index.droplevel(["Objective"])
+            index = index.droplevel(["Objective"])
         if self.n_runs == 1:
-            df.index = df.index.droplevel(["Run"])
-        return df.index.tolist()
+            index = index.droplevel(["Run"])
+        keys = index[rows].tolist()
+        solvers = self.dataframe.columns[columns].tolist()
+        if index.nlevels == 1:
+            return list(zip(keys, solvers))
+        return [(*key, solver) for key, solver in zip(keys, solvers)]
 
     def get_list_recompute_performance_computation_job(self: PerformanceDataFrame)\
             -> list[list[list]]:
         """Return column-row combinations in the dataframe as [[row, all_columns]]."""
-        list_recompute_performance_computation_job = []
         list_column_name = self.dataframe.columns.to_list()
-
-        for row_name in self.dataframe.index:
-            if not self.multi_objective and self.n_runs == 1:
-                # Simplification for unused dimensions
-                list_item = [row_name[1], list_column_name]
-            else:
-                list_item = [row_name, list_column_name]
-            list_recompute_performance_computation_job.append(list_item)
-
-        return list_recompute_performance_computation_job
+        return [[row_key, list_column_name] for row_key in self.get_row_keys()]
 
     def get_list_remaining_performance_computation_job(self: PerformanceDataFrame) \
             -> list[list[list]]:
@@ -316,21 +637,10 @@ class PerformanceDataFrame():
 
         This will return any objective/instance/run combination.
         """
-        list_remaining_performance_computation_job = []
-        bool_array_isnull = self.dataframe.isnull()
-        for row_name in self.dataframe.index:
-            current_solver_list = []
-            for column_name in self.dataframe.columns:
-                flag_value_is_null = bool_array_isnull.at[row_name, column_name]
-                if flag_value_is_null:
-                    current_solver_list.append(column_name)
-            if not self.multi_objective and self.n_runs == 1:
-                # Simplification for unused dimensions
-                list_item = [row_name[1], current_solver_list]
-            else:
-                list_item = [row_name, current_solver_list]
-            list_remaining_performance_computation_job.append(list_item)
-        return list_remaining_performance_computation_job
+        bool_array_isnull = self.dataframe.isnull().to_numpy()
+        columns = self.dataframe.columns.to_numpy()
+        return [[row_key, columns[row_isnull].tolist()]
+                for row_key, row_isnull in zip(self.get_row_keys(), bool_array_isnull)]
 
     def get_best_performance_per_instance(
             self: PerformanceDataFrame,
@@ -355,6 +665,94 @@ class PerformanceDataFrame():
             agg_runs = self.dataframe.loc[(objective), :].groupby(level=0).run_agg()
             return best(agg_runs, axis=1).to_list()
 
+    def get_objective_cube(self: PerformanceDataFrame,
+                           objective: str = None,
+                           run_id: int = None) -> tuple[list[str], np.ndarray]:
+        """Return the values of one objective as an instance x run x solver array.
+
+        Instances keep their order of appearance in the DataFrame. When instances
+        have an unequal number of runs, the missing runs are padded with NaN.
+
+        Args:
+            objective: The objective to select. Optional in case of single objective.
+            run_id: If given, only select this run.
+
+        Returns:
+            A tuple of the list of instance names and the 3D array of values.
+        """
+        objective = self.verify_objective(objective)
+        sub_df = self.dataframe.xs(objective, level=self.multi_dim_names[0])
+        if run_id is not None:
+            sub_df = sub_df[
+                sub_df.index.get_level_values(self.multi_dim_names[2]) == run_id]
+        values = sub_df.to_numpy(dtype=float)
+        codes, instances = pd.factorize(
+            sub_df.index.get_level_values(self.multi_dim_names[1]))
+        counts = np.bincount(codes, minlength=len(instances))
+        if counts.size > 0 and (counts == counts[0]).all()\
+                and (np.diff(codes) >= 0).all():
+            # Fast path: each instance is a contiguous block of equally many runs
+            return instances.tolist(), values.reshape(len(instances), counts[0], -1)
+        order = np.argsort(codes, kind="stable")
+        run_pos = np.arange(codes.size) - np.repeat(np.cumsum(counts) - counts, counts)
+        cube = np.full((len(instances), counts.max(initial=0), values.shape[1]),
+                       np.nan)
+        cube[codes[order], run_pos] = values[order]
+        return instances.tolist(), cube
+
+    def get_penalised_performance_matrix(
+            self: PerformanceDataFrame,
+            minimise: bool,
+            objective: str = None,
+            capvalue_list: list[float] = None,
+            run_aggregator: Callable = mean) -> pd.DataFrame:
+        """Return the capped, penalised and run aggregated score per instance/solver.
+
+        Args:
+            minimise: Whether we should minimise or maximise the score
+            objective: The objective for which we calculate the scores
+            capvalue_list: The minimum/maximum scoring value per instance. Values
+                exceeding the cap are replaced by the cap times the penalty multiplier.
+                If None, no values are capped.
+            run_aggregator: How we aggregate multiple runs for an instance-solver
+                combination. Only relevant for multi-runs.
+
+        Returns:
+            DataFrame with the instances as rows and the solvers as columns.
+        """
+        instances, cube = self.get_objective_cube(objective)
+        if capvalue_list is not None:
+            penalty_factor = sgh.settings.get_general_penalty_multiplier()
+            capvalues = np.asarray(capvalue_list, dtype=float)[:len(instances)]
+            capvalues = capvalues[:, np.newaxis, np.newaxis]
+            exceeds = cube > capvalues if minimise else cube < capvalues
+            cube = np.where(exceeds, capvalues * penalty_factor, cube)
+        scores = aggregate_runs(cube, run_aggregator)
+        return pd.DataFrame(scores, index=instances, columns=self.dataframe.columns)
+
+    def get_virtual_best_score_per_instance(
+            self: PerformanceDataFrame,
+            minimise: bool,
+            objective: str = None,
+            capvalue_list: list[float] = None,
+            run_aggregator: Callable = mean) -> pd.Series:
+        """Return the VBS score for every instance, see get_penalised_performance_matrix.
+
+        Returns:
+            Series with the VBS score indexed by instance name.
+        """
+        scores = self.get_penalised_performance_matrix(
+            minimise, objective, capvalue_list, run_aggregator)
+        if scores.columns.size == 0:
+            print("WARNING: PerformanceDataFrame could not calculate VBS, no solvers "
+                  f"in {self.csv_filepath}")
+            return pd.Series(0.0, index=scores.index)
+        with warnings.catch_warnings():
+            # All-NaN instances are allowed and result in NaN
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            best = np.nanmin if minimise else np.nanmax
+            return pd.Series(best(scores.to_numpy(), axis=1), index=scores.index)
+
     def calc_portfolio_vbs_instance(
             self: PerformanceDataFrame,
             instance: str,
@@ -376,122 +774,186 @@ class PerformanceDataFrame():
             The virtual best solver performance for this instance.
         """
         objective = self.verify_objective(objective)
-        penalty_factor = sgh.settings.get_general_penalty_multiplier()
-        if capvalue is None:
-            capvalue = sys.float_info.max
-            if not minimise:
-                capvalue = capvalue * -1
-        penalty = penalty_factor * capvalue
-        virtual_best_score = None
-        for solver in self.dataframe.columns:
-            if isinstance(instance, str):
-                runs = self.dataframe.loc[(objective, instance), solver]
-                if minimise:
-                    runs[runs > capvalue] = penalty
-                else:
-                    runs[runs < capvalue] = penalty
-                score_solver = run_aggregator(runs)
-            else:
-                score_solver = float(self.dataframe.loc[instance, solver])
-            if virtual_best_score is None or\
-                    minimise and virtual_best_score > score_solver or\
-                    not minimise and virtual_best_score < score_solver:
-                virtual_best_score = score_solver
-
-        # Shouldn't this throw an error?
-        if virtual_best_score is None and len(self.dataframe.columns) == 0:
+        if self.dataframe.columns.size == 0:
             print("WARNING: PerformanceDataFrame could not calculate VBS "
                   f"instance {instance}")
-            virtual_best_score = 0
-
-        return virtual_best_score
+            return 0
+        if not isinstance(instance, str):
+            # Full index given, no runs to aggregate
+            values = self.dataframe.loc[instance].to_numpy(dtype=float)
+            return float(np.nanmin(values) if minimise else np.nanmax(values))
+        runs = self.dataframe.loc[(objective, instance)].to_numpy(dtype=float)
+        if capvalue is not None:
+            penalty = capvalue * sgh.settings.get_general_penalty_multiplier()
+            exceeds = runs > capvalue if minimise else runs < capvalue
+            runs = np.where(exceeds, penalty, runs)
+        scores = aggregate_runs(runs[np.newaxis], run_aggregator)[0]
+        return float(np.nanmin(scores) if minimise else np.nanmax(scores))
 
     def calc_virtual_best_performance_of_portfolio(
             self: PerformanceDataFrame,
             aggregation_function: Callable[[list[float]], float],
             minimise: bool,
             capvalue_list: list[float],
-            objective: str = None) -> float:
+            objective: str = None,
+            run_aggregator: Callable = mean) -> float:
         """Return the overall VBS performance of the portfolio.
 
         Args:
             aggregation_function: The method of combining all VBS scores together
             minimise: Whether the scores are minimised or not
             capvalue_list: List of capvalue per instance
+            objective: The objective for which we calculate the VBS
+            run_aggregator: How we aggregate multiple runs for an instance-solver
+                combination. Only relevant for multi-runs.
 
         Returns:
             The combined virtual best performance of the portfolio over all instances.
         """
-        objective = self.verify_objective(objective)
-        virtual_best = []
-        capvalue = None
-        for idx, instance in enumerate(self.dataframe.index):
-            if capvalue_list is not None:
-                capvalue = capvalue_list[idx]
+        virtual_best = self.get_virtual_best_score_per_instance(
+            minimise, objective, capvalue_list, run_aggregator)
+        return aggregation_function(virtual_best.tolist())
+
+    def get_leave_out_virtual_best_scores(
+            self: PerformanceDataFrame,
+            minimise: bool,
+            solver_subsets: list[list[str]] = None,
+            objective: str = None,
+            capvalue_list: list[float] = None,
+            run_aggregator: Callable = mean) -> np.ndarray:
+        """Return the VBS score per instance of the portfolio without solver subsets.
+
+        For leaving out single solvers, the scores follow from the best and second
+        best score per instance. For other subsets, the solvers are ranked per
+        instance once, after which the best solver outside each subset is taken.
+
+        Args:
+            minimise: Whether we should minimise or maximise the score
+            solver_subsets: The groups of solvers to leave out. Defaults to leaving
+                out each solver by itself, in column order.
+            objective: The objective for which we calculate the scores
+            capvalue_list: The minimum/maximum scoring value per instance
+            run_aggregator: How we aggregate multiple runs for an instance-solver
+                combination. Only relevant for multi-runs.
+
+        Returns:
+            Array with the instances as rows and a column per left out subset. An
+            empty portfolio solves nothing, so it scores the penalised cap value, or
+            without caps the penalised time when minimising and NaN when maximising.
+        """
+        scores = self.get_penalised_performance_matrix(
+            minimise, objective, capvalue_list, run_aggregator).to_numpy(dtype=float)
+        n_instances, n_solvers = scores.shape
+        if capvalue_list is not None:
+            penalty_factor = sgh.settings.get_general_penalty_multiplier()
+            empty_scores = (np.asarray(capvalue_list, dtype=float)[:n_instances]
+                            * penalty_factor)
+        elif minimise:
+            # Never better than the worst solver, also for other scores than run time
+            worst = np.full(n_instances, np.nan)
+            if n_solvers > 0:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", category=RuntimeWarning)
+                    worst = np.nanmax(scores, axis=1)
+            empty_scores = np.fmax(worst, float(sgh.settings.get_penalised_time()))
+        else:
+            empty_scores = np.full(n_instances, np.nan)
+        sign = 1.0 if minimise else -1.0
+        # Rank by the signed score, missing scores rank last
+        ranked = np.where(np.isnan(scores), np.inf, sign * scores)
+        rows = np.arange(n_instances)
+        if solver_subsets is None:
+            if n_solvers < 2:
+                return np.repeat(empty_scores[:, np.newaxis], n_solvers, axis=1)
+            best_index = ranked.argmin(axis=1)
+            best = ranked[rows, best_index]
+            without_best = ranked.copy()
+            without_best[rows, best_index] = np.inf
+            second = without_best.min(axis=1)
+            is_best = best_index[:, np.newaxis] == np.arange(n_solvers)
+            leave_out = np.where(is_best, second[:, np.newaxis], best[:, np.newaxis])
+        else:
+            columns = self.dataframe.columns
+            order = ranked.argsort(axis=1, kind="stable")
+            ranked_sorted = np.take_along_axis(ranked, order, axis=1)
+            leave_out = np.zeros((n_instances, len(solver_subsets)))
+            for index, subset in enumerate(solver_subsets):
+                remaining = ~np.isin(order, columns.get_indexer(subset))
+                if not remaining.any():
+                    leave_out[:, index] = sign * empty_scores
+                    continue
+                first = remaining.argmax(axis=1)
+                leave_out[:, index] = ranked_sorted[rows, first]
+        leave_out = np.where(np.isinf(leave_out), np.nan, leave_out)
+        return sign * leave_out
+
+    def calc_leave_out_virtual_best_performances(
+            self: PerformanceDataFrame,
+            aggregation_function: Callable[[list[float]], float],
+            minimise: bool,
+            capvalue_list: list[float],
+            solver_subsets: list[list[str]] = None,
+            objective: str = None,
+            run_aggregator: Callable = mean) -> list[float]:
+        """Return the overall VBS performance of the portfolio without solver subsets.
 
-            virtual_best_score = (
-                self.calc_portfolio_vbs_instance(
-                    instance, minimise, objective, capvalue))
-            virtual_best.append(virtual_best_score)
+        See get_leave_out_virtual_best_scores, all subsets are evaluated in a single
+        pass over the performance data.
 
-        return aggregation_function(virtual_best)
+        Returns:
+            The combined virtual best performance over all instances per subset.
+        """
+        leave_out = self.get_leave_out_virtual_best_scores(
+            minimise, solver_subsets, objective, capvalue_list, run_aggregator)
+        return [aggregation_function(column.tolist()) for column in leave_out.T]
 
     def get_dict_vbs_penalty_time_on_each_instance(
             self: PerformanceDataFrame,
             objective: str = None,
             run_id: int = None) -> dict:
         """Return a dictionary of penalised runtimes and instances for the VBS."""
-        objective = self.verify_objective(objective)
-        instance_penalized_runtimes = {}
         vbs_penalty_time = sgh.settings.get_penalised_time()
-        for instance in self.dataframe.index.levels[1]:
-            if run_id is None:
-                runtime = self.dataframe.loc[(objective, instance), :].min(axis=None)
-            else:
-                runtime =\
-                    self.dataframe.loc[(objective, instance, run_id), :].min(axis=None)
-            instance_penalized_runtimes[instance] = min(vbs_penalty_time, runtime)
-
-        return instance_penalized_runtimes
+        instances, cube = self.get_objective_cube(objective, run_id)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            runtimes = np.nanmin(cube, axis=(1, 2), initial=np.inf)
+        # Missing values are ignored in favour of the penalty time
+        runtimes = np.fmin(runtimes, vbs_penalty_time)
+        return dict(zip(instances, runtimes.tolist()))
 
     def calc_vbs_penalty_time(self: PerformanceDataFrame,
                               objective: str = None,
                               run_id: int = None) -> float:
         """Return the penalised performance of the VBS."""
-        objective = self.verify_objective(objective)
         cutoff_time = sgh.settings.get_general_target_cutoff_time()
         penalty_multiplier = sgh.settings.get_general_penalty_multiplier()
         penalty_time_each_run = cutoff_time * penalty_multiplier
 
-        # Calculate the minimum for the selected objective per instance
-        if run_id is not None:
-            min_instance_df =\
-                self.dataframe.loc(axis=0)[objective, :, run_id].min(axis=1)
-        else:
-            min_instance_df =\
-                self.dataframe.loc(axis=0)[objective, :, :].min(axis=1)
+        # Calculate the minimum for the selected objective per instance and run
+        _, cube = self.get_objective_cube(objective, run_id)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            min_instance = np.nanmin(cube, axis=2)
         # Penalize those exceeding cutoff
-        min_instance_df[min_instance_df > cutoff_time] = penalty_time_each_run
+        min_instance[min_instance > cutoff_time] = penalty_time_each_run
         # Return average
-        return min_instance_df.sum() / self.dataframe.index.size
+        return np.nansum(min_instance) / self.dataframe.index.size
 
     def get_solver_penalty_time_ranking_list(self: PerformanceDataFrame,
                                              objective: str = None) -> list[list[float]]:
         """Return a list with solvers ranked by penalised runtime."""
-        objective = self.verify_objective(objective)
         cutoff_time = sgh.settings.get_general_target_cutoff_time()
-
-        solver_penalty_time_ranking_list = []
         penalty_time_each_run =\
             cutoff_time * sgh.settings.get_general_penalty_multiplier()
         num_instances = self.dataframe.index.size
-        sub_df = self.dataframe.loc(axis=0)[objective, :, :]
-        for solver in self.dataframe.columns:
-            masked_col = sub_df[solver]
-            masked_col[masked_col > cutoff_time] = penalty_time_each_run
-            this_penalty_time = masked_col.sum() / num_instances
-            solver_penalty_time_ranking_list.append([solver, this_penalty_time])
-
+        _, cube = self.get_objective_cube(objective)
+        values = cube.reshape(-1, cube.shape[2])
+        values = np.where(values > cutoff_time, penalty_time_each_run, values)
+        penalty_times = np.nansum(values, axis=0) / num_instances
+
+        solver_penalty_time_ranking_list = [
+            [solver, penalty_time] for solver, penalty_time
+            in zip(self.dataframe.columns, penalty_times.tolist())]
         # Sort the list by second value (the penalised run time)
         solver_penalty_time_ranking_list.sort(
             key=lambda this_penalty_time: this_penalty_time[1])
@@ -501,6 +963,9 @@ class PerformanceDataFrame():
     def clean_csv(self: PerformanceDataFrame) -> None:
         """Set all values in Performance Data to None."""
         self.dataframe[:] = sgh.sparkle_missing_value
+        # Discard the results that were not compacted yet
+        for journal_path in self.get_journal_paths():
+            journal_path.unlink()
         self.save_csv()
 
     def copy(self: PerformanceDataFrame,
@@ -517,13 +982,20 @@ class PerformanceDataFrame():
         return pd_copy
 
     def to_autofolio(self: PerformanceDataFrame) -> Path:
-        """Port the data to a format acceptable for AutoFolio."""
+        """Port the data to a format acceptable for AutoFolio.
+
+        The port is only rewritten when the data changed since it was last written.
+        """
         if self.multi_objective or self.n_runs > 1:
             print(f"ERROR: Currently no porting available for {self.csv_filepath} "
                   "to Autofolio due to multi objective or number of runs.")
             return
+        path = self.csv_filepath.parent / f"autofolio_{self.csv_filepath.name}"
+        fingerprint = sfph.get_fingerprint(self.dataframe)
+        if sfph.fingerprint_unchanged(path, fingerprint):
+            return path
         autofolio_df = self.dataframe.copy()
         autofolio_df.index = autofolio_df.index.droplevel(["Objective", "Run"])
-        path = self.csv_filepath.parent / f"autofolio_{self.csv_filepath.name}"
         autofolio_df.to_csv(path)
+        sfph.write_fingerprint(path, fingerprint)
         return path
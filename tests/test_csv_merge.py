@@ -0,0 +1,93 @@
+"""Test functionalities related to the csv merge module."""
+
+from __future__ import annotations
+from unittest import TestCase
+from pathlib import Path
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from sparkle.structures import csv_merge
+from sparkle.structures.feature_data_csv_help import SparkleFeatureDataCSV
+from sparkle.structures.performance_dataframe import PerformanceDataFrame
+from sparkle.platform import settings_help
+import global_variables as sgh
+
+global settings
+sgh.settings = settings_help.Settings()
+
+
+class TestCSVMerge(TestCase):
+    """Tests function of csv merge."""
+
+    def setUp(self: TestCSVMerge) -> None:
+        """Create a copy of the data and a directory for new results."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self.tmp_dir.name)
+        self.result_dir = self.tmp_path / "Tmp"
+        self.result_dir.mkdir()
+        self.csv_path = self.tmp_path / "performance.csv"
+        shutil.copy("tests/test_files/performance/"
+                    "example-runtime-performance-with-empty.csv", self.csv_path)
+
+    def tearDown(self: TestCSVMerge) -> None:
+        """Remove the temporary files."""
+        self.tmp_dir.cleanup()
+
+    def write_result(self: TestCSVMerge, name: str, instance: str, solver: str,
+                     value: str) -> Path:
+        """Write a result file as written by a solver run."""
+        result_path = self.result_dir / f"{name}.result"
+        result_path.write_text(f"{instance}\n{solver}\n{value}\n")
+        return result_path
+
+    def test_performance_data_csv_merge(self: TestCSVMerge) -> None:
+        """Test all result files are merged at once and then removed."""
+        self.write_result("a", "Instance1", "AlgorithmA", "1.5")
+        self.write_result("b", "Instance3", "AlgorithmC", "2.5")
+        incomplete_path = self.write_result("c", "Instance4", "AlgorithmE", "")
+        # An unreadable result does not stop the others from being merged
+        corrupt_path = self.write_result("d", "Instance5", "AlgorithmB", "fast")
+
+        csv_merge.performance_data_csv_merge(self.csv_path, self.result_dir)
+
+        performance_data = PerformanceDataFrame(self.csv_path)
+        assert performance_data.get_value("AlgorithmA", "Instance1") == 1.5
+        assert performance_data.get_value("AlgorithmC", "Instance3") == 2.5
+        assert np.isnan(performance_data.get_value("AlgorithmE", "Instance4"))
+        # Only the incomplete and unreadable results are left
+        assert sorted(self.result_dir.iterdir()) == [incomplete_path, corrupt_path]
+
+    def test_interrupted_merge(self: TestCSVMerge) -> None:
+        """Test files recorded as merged are removed without merging them again."""
+        applied_path = self.write_result("a", "Instance1", "AlgorithmA", "1.5")
+        csv_merge.write_applied_ledger(self.result_dir, [str(applied_path)])
+        self.write_result("b", "Instance3", "AlgorithmC", "2.5")
+
+        csv_merge.performance_data_csv_merge(self.csv_path, self.result_dir)
+
+        performance_data = PerformanceDataFrame(self.csv_path)
+        assert np.isnan(performance_data.get_value("AlgorithmA", "Instance1"))
+        assert performance_data.get_value("AlgorithmC", "Instance3") == 2.5
+        assert list(self.result_dir.iterdir()) == []
+
+    def test_feature_data_csv_merge(self: TestCSVMerge) -> None:
+        """Test all new feature data is combined at once and the files removed."""
+        feature_a = "f1" + sgh.sparkle_special_string + "ExtractorA"
+        feature_b = "f2" + sgh.sparkle_special_string + "ExtractorB"
+        feature_data_path = self.tmp_path / "feature_data.csv"
+        pd.DataFrame({feature_a: [1.0, np.nan], feature_b: [np.nan, np.nan]},
+                     index=["Instance1", "Instance2"]).to_csv(feature_data_path)
+        pd.DataFrame({feature_a: [2.0]}, index=["Instance2"]).to_csv(
+            self.result_dir / "instance2_a.csv")
+        pd.DataFrame({feature_b: [3.0, 4.0]}, index=["Instance1", "Instance2"]).to_csv(
+            self.result_dir / "b.csv")
+
+        csv_merge.feature_data_csv_merge(feature_data_path, self.result_dir)
+
+        feature_data = SparkleFeatureDataCSV(feature_data_path)
+        assert feature_data.dataframe.loc["Instance1"].tolist() == [1.0, 3.0]
+        assert feature_data.dataframe.loc["Instance2"].tolist() == [2.0, 4.0]
+        assert list(self.result_dir.iterdir()) == []
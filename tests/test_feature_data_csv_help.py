@@ -0,0 +1,123 @@
+"""Test public methods of sparkle feature data csv."""
+
+from __future__ import annotations
+
+from unittest import TestCase
+from pathlib import Path
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from sparkle.structures.feature_data_csv_help import SparkleFeatureDataCSV
+from sparkle.platform import settings_help
+from sparkle.platform.settings_help import ImputationStrategy
+import global_variables as sgh
+
+global settings
+sgh.settings = settings_help.Settings()
+
+
+class TestFeatureData(TestCase):
+    """Class for testing feature data object."""
+
+    def setUp(self: TestFeatureData) -> None:
+        """Create feature data CSV files for the tests."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self.tmp_dir.name)
+        self.feature_a = "f1" + sgh.sparkle_special_string + "ExtractorA"
+        self.feature_b = "f2" + sgh.sparkle_special_string + "ExtractorA"
+        self.feature_c = "f3" + sgh.sparkle_special_string + "ExtractorB"
+        self.csv_path = self.tmp_path / "feature_data.csv"
+        pd.DataFrame({self.feature_a: [1.0, np.nan, 3.0],
+                      self.feature_b: [4.0, 5.0, 6.0],
+                      self.feature_c: [np.nan, 8.0, np.nan]},
+                     index=["Instance1", "Instance2", "Instance3"]
+                     ).to_csv(self.csv_path)
+        self.fd = SparkleFeatureDataCSV(self.csv_path)
+
+    def tearDown(self: TestFeatureData) -> None:
+        """Remove the temporary files."""
+        self.tmp_dir.cleanup()
+
+    def test_get_list_remaining_feature_computation_job(self: TestFeatureData)\
+            -> None:
+        """Test get remaining feature computation job getter."""
+        remaining = [["Instance1", ["Extractors/ExtractorB"]],
+                     ["Instance2", ["Extractors/ExtractorA"]],
+                     ["Instance3", ["Extractors/ExtractorB"]]]
+        result = self.fd.get_list_remaining_feature_computation_job()
+        assert result == remaining
+
+    def test_get_job_list(self: TestFeatureData) -> None:
+        """Test job list method, without and with recompute bool."""
+        job_list = [("Instance1", "Extractors/ExtractorB"),
+                    ("Instance2", "Extractors/ExtractorA"),
+                    ("Instance3", "Extractors/ExtractorB")]
+        result = self.fd.get_job_list()
+        assert result == job_list
+
+        self.fd.extractor_list = ["Extractors/ExtractorA"]
+        job_list = [("Instance1", "Extractors/ExtractorA"),
+                    ("Instance2", "Extractors/ExtractorA"),
+                    ("Instance3", "Extractors/ExtractorA")]
+        result = self.fd.get_job_list(recompute=True)
+        assert result == job_list
+
+    def test_combine(self: TestFeatureData) -> None:
+        """Test combining with several feature data CSVs at once."""
+        first_path = self.tmp_path / "first.csv"
+        pd.DataFrame({self.feature_a: [2.0], self.feature_c: [7.0]},
+                     index=["Instance2"]).to_csv(first_path)
+        second_path = self.tmp_path / "second.csv"
+        feature_d = "f4" + sgh.sparkle_special_string + "ExtractorC"
+        pd.DataFrame({self.feature_c: [9.0, np.nan], feature_d: [1.0, 0.0]},
+                     index=["Instance2", "Instance4"]).to_csv(second_path)
+
+        self.fd.combine(SparkleFeatureDataCSV(first_path),
+                        SparkleFeatureDataCSV(second_path))
+
+        assert self.fd.list_rows() == ["Instance1", "Instance2", "Instance3",
+                                       "Instance4"]
+        assert self.fd.list_columns() == [self.feature_a, self.feature_b,
+                                          self.feature_c, feature_d]
+        assert self.fd.get_value("Instance2", self.feature_a) == 2.0
+        assert self.fd.get_value("Instance2", self.feature_c) == 9.0
+        assert self.fd.get_value("Instance1", self.feature_b) == 4.0
+        assert self.fd.get_value("Instance4", feature_d) == 0.0
+        assert np.isnan(self.fd.get_value("Instance4", self.feature_c))
+
+    def test_impute_missing_values(self: TestFeatureData) -> None:
+        """Test imputing missing values with each strategy."""
+        self.fd.impute_missing_values(ImputationStrategy.MEAN)
+        assert self.fd.get_value("Instance2", self.feature_a) == 2.0
+        assert self.fd.get_value("Instance1", self.feature_c) == 8.0
+        assert not self.fd.bool_exists_missing_value()
+
+        fd = SparkleFeatureDataCSV(self.csv_path)
+        fd.dataframe.loc["Instance4"] = [10.0, np.nan, np.nan]
+        fd.impute_missing_values(ImputationStrategy.MEDIAN)
+        assert fd.get_value("Instance2", self.feature_a) == 3.0
+        assert fd.get_value("Instance4", self.feature_b) == 5.0
+
+        fd = SparkleFeatureDataCSV(self.csv_path)
+        fd.impute_missing_values(ImputationStrategy.CONSTANT, fill_value=-1.0)
+        assert fd.get_value("Instance3", self.feature_c) == -1.0
+        assert fd.get_value("Instance3", self.feature_a) == 3.0
+
+    def test_load_column_statistics(self: TestFeatureData) -> None:
+        """Test the column statistics are cached alongside the feature data."""
+        statistics_path = SparkleFeatureDataCSV.get_statistics_path(self.csv_path)
+        assert not statistics_path.exists()
+        statistics = SparkleFeatureDataCSV.load_column_statistics(self.csv_path)
+        assert statistics_path.exists()
+        assert statistics.loc["MEAN", self.feature_a] == 2.0
+        assert statistics.loc["MEDIAN", self.feature_b] == 5.0
+
+        self.fd.set_value("Instance2", self.feature_a, 8.0)
+        self.fd.save_csv()
+        statistics = SparkleFeatureDataCSV.load_column_statistics(self.csv_path)
+        assert statistics.loc["MEAN", self.feature_a] == 4.0
+        vector = SparkleFeatureDataCSV.get_imputation_vector(
+            statistics, ImputationStrategy.MEAN)
+        assert vector.tolist() == [4.0, 5.0, 8.0]
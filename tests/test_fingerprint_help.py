@@ -0,0 +1,42 @@
+"""Test functionalities related to the fingerprint help module."""
+
+from __future__ import annotations
+from unittest import TestCase
+from pathlib import Path
+import tempfile
+
+import pandas as pd
+
+from sparkle.platform import fingerprint_help as sfph
+
+
+class TestFingerprintHelp(TestCase):
+    """Tests function of fingerprint help."""
+
+    def test_get_fingerprint(self: TestFingerprintHelp) -> None:
+        """Test fingerprints follow the content of the inputs."""
+        df = pd.DataFrame({"A": [1.0, 2.0], "B": [3.0, 4.0]}, index=["i1", "i2"])
+        fingerprint = sfph.get_fingerprint(df, 60, "RUNTIME")
+        assert sfph.get_fingerprint(df.copy(), 60, "RUNTIME") == fingerprint
+        assert sfph.get_fingerprint(df, 61, "RUNTIME") != fingerprint
+        assert sfph.get_fingerprint(df, "RUNTIME", 60) != fingerprint
+
+        changed = df.copy()
+        changed.loc["i1", "A"] = 1.5
+        assert sfph.get_fingerprint(changed, 60, "RUNTIME") != fingerprint
+        renamed = df.rename(columns={"B": "C"})
+        assert sfph.get_fingerprint(renamed, 60, "RUNTIME") != fingerprint
+
+    def test_fingerprint_unchanged(self: TestFingerprintHelp) -> None:
+        """Test a derived file is only up to date with a matching fingerprint."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "selector"
+            assert sfph.read_fingerprint(path) is None
+            sfph.write_fingerprint(path, "abc")
+            # The derived file itself is missing
+            assert not sfph.fingerprint_unchanged(path, "abc")
+            path.write_text("model")
+            assert sfph.fingerprint_unchanged(path, "abc")
+            assert not sfph.fingerprint_unchanged(path, "abd")
+            assert sfph.get_fingerprint_path(path) == Path(tmp_dir) / \
+                "selector.fingerprint"
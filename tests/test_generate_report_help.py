@@ -0,0 +1,37 @@
+"""Test functionalities related to the generate report help module."""
+
+from __future__ import annotations
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from sparkle.platform import generate_report_help as sgrh
+from sparkle.platform import settings_help
+import global_variables as sgh
+
+global settings
+sgh.settings = settings_help.Settings()
+
+
+class TestGenerateReportHelp(TestCase):
+    """Tests function of generate report help."""
+
+    @patch("CLI.support.compute_marginal_contribution_help."
+           "get_list_predict_schedules")
+    def test_get_dict_actual_portfolio_selector_penalty_time_on_each_instance(
+            self: TestGenerateReportHelp, patch_predict_schedules: MagicMock) -> None:
+        """Test the schedules of all instances are predicted together."""
+        patch_predict_schedules.return_value = [[("Solvers/CSCCSat", 61.0)]] * 12
+        with patch.object(sgh, "performance_data_csv_path",
+                          "CLI/test/test_files/Performance_Data/"
+                          "test_construct_sparkle_portfolio_selector.csv"), \
+                patch.object(sgh, "feature_data_csv_path",
+                             "CLI/test/test_files/Feature_Data/"
+                             "test_construct_sparkle_portfolio_selector.csv"):
+            penalty = sgrh.\
+                get_dict_actual_portfolio_selector_penalty_time_on_each_instance()
+        assert patch_predict_schedules.call_count == 1
+        assert len(penalty) == 12
+        # Unsolved instances score the penalised time
+        assert penalty["Instances/PTN/Ptn-7824-b03.cnf"] ==\
+            sgh.settings.get_penalised_time()
+        assert penalty["Instances/PTN/Ptn-7824-b15.cnf"] == 28.1747
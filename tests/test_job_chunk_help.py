@@ -0,0 +1,81 @@
+"""Test functionalities related to the job chunk help module."""
+
+from __future__ import annotations
+from unittest import TestCase
+from unittest.mock import patch, Mock
+from pathlib import Path
+import json
+import shlex
+import subprocess
+import sys
+import tempfile
+
+from runrunner.base import Runner
+
+from CLI.support import job_chunk_help as sjch
+from sparkle.platform import settings_help
+import global_variables as sgh
+
+global settings
+sgh.settings = settings_help.Settings()
+
+
+class TestJobChunkHelp(TestCase):
+    """Tests function of job chunk help."""
+
+    def setUp(self: TestJobChunkHelp) -> None:
+        """Create a directory for the chunks."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.chunk_dir = Path(self.tmp_dir.name) / "chunks"
+
+    def tearDown(self: TestJobChunkHelp) -> None:
+        """Remove the chunks and reset the settings."""
+        self.tmp_dir.cleanup()
+        sgh.settings = settings_help.Settings()
+
+    def test_pack_commands(self: TestJobChunkHelp) -> None:
+        """Test runs are packed into chunks of which the summed cutoff fits."""
+        cmd_list = [f"run {index}" for index in range(7)]
+        assert sjch.pack_commands(cmd_list, 10.0, self.chunk_dir) == cmd_list
+
+        sgh.settings.set_general_job_chunk_duration(
+            35, settings_help.SettingState.CMD_LINE)
+        assert sjch.get_chunk_size(10.0) == 3
+        assert sjch.get_chunk_size(60.0) == 1
+        packed_cmd_list = sjch.pack_commands(cmd_list, 10.0, self.chunk_dir)
+        assert len(packed_cmd_list) == 3
+        chunks = [json.loads(Path(shlex.split(cmd)[-1]).read_text())
+                  for cmd in packed_cmd_list]
+        assert chunks == [cmd_list[0:3], cmd_list[3:6], cmd_list[6:]]
+
+    def test_run_chunk(self: TestJobChunkHelp) -> None:
+        """Test a chunk runs its runs once, also when it is run again."""
+        out_path = Path(self.tmp_dir.name) / "out"
+        cmd_list = [f"{sys.executable} -c \"open('{out_path}', 'a').write('{index}')\""
+                    for index in range(2)]
+        cmd_list.insert(1, f'{sys.executable} -c "raise SystemExit(1)"')
+        self.chunk_dir.mkdir()
+        chunk_path = self.chunk_dir / "chunk_0.json"
+        chunk_path.write_text(json.dumps(cmd_list))
+        runner_cmd = [sys.executable, "CLI/core/run_job_chunk.py",
+                      "--chunk", str(chunk_path)]
+
+        # The failing run does not stop the last run
+        assert subprocess.run(runner_cmd, capture_output=True).returncode == 1
+        assert out_path.read_text() == "01"
+        # Finished runs are not run again
+        assert subprocess.run(runner_cmd, capture_output=True).returncode == 0
+        assert out_path.read_text() == "01"
+        sjch.remove_chunks(self.chunk_dir)
+        assert not self.chunk_dir.exists()
+
+    @patch("CLI.support.job_chunk_help.rrr.add_to_queue")
+    def test_remove_chunks_after_run(self: TestJobChunkHelp, mock_queue: Mock) -> None:
+        """Test the chunks are removed by a job depending on the run."""
+        run = Mock()
+        sjch.remove_chunks_after_run(run, self.chunk_dir, Runner.SLURM, "run")
+        assert mock_queue.call_count == 0
+        self.chunk_dir.mkdir()
+        sjch.remove_chunks_after_run(run, self.chunk_dir, Runner.SLURM, "run")
+        assert mock_queue.call_args.kwargs["dependencies"] is run
+        assert str(self.chunk_dir) in mock_queue.call_args.kwargs["cmd"]
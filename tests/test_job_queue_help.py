@@ -0,0 +1,67 @@
+"""Test functionalities related to the job queue help module."""
+
+from __future__ import annotations
+from unittest import TestCase
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import tempfile
+
+from CLI.support import job_queue_help as sjqh
+
+
+def _work(queue_path: Path, worker_id: int) -> list[int]:
+    """Return the indices of all jobs done by a worker."""
+    return [job["index"] for job in sjqh.iterate_jobs(queue_path, worker_id)]
+
+
+class TestJobQueueHelp(TestCase):
+    """Tests function of job queue help."""
+
+    def setUp(self: TestJobQueueHelp) -> None:
+        """Create a queue with jobs."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.queue_path = sjqh.create_job_queue(Path(self.tmp_dir.name) / "queue",
+                                                [{"index": i} for i in range(200)])
+
+    def tearDown(self: TestJobQueueHelp) -> None:
+        """Remove the queue."""
+        self.tmp_dir.cleanup()
+
+    def test_workers_claim_each_job_once(self: TestJobQueueHelp) -> None:
+        """Test concurrent workers together do every job exactly once."""
+        assert sjqh.get_number_of_pending_jobs(self.queue_path) == 200
+        with ProcessPoolExecutor(4) as executor:
+            done = list(executor.map(_work, [self.queue_path] * 4, range(4)))
+        assert sorted(index for indices in done for index in indices) ==\
+            list(range(200))
+        assert sjqh.get_number_of_pending_jobs(self.queue_path) == 0
+        assert list((self.queue_path / "claimed").iterdir()) == []
+
+    def test_claim_job_in_queue_order(self: TestJobQueueHelp) -> None:
+        """Test jobs are claimed in the order they were given."""
+        indices = [sjqh.claim_job(self.queue_path, 0)[1]["index"] for _ in range(12)]
+        assert indices == list(range(12))
+
+    def test_release_claimed_jobs(self: TestJobQueueHelp) -> None:
+        """Test a restarted worker first releases the jobs it claimed before."""
+        job_path, job = sjqh.claim_job(self.queue_path, 3)
+        sjqh.claim_job(self.queue_path, 4)
+        assert sjqh.get_number_of_pending_jobs(self.queue_path) == 198
+
+        sjqh.release_claimed_jobs(self.queue_path, 3)
+        assert not job_path.exists()
+        assert sjqh.get_number_of_pending_jobs(self.queue_path) == 199
+        # The job of the other worker is still claimed
+        assert len(list((self.queue_path / "claimed").iterdir())) == 1
+        assert job["index"] in _work(self.queue_path, 3)
+
+    def test_remove_job_queue(self: TestJobQueueHelp) -> None:
+        """Test the jobs that were not done are returned when removing the queue."""
+        job_path, _ = sjqh.claim_job(self.queue_path, 0)
+        sjqh.complete_job(job_path)
+        # A worker that is killed leaves its claimed job behind
+        sjqh.claim_job(self.queue_path, 1)
+        unfinished = sjqh.remove_job_queue(self.queue_path)
+        assert [job["index"] for job in unfinished] == list(range(1, 200))
+        assert not self.queue_path.exists()
+        assert sjqh.remove_job_queue(self.queue_path) == []
@@ -0,0 +1,56 @@
+"""Test functionalities related to the job schedule help module."""
+
+from __future__ import annotations
+from unittest import TestCase
+from pathlib import Path
+import json
+import tempfile
+
+from sparkle.structures.performance_dataframe import PerformanceDataFrame
+from CLI.support import job_schedule_help as sjsh
+
+
+class TestJobScheduleHelp(TestCase):
+    """Tests function of job schedule help."""
+
+    def setUp(self: TestJobScheduleHelp) -> None:
+        """Read performance data with missing values."""
+        self.performance_data = PerformanceDataFrame(
+            "tests/test_files/performance/example-runtime-performance-with-empty.csv")
+
+    def test_predict_job_durations(self: TestJobScheduleHelp) -> None:
+        """Test durations are predicted from the solver and instance run times."""
+        jobs = [("Instance3", "AlgorithmC"), ("Instance1", "AlgorithmB"),
+                ("Instance1", "AlgorithmA"), ("Instance1", "AlgorithmD")]
+        durations = sjsh.predict_job_durations(self.performance_data, jobs, 60.0)
+        # Instance 3 is harder than average for the other solvers
+        assert 27.6 < durations[0] < 60.0
+        assert durations[1] == 30.0
+        # No run time of algorithm A is known, so it takes the instance mean
+        assert durations[2] == 44.5
+        # Known run times are capped at the cutoff
+        assert durations[3] == 60.0
+        assert sjsh.predict_job_durations(self.performance_data, jobs, 60.0,
+                                          runtime=False) == [60.0] * 4
+
+    def test_longest_first_makespan(self: TestJobScheduleHelp) -> None:
+        """Test ordering jobs longest first shortens the predicted makespan."""
+        jobs = [("a", "s"), ("b", "s"), ("c", "s"), ("d", "s"), ("e", "s")]
+        durations = [1.0, 1.0, 1.0, 1.0, 4.0]
+        assert sjsh.get_predicted_makespan(durations, 2) == 6.0
+        ordered_jobs, ordered_durations = sjsh.order_jobs_longest_first(jobs,
+                                                                        durations)
+        assert ordered_jobs[0] == ("e", "s")
+        assert ordered_durations == [4.0, 1.0, 1.0, 1.0, 1.0]
+        assert sjsh.get_predicted_makespan(ordered_durations, 2) == 4.0
+        assert sjsh.get_predicted_makespan([], 2) == 0.0
+
+    def test_write_schedule(self: TestJobScheduleHelp) -> None:
+        """Test the schedule is written with its directory."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            schedule_path = Path(tmp_dir) / "Job_Schedules" / "Job_Schedule_0.json"
+            sjsh.write_schedule(schedule_path, 4.0, 5, 2)
+            schedule = json.loads(schedule_path.read_text())
+        assert schedule["predicted_makespan"] == 4.0
+        assert schedule["n_jobs"] == 5
+        assert schedule["n_parallel"] == 2
@@ -3,11 +3,18 @@
 from __future__ import annotations
 from unittest import TestCase
 from pathlib import Path
+import math
+import tempfile
+
+from runrunner.base import Runner
 
 from CLI.support import compute_marginal_contribution_help as scmch
+from CLI.support import selector_prediction_help as sspred
 from sparkle.structures.feature_data_csv_help import SparkleFeatureDataCSV
 import global_variables as sgh
 from sparkle.platform import settings_help
+from sparkle.structures.performance_dataframe import PerformanceDataFrame
+from sparkle.types.objective import PerformanceMeasure
 
 from unittest.mock import patch
 from unittest.mock import MagicMock, Mock
@@ -16,6 +23,18 @@ global settings
 sgh.settings = settings_help.Settings()
 
 
+def _fake_selector_jobs(jobs: list[tuple[Path, Path, Path, bool]],
+                        feature_data_csv_path: Path, run_on: Runner) -> None:
+    """Write a schedule running CSCCSat if available, otherwise MiniSAT."""
+    for _, performance_data_path, result_path, _ in jobs:
+        performance_data = PerformanceDataFrame(performance_data_path)
+        instances = performance_data.get_instances()
+        solvers = performance_data.dataframe.columns
+        solver = "Solvers/CSCCSat" if "Solvers/CSCCSat" in solvers else solvers[0]
+        sspred.write_predicted_schedules(result_path, instances,
+                                         [[(solver, 61.0)]] * len(instances))
+
+
 class TestMarginalContribution(TestCase):
     """Tests function of Marginal Contribution help."""
     def test_read_marginal_contribution_csv(self: TestCase) -> None:
@@ -76,6 +95,27 @@ class TestMarginalContribution(TestCase):
 
         self.assertListEqual(output, result)
 
+    def test_compute_perfect_selector_subset_marginal_contribution(self: TestCase)\
+            -> None:
+        """Test for method compute_perfect_selector_subset_marginal_contribution."""
+        pth = Path("CLI/test/test_files/Performance_Data/"
+                   "test_construct_sparkle_portfolio_selector.csv")
+        subsets = [["Solvers/MiniSAT"], ["Solvers/CSCCSat"],
+                   ["Solvers/MiniSAT", "Solvers/CSCCSat"]]
+        output = scmch.compute_perfect_selector_subset_marginal_contribution(
+            subsets, aggregation_function=sum, minimise=True,
+            performance_data_csv_path=pth)
+        # Without any solver left nothing is solved, which scores the penalised time
+        assert output[0] == (("Solvers/MiniSAT", "Solvers/CSCCSat"),
+                             1.824199871919735)
+        assert output[1:] == [(("Solvers/CSCCSat", ), 1.7980089765503102),
+                              (("Solvers/MiniSAT", ), 0.0)]
+        # When maximising without caps an empty portfolio has no score at all
+        output = scmch.compute_perfect_selector_subset_marginal_contribution(
+            subsets[2:], aggregation_function=sum, minimise=False,
+            performance_data_csv_path=pth)
+        assert output == [(("Solvers/MiniSAT", "Solvers/CSCCSat"), math.inf)]
+
     def test_get_list_predict_schedule(self: TestCase) -> None:
         """Test for method get_list_predict_schedule."""
         # Does not work on server.
@@ -100,9 +140,9 @@ class TestMarginalContribution(TestCase):
             assert output == result
 
     @patch("CLI.support.compute_marginal_contribution_help."
-           "compute_actual_performance_for_instance")
+           "get_list_predict_schedules")
     def test_compute_actual_selector_performance(
-            self: TestCase, patch_perf_for_instance: MagicMock) -> None:
+            self: TestCase, patch_predict_schedules: MagicMock) -> None:
         """Test for method compute_actual_selector_performance."""
         pth = "CLI/test/test_files/Sparkle_Portfolio_Selector/"\
               "sparkle_portfolio_selector__@@SPARKLE@@__"
@@ -112,12 +152,7 @@ class TestMarginalContribution(TestCase):
                            "test_construct_sparkle_portfolio_selector.csv"
 
         result = 526.805294
-        patch_perf_for_instance.side_effect = [(61.0, False), (28.1747, True),
-                                               (61.0, False), (9.98625, True),
-                                               (0.107158, True), (61.0, False),
-                                               (0.537186, True), (61.0, False),
-                                               (61.0, False), (61.0, False),
-                                               (61.0, False), (61.0, False)]
+        patch_predict_schedules.return_value = [[("Solvers/CSCCSat", 61.0)]] * 12
 
         output = scmch.compute_actual_selector_performance(pth,
                                                            perf_path,
@@ -126,17 +161,49 @@ class TestMarginalContribution(TestCase):
                                                            sum,
                                                            None)
 
-        assert output == result
+        assert patch_predict_schedules.call_count == 1
+        self.assertAlmostEqual(output, result)
 
-    def test_compute_actual_performance_for_instance(self: TestCase) -> None:
+    @patch("CLI.support.compute_marginal_contribution_help."
+           "get_list_predict_schedule")
+    def test_compute_actual_performance_for_instance(
+            self: TestCase, patch_predict_schedule: MagicMock) -> None:
         """Test for method compute_actual_performance_for_instance."""
-        # TODO: This method is currently not touched by the .sh test. Think of a test.
-        pass
+        pth = "CLI/test/test_files/Sparkle_Portfolio_Selector/"\
+              "sparkle_portfolio_selector__@@SPARKLE@@__"
+        perf_path = "CLI/test/test_files/Performance_Data/"\
+                    "test_construct_sparkle_portfolio_selector.csv"
+        feature_csv_path = "CLI/test/test_files/Feature_Data/"\
+                           "test_construct_sparkle_portfolio_selector.csv"
+        performance_data = PerformanceDataFrame(perf_path)
+        instance = "Instances/PTN/Ptn-7824-b21.cnf"
 
-    @patch("CLI.support.compute_marginal_contribution_help."
-           "compute_actual_selector_performance")
+        # MiniSAT exceeds its budget, after which CSCCSat solves the instance
+        patch_predict_schedule.return_value = [("Solvers/MiniSAT", 10.0),
+                                               ("Solvers/CSCCSat", 40.0)]
+        output = scmch.compute_actual_performance_for_instance(
+            pth, instance, feature_csv_path, performance_data, True,
+            PerformanceMeasure.RUNTIME, None)
+        assert output == (10.107158, True)
+
+        # The schedule is stopped once the cutoff time is exceeded
+        patch_predict_schedule.return_value = [("Solvers/MiniSAT", 70.0),
+                                               ("Solvers/CSCCSat", 40.0)]
+        output = scmch.compute_actual_performance_for_instance(
+            pth, instance, feature_csv_path, performance_data, True,
+            PerformanceMeasure.RUNTIME, None)
+        assert output == (70.0, False)
+
+        # For quality the best scheduled solver is taken
+        output = scmch.compute_actual_performance_for_instance(
+            pth, instance, feature_csv_path, performance_data, True,
+            PerformanceMeasure.QUALITY_ABSOLUTE_MINIMISATION, 1.0)
+        assert output == (0.107158, True)
+
+    @patch("CLI.support.compute_marginal_contribution_help.submit_selector_jobs",
+           side_effect=_fake_selector_jobs)
     def test_compute_actual_selector_marginal_contribution(self: TestCase,
-                                                           mock_actual_performance: Mock
+                                                           mock_jobs: Mock
                                                            ) -> None:
         """Test for method compute_actual_selector_marginal_contribution."""
         # Test does not work on Mac
@@ -144,9 +211,6 @@ class TestMarginalContribution(TestCase):
                     "test_construct_sparkle_portfolio_selector.csv"
         feature_csv_path = "CLI/test/test_files/Feature_Data/"\
                            "test_construct_sparkle_portfolio_selector.csv"
-        mock_actual_performance.side_effect = [526.805294,
-                                               526.805294,
-                                               732.0]
 
         result = [("Solvers/CSCCSat", 1.3895076764357648), ("Solvers/MiniSAT", 0.0)]
 
@@ -160,6 +224,37 @@ class TestMarginalContribution(TestCase):
         )
 
         self.assertEqual(output, result)
+        # All selectors are submitted as a single job array
+        assert mock_jobs.call_count == 1
+        jobs = mock_jobs.call_args.args[0]
+        assert len(jobs) == 3
+        assert jobs[0][0] == sgh.sparkle_algorithm_selector_path
+        assert [cached for _, _, _, cached in jobs] == [False, True, True]
+        # Subset selectors are keyed by the content of their data
+        assert jobs[1][0].parent.parent == sgh.sparkle_algorithm_selector_cache_dir
+        assert jobs[1][0] != jobs[2][0]
+
+        # Unchanged data is read from the result of the previous call
+        output = scmch.compute_actual_selector_marginal_contribution(
+            aggregation_function=sum,
+            capvalue_list=None,
+            minimise=True,
+            performance_data_csv_path=perf_path,
+            feature_data_csv_path=feature_csv_path
+        )
+        self.assertEqual(output, result)
+        assert mock_jobs.call_count == 1
+
+    def test_prune_selector_cache(self: TestCase) -> None:
+        """Test cached selectors of other data are removed."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_dir = Path(tmp_dir)
+            for fingerprint in ["current", "stale"]:
+                (cache_dir / fingerprint).mkdir()
+                (cache_dir / fingerprint / "selector").write_text("selector")
+            with patch.object(sgh, "sparkle_algorithm_selector_cache_dir", cache_dir):
+                scmch.prune_selector_cache([cache_dir / "current" / "selector"])
+            assert [entry.name for entry in cache_dir.iterdir()] == ["current"]
 
     def test_print_rank_list(self: TestCase) -> None:
         """Test for method print_rank_list. Could be irrelevant."""
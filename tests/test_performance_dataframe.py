@@ -5,9 +5,15 @@ from __future__ import annotations
 from unittest import TestCase
 from unittest.mock import Mock, patch
 from pathlib import Path
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
 
 from sparkle.structures.performance_dataframe import PerformanceDataFrame
 from sparkle.platform import settings_help
+from sparkle.platform.settings_help import DataFormat
 import global_variables as sgh
 
 global settings
@@ -49,6 +55,21 @@ class TestPerformanceData(TestCase):
         result = self.pd.get_job_list(rerun=True)
         assert result == job_list
 
+        job_list = [("Instance1", "AlgorithmA"), ("Instance2", "AlgorithmA"),
+                    ("Instance3", "AlgorithmA"), ("Instance3", "AlgorithmC"),
+                    ("Instance4", "AlgorithmA"), ("Instance4", "AlgorithmE"),
+                    ("Instance5", "AlgorithmA")]
+        result = self.pd_nan.get_job_list()
+        assert result == job_list
+
+    def test_get_job_array(self: TestPerformanceData) -> None:
+        """Test the positions of the remaining jobs."""
+        rows, columns = self.pd_nan.get_job_array()
+        assert rows.tolist() == [0, 1, 2, 2, 3, 3, 4]
+        assert columns.tolist() == [0, 0, 0, 2, 0, 4, 0]
+        rows, columns = self.pd.get_job_array(rerun=True)
+        assert len(rows) == len(columns) == 25
+
     def test_get_num_instances(self: TestPerformanceData) -> None:
         """Test the number of instances getter method."""
         num_instances = 5
@@ -125,6 +146,77 @@ class TestPerformanceData(TestCase):
         )
         assert result == vbs_portfolio
 
+    def test_calc_leave_out_virtual_best_performances(self: TestPerformanceData)\
+            -> None:
+        """Test leaving solvers out of the portfolio matches removing them."""
+        solvers = self.pd.dataframe.columns.tolist()
+        for minimise in (True, False):
+            for pd_test, csv_path in ((self.pd, self.csv_example_path),
+                                      (self.pd_nan, self.csv_example_with_nan_path)):
+                result = pd_test.calc_leave_out_virtual_best_performances(
+                    sum, minimise, None)
+                subsets = [[solvers[0], solvers[1]], [solvers[2]], solvers]
+                result_subsets = pd_test.calc_leave_out_virtual_best_performances(
+                    sum, minimise, None, solver_subsets=subsets)
+                # Without any solver nothing is solved, which scores the penalised time
+                n_instances = pd_test.get_num_instances()
+                penalised_time = sgh.settings.get_penalised_time()
+                if minimise:
+                    assert result_subsets[2] == penalised_time * n_instances
+                else:
+                    assert np.isnan(result_subsets[2])
+                for subset in [[solver] for solver in solvers] + subsets[:2]:
+                    tmp_pd = PerformanceDataFrame(str(csv_path))
+                    for solver in subset:
+                        tmp_pd.remove_solver(solver)
+                    expected = tmp_pd.calc_virtual_best_performance_of_portfolio(
+                        sum, minimise, None)
+                    if len(subset) == 1:
+                        assert result[solvers.index(subset[0])] == expected
+                    if subset in subsets:
+                        assert result_subsets[subsets.index(subset)] == expected
+
+    def test_get_objective_cube(self: TestPerformanceData) -> None:
+        """Test the instance x run x solver view of an objective."""
+        instances, cube = self.pd.get_objective_cube()
+        assert instances == ["Instance1", "Instance2", "Instance3",
+                             "Instance4", "Instance5"]
+        assert cube.shape == (5, 1, 5)
+        assert cube[3, 0].tolist() == [96.0, 8.0, 40.0, 49.0, 82.0]
+
+        # Runs of an instance that are not next to each other stay with the instance
+        objective = self.pd.objective_names[0]
+        index = pd.MultiIndex.from_tuples(
+            [(objective, "A", 1), (objective, "B", 1), (objective, "B", 2),
+             (objective, "A", 2)], names=self.pd.multi_dim_names)
+        self.pd.dataframe = pd.DataFrame({"Solver": [1.0, 2.0, 3.0, 4.0]},
+                                         index=index)
+        instances, cube = self.pd.get_objective_cube()
+        assert instances == ["A", "B"]
+        assert cube[:, :, 0].tolist() == [[1.0, 4.0], [2.0, 3.0]]
+
+    @patch("global_variables."
+           "settings.get_general_penalty_multiplier")
+    def test_get_virtual_best_score_per_instance(self: TestPerformanceData,
+                                                 mock_penalty: Mock) -> None:
+        """Test the capped and penalised VBS score per instance."""
+        mock_penalty.return_value = 10
+        result = self.pd.get_virtual_best_score_per_instance(minimise=True)
+        assert result.tolist() == [30.0, 5.0, 3.0, 8.0, 41.0]
+
+        # Every score above the cap is penalised, Instance5 has none below it
+        capvalues = [40.0] * 5
+        scores = self.pd.get_penalised_performance_matrix(
+            minimise=True, capvalue_list=capvalues)
+        assert scores.loc["Instance5"].tolist() == [400.0, 400.0, 400.0, 400.0,
+                                                    400.0]
+        result = self.pd.get_virtual_best_score_per_instance(
+            minimise=True, capvalue_list=capvalues)
+        assert result.tolist() == [30.0, 5.0, 3.0, 8.0, 400.0]
+
+        result = self.pd_nan.get_virtual_best_score_per_instance(minimise=False)
+        assert result.tolist() == [64.0, 87.0, 87.0, 49.0, 86.0]
+
     @patch("global_variables."
            "settings.get_penalised_time")
     def test_get_dict_vbs_penalty_time_on_each_instance(self: TestPerformanceData,
@@ -166,3 +258,99 @@ class TestPerformanceData(TestCase):
                      ["AlgorithmB", 401.6], ["AlgorithmA", 500.0], ["AlgorithmD", 500.0]]
         result = self.pd.get_solver_penalty_time_ranking_list()
         assert result == rank_list
+
+    def test_save_and_load_parquet(self: TestPerformanceData) -> None:
+        """Test the lossless round trip through the binary storage format."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = Path(tmp_dir) / "performance_data.csv"
+            parquet_path = self.pd.copy(csv_path).get_storage_path(DataFormat.PARQUET)
+            assert parquet_path == csv_path.with_suffix(".parquet")
+            self.pd_nan.save_csv(parquet_path)
+            assert PerformanceDataFrame.get_stored_path(csv_path) == parquet_path
+
+            loaded = PerformanceDataFrame(csv_path)
+            assert loaded.dataframe.equals(self.pd_nan.dataframe.astype(float))
+            assert loaded.n_runs == 1 and not loaded.multi_objective
+
+            # Export back to CSV, which is now the most recently written format
+            time.sleep(0.01)
+            loaded.save_csv(csv_path)
+            assert PerformanceDataFrame.get_stored_path(csv_path) == csv_path
+            reloaded = PerformanceDataFrame(csv_path)
+            assert reloaded.dataframe.equals(loaded.dataframe)
+
+    def test_journal(self: TestPerformanceData) -> None:
+        """Test overlaying and compacting journalled results."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = Path(tmp_dir) / "performance_data.csv"
+            self.pd.copy(csv_path).save_csv()
+            PerformanceDataFrame.append_to_journal(csv_path, 1.0, "AlgorithmA",
+                                                   "Instance1")
+            PerformanceDataFrame.append_to_journal(csv_path, 2.0, "AlgorithmB",
+                                                   "Instance2")
+            # Unknown solvers are ignored with a warning
+            PerformanceDataFrame.append_to_journal(csv_path, 3.0, "AlgorithmZ",
+                                                   "Instance2")
+            journal_path = csv_path.with_suffix(".journal")
+            assert journal_path.exists()
+
+            with patch("builtins.print") as mock_print:
+                performance_data = PerformanceDataFrame(csv_path)
+            assert "1 result(s)" in mock_print.call_args.args[0]
+            assert performance_data.get_value("AlgorithmA", "Instance1") == 1.0
+            assert performance_data.get_value("AlgorithmB", "Instance2") == 2.0
+            assert "AlgorithmZ" not in performance_data.dataframe.columns
+
+            # Records appended after loading are applied on compaction
+            PerformanceDataFrame.append_to_journal(csv_path, 4.0, "AlgorithmC",
+                                                   "Instance3")
+            performance_data.set_value(5.0, "AlgorithmD", "Instance4")
+            performance_data.save_csv()
+            assert performance_data.get_journal_paths() == []
+            compacted = PerformanceDataFrame(csv_path)
+            assert compacted.get_value("AlgorithmA", "Instance1") == 1.0
+            assert compacted.get_value("AlgorithmC", "Instance3") == 4.0
+            assert compacted.get_value("AlgorithmD", "Instance4") == 5.0
+
+    def test_set_and_get_values(self: TestPerformanceData) -> None:
+        """Test the bulk setter and getter methods."""
+        solvers = ["AlgorithmA", "AlgorithmC", "AlgorithmA"]
+        instances = ["Instance3", "Instance3", "Instance5"]
+        self.pd_nan.set_values([1.0, 2.0, 3.0], solvers, instances)
+        assert self.pd_nan.get_values(solvers, instances).tolist() == [1.0, 2.0, 3.0]
+        assert self.pd_nan.get_value("AlgorithmC", "Instance3") == 2.0
+        # Other values are untouched
+        assert self.pd_nan.get_value("AlgorithmB", "Instance3") == 87.0
+
+        # The last value of a repeated cell is assigned
+        self.pd_nan.set_values([4.0, 5.0], ["AlgorithmA"] * 2, ["Instance1"] * 2)
+        assert self.pd_nan.get_value("AlgorithmA", "Instance1") == 5.0
+
+        # Values are written in place, also into columns read as integers
+        dataframe = self.pd.dataframe
+        self.pd.set_values([0.5, 1.5], ["AlgorithmA", "AlgorithmB"],
+                           ["Instance1", "Instance2"])
+        assert self.pd.dataframe is dataframe
+        assert self.pd.get_values(["AlgorithmA", "AlgorithmB"],
+                                  ["Instance1", "Instance2"]).tolist() == [0.5, 1.5]
+        assert self.pd.get_value("AlgorithmC", "Instance1") == 38
+
+        # Empty input is allowed
+        self.pd_nan.set_values([], [], [])
+        assert self.pd_nan.get_values([], []).size == 0
+
+    def test_to_autofolio(self: TestPerformanceData) -> None:
+        """Test the AutoFolio port is only rewritten when the data changed."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pd_copy = self.pd.copy(Path(tmp_dir) / "performance.csv")
+            path = pd_copy.to_autofolio()
+            assert path == Path(tmp_dir) / "autofolio_performance.csv"
+            assert path.read_text().startswith("Instance,AlgorithmA")
+            mtime = path.stat().st_mtime_ns
+
+            assert pd_copy.to_autofolio() == path
+            assert path.stat().st_mtime_ns == mtime
+
+            pd_copy.set_value(1.0, "AlgorithmA", "Instance1")
+            pd_copy.to_autofolio()
+            assert path.stat().st_mtime_ns != mtime
@@ -0,0 +1,120 @@
+"""Test functionalities related to the run parallel portfolio help module."""
+
+from __future__ import annotations
+from unittest import TestCase
+from unittest.mock import patch, Mock
+from pathlib import Path
+import asyncio
+import sys
+import time
+import tempfile
+
+from CLI.support import run_parallel_portfolio_help as srpph
+from sparkle.platform import settings_help
+import global_variables as sgh
+
+global settings
+sgh.settings = settings_help.Settings()
+
+
+class TestRunParallelPortfolioHelp(TestCase):
+    """Tests function of run parallel portfolio help."""
+
+    def test_get_member_key(self: TestRunParallelPortfolioHelp) -> None:
+        """Test results are matched to plain and seeded portfolio members."""
+        member = srpph.get_member_key("Instances/PTN/bce7824.cnf", "Solvers/MiniSAT")
+        assert member == ("MiniSAT", None, "bce7824.cnf")
+        assert srpph.get_member_name(member) == "MiniSAT_bce7824.cnf"
+        member = srpph.get_member_key("Instances/PTN/bce7824.cnf",
+                                      "Tmp/MiniSAT_seed_3_PTN/MiniSAT")
+        assert member == ("MiniSAT", 3, "bce7824.cnf")
+        assert srpph.get_member_name(member) == "MiniSAT_seed_3_bce7824.cnf"
+
+    def test_index_results(self: TestRunParallelPortfolioHelp) -> None:
+        """Test only the first result of a portfolio member is indexed."""
+        members = [("A", 1, "i1"), ("A", 2, "i1"), ("A", 1, "i2"), ("A", 2, "i2")]
+        member_indices = {member: index for index, member in enumerate(members)}
+        finished = {}
+        assert srpph.index_results([(("A", 2, "i1"), 3.0), (("B", None, "i1"), 1.0)],
+                                   member_indices, finished) == [(1, 3.0)]
+        assert srpph.index_results([(("A", 2, "i1"), 2.0), (("A", 1, "i1"), 4.0),
+                                    (("A", 1, "i2"), 5.0)],
+                                   member_indices, finished) == [(0, 4.0), (2, 5.0)]
+        assert finished == {1: 3.0, 0: 4.0, 2: 5.0}
+        assert srpph.get_best_members(finished, 2) == {0: 1, 1: 2}
+
+    @patch.multiple(srpph, _min_poll_interval=0.01, _max_poll_interval=0.02,
+                    _scheduler_query_interval=0.0)
+    @patch("CLI.support.run_parallel_portfolio_help.cancel_tasks")
+    @patch("CLI.support.run_parallel_portfolio_help.get_scheduler_tasks")
+    def test_monitor_parallel_portfolio(self: TestRunParallelPortfolioHelp,
+                                        mock_tasks: Mock, mock_cancel: Mock) -> None:
+        """Test members are cancelled once another member for the instance is done."""
+        members = [("A", None, "i1"), ("B", None, "i1"),
+                   ("A", None, "i2"), ("B", None, "i2")]
+        cancelled, done = set(), set()
+        mock_cancel.side_effect = lambda log, job, indices: cancelled.update(indices)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result_dir = Path(tmp_dir)
+            log_path = str(result_dir / "logging.txt")
+
+            def write_result(name: str, solver: str, instance: str, time: str) -> None:
+                (result_dir / f"{name}.result").write_text(
+                    f"Instances/{instance}\nSolvers/{solver}\n{time}\n")
+                done.add(members.index((solver, None, instance)))
+
+            def remaining_tasks(job_id: str) -> dict:
+                # Member B finishes on instance 2 after the scheduler was asked once
+                if mock_tasks.call_count == 1:
+                    write_result("b2", "B", "i2", "2.5")
+                return {index: ("R", 1) for index in range(len(members))
+                        if index not in cancelled | done}
+
+            mock_tasks.side_effect = remaining_tasks
+            write_result("a1", "A", "i1", "1.5")
+            finished = asyncio.run(srpph.monitor_parallel_portfolio(
+                log_path, "42", members, 2, result_dir=result_dir))
+
+        assert finished == {0: 1.5, 3: 2.5}
+        assert cancelled == {1, 2}
+
+    @patch.multiple(srpph, _max_local_poll_interval=0.05, _kill_grace_period=0.5)
+    def test_run_parallel_portfolio_locally(self: TestRunParallelPortfolioHelp) -> None:
+        """Test the other members for an instance are killed when one is done."""
+        members = [("A", None, "i1"), ("B", None, "i1"),
+                   ("A", None, "i2"), ("B", None, "i2")]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_path = Path(tmp_dir)
+            member_path = tmp_path / "member.py"
+            # A member writes its result after a delay, or hangs in a child process
+            member_path.write_text(
+                "import subprocess, sys, time\n"
+                "from pathlib import Path\n"
+                "solver, instance, delay, out = sys.argv[1:]\n"
+                "if float(delay) < 0:\n"
+                "    child = subprocess.Popen([sys.executable, '-c', "
+                "'import time; time.sleep(60)'])\n"
+                "    Path(out, f'{solver}.pid').write_text(str(child.pid))\n"
+                "    child.wait()\n"
+                "time.sleep(float(delay))\n"
+                "Path(out, f'{solver}_{instance}.result').write_text(\n"
+                "    f'Instances/{instance}\\nSolvers/{solver}\\n{delay}\\n')\n")
+            delays = ["1", "-1", "-1", "1.5"]
+            cmd_list = [f"{sys.executable} {member_path} {solver} {instance} "
+                        f"{delay} {tmp_path}"
+                        for (solver, _, instance), delay in zip(members, delays)]
+
+            start = time.monotonic()
+            with patch.object(sgh, "sparkle_tmp_path", f"{tmp_dir}/"):
+                finished = srpph.run_parallel_portfolio_locally(
+                    str(tmp_path / "logging.txt"), cmd_list, members, 2,
+                    result_dir=tmp_path)
+            assert time.monotonic() - start < 30
+            assert finished == {0: 1.0, 3: 1.5}
+            # The solvers started by the stopped members are stopped as well
+            for solver in ["A", "B"]:
+                child_pid = (tmp_path / f"{solver}.pid").read_text()
+                status_path = Path("/proc", child_pid, "status")
+                assert (not status_path.exists()
+                        or "zombie" in status_path.read_text())
@@ -0,0 +1,119 @@
+"""Test functionalities related to the run solvers help module."""
+
+from __future__ import annotations
+from unittest import TestCase
+from unittest.mock import patch, Mock
+from pathlib import Path
+import tempfile
+
+from CLI.support import run_solvers_help as srsh
+from sparkle.platform import settings_help
+import global_variables as sgh
+
+global settings
+sgh.settings = settings_help.Settings()
+
+
+def _fake_run(solver_path: str, instance_path: str) -> tuple:
+    """Return a result with the affinity of the running process as quality."""
+    return (0.0, 0.0, float(len(solver_path + instance_path)),
+            [float(len(srsh.get_available_cores()))], "SUCCESS", "raw")
+
+
+class TestRunSolversHelp(TestCase):
+    """Tests function of run solvers help."""
+
+    @patch("CLI.support.run_solvers_help.get_available_cores")
+    def test_get_number_of_local_workers(self: TestCase, mock_cores: Mock) -> None:
+        """Test the worker pool is bounded by the cores, the setting and the jobs."""
+        mock_cores.return_value = list(range(8))
+        # By default there is a worker per available core
+        assert srsh.get_number_of_local_workers(100) == 8
+        assert srsh.get_number_of_local_workers(3) == 3
+        sgh.settings.set_general_number_of_local_workers(
+            2, settings_help.SettingState.CMD_LINE)
+        assert srsh.get_number_of_local_workers(100) == 2
+        sgh.settings.set_general_number_of_local_workers(
+            1, settings_help.SettingState.CMD_LINE)
+        assert srsh.get_number_of_local_workers(100) == 1
+        sgh.settings = settings_help.Settings()
+
+    @patch("CLI.support.run_solvers_help.run_solver_on_instance_and_process_results",
+           side_effect=_fake_run)
+    def test_run_jobs_locally(self: TestCase, mock_run: Mock) -> None:
+        """Test all jobs are run and their results are streamed back."""
+        jobs = [["Instances/" + str(i), "Solvers/" + str(i // 3)] for i in range(7)]
+        expected = sorted((solver, instance) for instance, solver in jobs)
+
+        results = list(srsh.run_jobs_locally(jobs, 1))
+        assert sorted((r[0], r[1]) for r in results) == expected
+
+        results = list(srsh.run_jobs_locally(jobs, 2))
+        assert sorted((r[0], r[1]) for r in results) == expected
+        for solver_path, instance_path, value, quality, status, _ in results:
+            assert value == len(solver_path + instance_path)
+            assert status == "SUCCESS"
+            # Each worker is pinned to a single core
+            assert quality == [1.0]
+
+    def test_get_wrapper_protocol(self: TestCase) -> None:
+        """Test the wrapper protocol is detected from the wrapper source."""
+        wrapper_path = Path("tests/test_files/Solvers/Test-Solver/"
+                            "sparkle_run_default_wrapper.py")
+        assert srsh.get_wrapper_protocol(wrapper_path) == \
+            srsh.WrapperProtocol.LEGACY
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            wrapper_path = Path(tmp_dir) / "sparkle_run_default_wrapper.py"
+            wrapper_path.write_text('import json\nSPARKLE_WRAPPER_PROTOCOL = "json"\n')
+            assert srsh.get_wrapper_protocol(wrapper_path) == \
+                srsh.WrapperProtocol.JSON
+
+    @patch("CLI.support.run_solvers_help.run_solver_on_instance_with_cmd")
+    def test_run_json_wrapper_quotes_instance(self: TestCase, mock_run: Mock) -> None:
+        """Test the instance path is quoted in the call of a JSON protocol wrapper."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            wrapper_path = Path(tmp_dir) / "sparkle_run_default_wrapper.py"
+            wrapper_path.write_text('import json\nSPARKLE_WRAPPER_PROTOCOL = "json"\n')
+            srsh.run_solver_on_instance(tmp_dir, str(wrapper_path), "Instances/a b",
+                                        "run.rawres", "run.val", seed_str="1")
+        assert mock_run.call_args.args[1].startswith(
+            "sparkle_run_default_wrapper.py --run 'Instances/a b' --seed 1")
+
+    def test_process_json_results(self: TestCase) -> None:
+        """Test processing the result record of a single invocation wrapper."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            raw_result_path = Path(tmp_dir) / "run.rawres"
+            raw_result_path.write_text(
+                "0.01/0.01\tc solver output {not json}\n"
+                '0.02/0.02\t{"status": "success", "quality": 12}\n')
+            result = srsh.process_json_results(str(raw_result_path), 1.5, 2.0)
+            assert result == (1.5, 2.0, [12.0], "SUCCESS")
+
+            raw_result_path.write_text(
+                '{"status": "TIMEOUT", "quality": [1, 2], "runtime": 3}\n')
+            result = srsh.process_json_results(str(raw_result_path), 1.5, 2.0)
+            assert result == (3.0, 3.0, [1.0, 2.0], "TIMEOUT")
+
+            raw_result_path.write_text("c killed before reporting\n")
+            result = srsh.process_json_results(str(raw_result_path), 1.5, 2.0)
+            assert result == (1.5, 2.0, [], "CRASHED")
+
+    @patch("CLI.support.run_solvers_help.verify", return_value="SUCCESS")
+    @patch("CLI.support.run_solvers_help.process_results",
+           return_value=(1.0, 1.0, [], "SUCCESS"))
+    @patch("CLI.support.run_solvers_help.run_solver_on_instance")
+    def test_run_in_scratch_directory(self: TestCase, mock_run: Mock,
+                                      mock_process: Mock, mock_verify: Mock) -> None:
+        """Test the transient files of a run are written to the scratch directory."""
+        result = srsh.run_solver_on_instance_and_process_results("Solvers/A",
+                                                                 "Instances/x")
+        assert Path(result[-1]).parent == Path(sgh.sparkle_tmp_path)
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                patch.dict("os.environ", {"NODE_SCRATCH": tmp_dir}):
+            sgh.settings.set_general_scratch_directory(
+                "$NODE_SCRATCH/runs", settings_help.SettingState.CMD_LINE)
+            result = srsh.run_solver_on_instance_and_process_results("Solvers/A",
+                                                                     "Instances/x")
+            assert Path(result[-1]).parent == Path(tmp_dir) / "runs"
+            assert Path(mock_run.call_args.args[4]).parent == Path(tmp_dir) / "runs"
+        sgh.settings = settings_help.Settings()
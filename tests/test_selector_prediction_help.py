@@ -0,0 +1,60 @@
+"""Test functionalities related to the selector prediction help module."""
+
+from __future__ import annotations
+from unittest import TestCase
+from unittest.mock import patch
+from pathlib import Path
+import tempfile
+import os
+
+from CLI.support import selector_prediction_help as sspred
+
+
+fake_server_source = """
+import json
+import sys
+print(json.dumps({"ready": True}), flush=True)
+for line in sys.stdin:
+    features = json.loads(line)["features"]
+    if any(len(vector) == 0 for vector in features):
+        print(json.dumps({"error": "empty feature vector"}), flush=True)
+        continue
+    print(json.dumps({"schedules": [[["Solvers/A", sum(vector)]]
+                                    for vector in features]}), flush=True)
+"""
+
+
+class TestSelectorPrediction(TestCase):
+    """Tests function of the selector prediction help."""
+
+    def setUp(self: TestSelectorPrediction) -> None:
+        """Create a fake prediction server and selector."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.server_path = Path(self.tmp_dir.name) / "server.py"
+        self.server_path.write_text(fake_server_source)
+        self.selector_path = Path(self.tmp_dir.name) / "selector"
+        self.selector_path.write_text("model")
+
+    def tearDown(self: TestSelectorPrediction) -> None:
+        """Stop the servers and remove the temporary files."""
+        sspred.close_prediction_servers()
+        self.tmp_dir.cleanup()
+
+    def test_prediction_server(self: TestSelectorPrediction) -> None:
+        """Test a server answers many predictions and is reused."""
+        with patch.object(sspred, "prediction_server_path", self.server_path):
+            server = sspred.get_prediction_server(self.selector_path)
+            assert server.predict_schedule([1.0, 2.0]) == [("Solvers/A", 3.0)]
+            assert server.predict([[1.0], [2.0, 2.0]]) == [[("Solvers/A", 1.0)],
+                                                           [("Solvers/A", 4.0)]]
+            with self.assertRaises(RuntimeError):
+                server.predict([[]])
+            assert sspred.get_prediction_server(self.selector_path) is server
+
+            # A changed selector is loaded by a new server
+            self.selector_path.write_text("new model")
+            mtime = self.selector_path.stat().st_mtime
+            os.utime(self.selector_path, (mtime + 1, mtime + 1))
+            new_server = sspred.get_prediction_server(self.selector_path)
+            assert new_server is not server
+            assert new_server.predict_schedule([5.0]) == [("Solvers/A", 5.0)]
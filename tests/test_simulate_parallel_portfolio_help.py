@@ -0,0 +1,86 @@
+"""Test functionalities related to the simulate parallel portfolio help module."""
+
+from __future__ import annotations
+from unittest import TestCase
+
+import numpy as np
+
+from sparkle.platform import settings_help
+from sparkle.structures.performance_dataframe import PerformanceDataFrame
+from CLI.support import simulate_parallel_portfolio_help as sspph
+import global_variables as sgh
+
+global settings
+sgh.settings = settings_help.Settings()
+
+
+class TestSimulateParallelPortfolioHelp(TestCase):
+    """Tests function of simulate parallel portfolio help."""
+
+    def test_simulate_portfolio_times(self: TestSimulateParallelPortfolioHelp) -> None:
+        """Test the expected portfolio time is the expected minimum over members."""
+        # Two instances, three solvers and two runs
+        run_times = np.array([[[10.0, 30.0], [20.0, 20.0], [np.nan, np.nan]],
+                              [[10.0, 100.0], [np.nan, 5.0], [np.nan, np.nan]]])
+        expected, solved = sspph.simulate_portfolio_times(run_times, [0], 60.0, 10)
+        assert expected.tolist() == [20.0, 305.0]
+        assert solved.tolist() == [1.0, 0.5]
+
+        # A second variation of a solver makes its short runs more likely
+        expected, solved = sspph.simulate_portfolio_times(run_times, [0, 0], 60.0, 10)
+        assert expected.tolist() == [15.0, 157.5]
+        assert solved.tolist() == [1.0, 0.75]
+
+        # Missing runs are left out, solvers without known runs never solve
+        expected, solved = sspph.simulate_portfolio_times(run_times, [2, 1], 60.0, 10)
+        assert expected.tolist() == [20.0, 5.0]
+        expected, solved = sspph.simulate_portfolio_times(run_times, [2], 60.0, 10)
+        assert expected.tolist() == [600.0, 600.0]
+        assert solved.tolist() == [0.0, 0.0]
+
+        # Each member runs 1.5 times slower and the second member starts 5s later
+        expected, _ = sspph.simulate_portfolio_times(
+            run_times[:1], [1, 0], 60.0, 10, core_slowdown=0.5, start_delay=5.0)
+        assert expected.tolist() == [25.0]
+
+    def test_simulate_parallel_portfolio(self: TestSimulateParallelPortfolioHelp) \
+            -> None:
+        """Test a portfolio is simulated from its solvers and solver variations."""
+        performance_data = PerformanceDataFrame(
+            "tests/test_files/performance/example-runtime-performance.csv")
+        simulation = sspph.simulate_parallel_portfolio(
+            performance_data, ["AlgorithmB", "AlgorithmE,2"])
+        assert simulation["Expected PAR"].tolist() == [30.0, 16.0, 3.0, 8.0, 41.0]
+        assert simulation["Solve probability"].sum() == 5.0
+        simulation = sspph.simulate_parallel_portfolio(performance_data,
+                                                       ["AlgorithmD 0 1"])
+        assert simulation["Expected PAR"].tolist() == [600.0, 20.0, 55.0, 49.0, 600.0]
+        with self.assertRaises(ValueError):
+            sspph.simulate_parallel_portfolio(performance_data, ["AlgorithmF"])
+
+    def test_select_portfolio_members(self: TestSimulateParallelPortfolioHelp) -> None:
+        """Test members are selected greedily within the number of cores."""
+        # Solver 0 is fast on instance 1 but unreliable, solver 1 solves instance 2
+        run_times = np.array([[[5.0, 100.0], [50.0, 50.0], [60.0, 60.0]],
+                              [[100.0, 100.0], [10.0, 10.0], [100.0, 100.0]]])
+        members = sspph.select_portfolio_members(run_times, 4, [4, 4, 4], 60.0, 10)
+        # A second variation of solver 1 does not help, solver 2 is dominated
+        assert members == [1, 0, 0, 0]
+        assert sspph.select_portfolio_members(run_times, 2, [4, 4, 4],
+                                              60.0, 10) == [1, 0]
+        assert sspph.select_portfolio_members(run_times, 4, [1, 1, 1],
+                                              60.0, 10) == [1, 0]
+        # Members slowing each other down make extra variations not worth it
+        assert sspph.select_portfolio_members(run_times, 4, [4, 4, 4], 60.0, 10,
+                                              core_slowdown=0.5) == [1]
+
+    def test_optimise_parallel_portfolio(self: TestSimulateParallelPortfolioHelp) \
+            -> None:
+        """Test the selected portfolio is given as a solver list."""
+        performance_data = PerformanceDataFrame(
+            "tests/test_files/performance/example-runtime-performance.csv")
+        solver_list = sspph.optimise_parallel_portfolio(
+            performance_data, ["AlgorithmC", "AlgorithmD", "AlgorithmE,2"], 8,
+            deterministic_solvers=["AlgorithmC"])
+        # Algorithm D is never faster than both others
+        assert solver_list == ["AlgorithmC", "AlgorithmE"]
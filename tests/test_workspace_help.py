@@ -0,0 +1,59 @@
+"""Test functionalities related to the solver workspace help module."""
+
+from __future__ import annotations
+from unittest import TestCase
+from pathlib import Path
+import stat
+import tempfile
+
+from sparkle.solver import workspace_help as sswh
+
+
+class TestWorkspaceHelp(TestCase):
+    """Tests function of workspace help."""
+
+    def setUp(self: TestWorkspaceHelp) -> None:
+        """Create a solver with a nested file and a symlink."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self.tmp_dir.name)
+        self.solver_path = self.tmp_path / "Solver"
+        (self.solver_path / "lib").mkdir(parents=True)
+        (self.solver_path / "solver").write_text("binary")
+        (self.solver_path / "lib" / "library.so").write_text("library")
+        (self.solver_path / "link").symlink_to("solver")
+        self.stage_root = self.tmp_path / "stage"
+
+    def tearDown(self: TestWorkspaceHelp) -> None:
+        """Remove the solver and workspaces."""
+        self.tmp_dir.cleanup()
+
+    def test_create_workspace(self: TestWorkspaceHelp) -> None:
+        """Test workspaces link to one read-only staged solver."""
+        workspaces = [sswh.create_workspace(self.solver_path,
+                                            self.tmp_path / f"run_{index}",
+                                            self.stage_root)
+                      for index in range(2)]
+        stage_paths = list(self.stage_root.iterdir())
+        assert len(stage_paths) == 1
+        staged_file = stage_paths[0] / "lib" / "library.so"
+        write_bits = stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH
+        assert staged_file.stat().st_mode & write_bits == 0
+
+        for workspace in workspaces:
+            assert (workspace / "lib" / "library.so").read_text() == "library"
+            assert (workspace / "lib" / "library.so").stat().st_ino ==\
+                staged_file.stat().st_ino
+            assert (workspace / "link").read_text() == "binary"
+        # Files written by a run stay in its own workspace
+        (workspaces[0] / "output").write_text("result")
+        assert not (workspaces[1] / "output").exists()
+        assert not (stage_paths[0] / "output").exists()
+
+    def test_stage_changed_solver(self: TestWorkspaceHelp) -> None:
+        """Test a changed solver is staged again."""
+        stage_path = sswh.stage_solver(self.solver_path, self.stage_root)
+        assert sswh.stage_solver(self.solver_path, self.stage_root) == stage_path
+        (self.solver_path / "solver").write_text("new binary")
+        new_stage_path = sswh.stage_solver(self.solver_path, self.stage_root)
+        assert new_stage_path != stage_path
+        assert (new_stage_path / "solver").read_text() == "new binary"